@@ -5,8 +5,6 @@ MSA 아키텍처에서 User 서비스를 담당하는 Flask 애플리케이션
 """
 
 import os
-import logging
-from logging.handlers import RotatingFileHandler
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_swagger_ui import get_swaggerui_blueprint
@@ -15,8 +13,23 @@ from flask_migrate import Migrate
 from dotenv import load_dotenv
 
 from user.models import db
+from user.identity_cache import init_identity_cache
+from user.routing import init_replica_routing
+from user.query_stats import init_query_stats
+from user.sharding import init_sharding
+from user.search import init_search
+from user.storage import init_storage
 from user.routes import bp
+from user.cli import users_cli
 from cognito_routes import bp as cognito_bp
+from uploads_routes import bp as uploads_bp
+from token_cache import init_token_cache
+from log_pipeline import init_logging
+from json_provider import init_json_provider
+from metrics import init_metrics
+from profiler import init_profiler
+from schema import init_schema, bootstrap_command, MIGRATIONS_DIR
+from server import serve_command
 
 # .env 파일 로드 (파일이 없어도 오류 발생하지 않음)
 try:
@@ -32,29 +45,9 @@ def setup_logging(app):
     if not os.path.exists(log_dir):
         os.makedirs(log_dir, exist_ok=True)
     
-    # 파일 핸들러 설정
+    # 파일/콘솔 기록은 큐 리스너 스레드에서 수행 (요청 스레드는 큐에 넣기만 함, log_pipeline.py)
     log_file = os.path.join(log_dir, 'user_service.log')
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=10240000,  # 10MB
-        backupCount=10
-    )
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-    ))
-    file_handler.setLevel(logging.INFO)
-    
-    # 콘솔 핸들러 설정
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s'
-    ))
-    
-    # 루트 로거 설정
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(console_handler)
-    app.logger.setLevel(logging.INFO)
+    init_logging(app, log_file)
     
     app.logger.info('User Service startup')
 
@@ -73,6 +66,9 @@ def create_app(config_class=None):
     # 로깅 설정
     setup_logging(app)
     
+    # 응답 JSON 인코더 (orjson 설치 시 orjson, 출력은 기본 제공자와 동일)
+    init_json_provider(app)
+    
     # CORS 설정 (프론트엔드 연동용)
     CORS(app, resources={
         r"/api/*": {
@@ -83,28 +79,37 @@ def create_app(config_class=None):
         }
     })
 
+    # 검증된 토큰 캐시 초기화
+    init_token_cache(app)
+
+    # 사용자 식별 캐시 초기화
+    init_identity_cache(app)
+
+    # 요청/Cognito/캐시 지표 수집 (GET /metrics)
+    init_metrics(app)
+
     # 데이터베이스 초기화
     db.init_app(app)
-    Migrate(app, db)
+    Migrate(app, db, directory=MIGRATIONS_DIR)
+    
+    # 읽기 요청을 복제본으로 라우팅 (DATABASE_REPLICA_URLS 설정 시)
+    init_replica_routing(app, db)
     
-    # 데이터베이스 테이블 생성 및 초기 사용자 생성
-    with app.app_context():
-        try:
-            db.create_all()
-            app.logger.info('Database tables created successfully')
-            
-            # 초기 사용자 생성 시도
-            try:
-                from user.models import init_users
-                init_users()
-                app.logger.info('Initial users created successfully')
-            except Exception as user_error:
-                app.logger.warning(f'Failed to create initial users: {str(user_error)}')
-                
-        except Exception as e:
-            app.logger.error(f'Database initialization failed: {str(e)}')
-            # 데이터베이스 오류가 있어도 애플리케이션은 계속 실행
-            app.logger.warning('Continuing without database initialization')
+    # 요청별 SQL 문장 수/시간 집계, 느린 문장/N+1 의심 로그
+    init_query_stats(app, db)
+    
+    # users 테이블 샤딩 (SHARD_URLS 설정 시)
+    init_sharding(app)
+    
+    # 사용자 검색 백엔드 선택 (DATABASE_TYPE 기준)
+    init_search(app)
+    
+    # 프로필 이미지 직접 업로드 저장소
+    init_storage(app)
+    
+    # 데이터베이스 테이블 생성 및 초기 사용자 생성 (create 모드)
+    # migrate 모드에서는 스키마 버전만 확인 (flask db upgrade / flask bootstrap으로 준비)
+    init_schema(app)
 
     # Swagger UI 설정
     SWAGGER_URL = '/api/docs'
@@ -121,6 +126,15 @@ def create_app(config_class=None):
     # 블루프린트 등록
     app.register_blueprint(bp, url_prefix='/api/v1')
     app.register_blueprint(cognito_bp)  # Cognito 라우트 등록
+    app.register_blueprint(uploads_bp)  # 업로드 파일 제공 (/uploads)
+    
+    # 관리자용 샘플링 프로파일러 (PROFILER_ENABLED 설정 시에만 라우트/훅 등록)
+    init_profiler(app)
+
+    # CLI 명령 등록 (flask users import/export, flask bootstrap, flask serve)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(serve_command)
 
     # 전역 에러 핸들러
     @app.errorhandler(HTTPException)
@@ -174,6 +188,20 @@ def create_app(config_class=None):
             'database': app.config.get('DATABASE_TYPE', 'sqlite')
         })
 
+    # 준비 상태 확인 엔드포인트 (워커가 트래픽을 받기 전 Cognito 클라이언트/공개키 준비)
+    @app.route('/health/ready', methods=['GET'])
+    def ready():
+        """서비스 준비 상태 확인"""
+        from cognito_config import cognito_config
+        keys_loaded = cognito_config.warm_up()
+        schema = app.extensions.get('schema_status', {})
+        ready = keys_loaded and schema.get('up_to_date', False)
+        return jsonify({
+            'status': 'ready' if ready else 'not_ready',
+            'jwks_loaded': keys_loaded,
+            'schema': schema
+        }), 200 if ready else 503
+
     # 루트 엔드포인트
     @app.route('/', methods=['GET'])
     def root():
@@ -197,6 +225,7 @@ def create_app(config_class=None):
 app = create_app()
 
 if __name__ == '__main__':
+    # 개발용 단일 프로세스 서버 (운영: flask --app app serve, server.py 참고)
     # 환경 변수에서 호스트와 포트 가져오기
     host = app.config.get('HOST', '0.0.0.0')
     port = app.config.get('PORT', 8081)
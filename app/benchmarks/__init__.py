@@ -0,0 +1,4 @@
+"""
+User Service Benchmarks
+성능 측정용 스크립트 모음입니다. app 디렉토리에서 `python -m benchmarks.<name>` 형태로 실행합니다.
+"""
@@ -0,0 +1,266 @@
+"""
+HTTP Endpoint Benchmark
+Cognito 대역과 시드 데이터로 주요 엔드포인트의 처리량과 지연 시간(p50/p95/p99)을 측정합니다.
+
+실행: python -m benchmarks.bench_http [--users 10000] [--concurrency 16] [--duration 10]
+      [--endpoint profile --endpoint search ...] [--workers 2] [--database-url URL]
+      [--output result.json] [--baseline previous.json]
+
+- Cognito: benchmarks/cognito_standin.py (로컬 RSA JWKS + cognito-idp 대역), 네트워크/AWS 계정 불필요
+- 데이터: --users 수만큼 사용자를 시드 (같은 --seed면 같은 데이터/요청 순서, 기존 DB는 부족한 만큼만 추가)
+- 서버: `flask serve`(gunicorn)를 별도 프로세스로 실행, 부하 발생기는 --concurrency개 프로세스가
+  keep-alive 연결로 엔드포인트별 요청 목록을 반복
+- 결과: JSON (커밋, 설정, 엔드포인트별 rps/p50/p95/p99). --baseline으로 이전 결과와 비교
+"""
+
+import os
+import sys
+import json
+import time
+import contextlib
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import http.client
+from multiprocessing import Pool
+
+from benchmarks.bench_search import FIRST_NAMES, LAST_NAMES, random_word, sample_queries, percentile
+from benchmarks.bench_serve import APP_DIR, free_port, start_server, stop_server
+from benchmarks.cognito_standin import CognitoStandIn
+
+ENDPOINTS = ('profile', 'user', 'search', 'admin_all', 'login')
+
+# 시드 사용자 중 관리자(is_verified) 비율
+ADMIN_RATIO = 0.01
+
+
+def seed_rows(standin, count, seed):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        username = f"{first}{last}{random_word(rng, 3)}{i}"
+        yield i, {
+            'username': username,
+            'email': f"bench{i}@bench.example.com",
+            'cognito_user_id': standin.sub_for(username),
+            'first_name': first.capitalize(),
+            'last_name': last.capitalize(),
+            'is_active': True,
+            'is_verified': i % int(1 / ADMIN_RATIO) == 1,
+        }
+
+
+def seed_users(standin, count, seed, batch_size=5000):
+    """시드 사용자를 적재하고 (적재 시간(초), [(id, username, is_verified)], DB 종류)를 반환합니다."""
+    from app import app
+    from sqlalchemy import func
+    from user.models import db, User
+    from user.bulk import UserImporter
+    from user.search import get_search_backend
+
+    started = time.perf_counter()
+    with app.app_context():
+        existing = db.session.query(func.count(User.id)).filter(User.email.like('%@bench.example.com')).scalar()
+        if existing < count:
+            importer = UserImporter(key='email', on_conflict='skip', batch_size=batch_size)
+            # 검색 인덱스는 적재 후 한 번에 구성
+            with get_search_backend().bulk_load():
+                for batch in importer.run(seed_rows(standin, count, seed)):
+                    if batch.errors:
+                        raise RuntimeError(f"Seeding failed: {batch.errors[:3]}")
+
+        rows = db.session.query(User.id, User.username, User.is_verified) \
+            .filter(User.email.like('%@bench.example.com')).order_by(User.id).all()
+        dialect = db.engine.dialect.name
+        db.engine.dispose()
+    return time.perf_counter() - started, rows[:count], dialect
+
+
+def build_requests(name, users, standin, rng, size):
+    """엔드포인트별 요청 목록 [(method, path, body, headers)]"""
+    regular = [u for u in users if not u.is_verified]
+    admins = [u for u in users if u.is_verified]
+    # 토큰 캐시/식별 캐시가 실제처럼 섞이도록 여러 사용자의 토큰을 사용
+    pool = rng.sample(regular, min(len(regular), 200)) or users
+
+    def auth(user):
+        return {'Authorization': f"Bearer {standin.issue_tokens(user.username)['AccessToken']}"}
+
+    if name == 'login':
+        # 대역의 토큰 서명 비용이 로그인 측정에 섞이지 않도록 미리 발급
+        for user in pool:
+            standin.issue_tokens(user.username)
+    queries = sample_queries(size, seed=rng.randrange(1 << 30))
+    requests = []
+    for i in range(size):
+        if name == 'profile':
+            requests.append(('GET', '/api/v1/profile', None, auth(pool[i % len(pool)])))
+        elif name == 'user':
+            requests.append(('GET', f"/api/v1/{rng.choice(users).id}", None, {}))
+        elif name == 'search':
+            requests.append(('GET', f"/api/v1/search?q={queries[i]}&per_page=20", None, {}))
+        elif name == 'admin_all':
+            page = rng.randint(1, max(1, min(50, len(users) // 20)))
+            requests.append(('GET', f"/api/v1/admin/all?page={page}&per_page=20", None,
+                             auth(admins[i % len(admins)])))
+        elif name == 'login':
+            body = json.dumps({'username': pool[i % len(pool)].username, 'password': standin.password})
+            requests.append(('POST', '/api/v1/cognito/login', body, {'Content-Type': 'application/json'}))
+    return requests
+
+
+def run_client(args):
+    """한 연결로 deadline까지 요청 목록을 반복합니다. (지연 시간 목록(ms), 오류 수)"""
+    port, requests, offset, deadline = args
+    latencies = []
+    errors = 0
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    index = offset
+
+    while time.time() < deadline:
+        method, path, body, headers = requests[index % len(requests)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    conn.close()
+    return latencies, errors
+
+
+def measure(port, requests, concurrency, duration):
+    deadline = time.time() + 1 + duration
+    step = max(1, len(requests) // concurrency)
+    with Pool(concurrency) as pool:
+        results = pool.map(run_client, [(port, requests, i * step, deadline) for i in range(concurrency)])
+
+    latencies = sorted(ms for client, _ in results for ms in client)
+    errors = sum(e for _, e in results)
+    if not latencies:
+        return {'requests': 0, 'errors': errors}
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2),
+    }
+
+
+def compare(report, baseline):
+    """이전 결과 대비 변화율 (rps는 높을수록, 지연 시간은 낮을수록 좋음)"""
+    changes = {}
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        changes[name] = {
+            key: round(result[key] / previous[key] - 1, 3)
+            for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms')
+            if result.get(key) and previous.get(key)
+        }
+    return {'commit': baseline.get('commit'), 'changes': changes}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10000, help='시드 사용자 수 (예: 10000, 1000000)')
+    parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, help='측정할 엔드포인트 (여러 번 지정 가능)')
+    parser.add_argument('--concurrency', type=int, default=16, help='동시 연결(클라이언트 프로세스) 수')
+    parser.add_argument('--duration', type=float, default=10, help='엔드포인트별 측정 시간(초)')
+    parser.add_argument('--warmup', type=float, default=2, help='엔드포인트별 워밍업 시간(초)')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--worker-class', default='gthread', choices=('sync', 'gthread', 'gevent'))
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--database-url', help='기존 DB 사용 (기본: 임시 SQLite 파일)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='결과 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON 파일')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    with CognitoStandIn() as standin:
+        env = dict(os.environ)
+        env.pop('COGNITO_CLIENT_SECRET', None)
+        env.update(standin.env())
+        env['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+        env['COGNITO_JWKS_CACHE_PATH'] = os.path.join(tmp.name, 'jwks.json')
+        # 시드는 이 프로세스에서 서버와 같은 설정으로 앱을 생성하여 적재
+        os.environ.update(env)
+
+        # 결과 JSON만 stdout으로 출력 (앱 생성 중 print는 stderr로)
+        with contextlib.redirect_stdout(sys.stderr):
+            seed_seconds, users, dialect = seed_users(standin, args.users, args.seed)
+        print(f"seeded {len(users)} users in {seed_seconds:.1f}s", file=sys.stderr)
+
+        report = {
+            'commit': git_revision(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'database': dialect,
+            'users': len(users),
+            'seed': args.seed,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'workers': args.workers,
+            'worker_class': args.worker_class,
+            'threads': args.threads,
+            'results': {},
+        }
+
+        port = free_port()
+        process = start_server(port, args.workers, args.worker_class, args.threads, env)
+        try:
+            for name in args.endpoint or ENDPOINTS:
+                rng = random.Random(f"{args.seed}:{name}")
+                requests = build_requests(name, users, standin, rng, 1000)
+                if args.warmup:
+                    measure(port, requests, args.concurrency, args.warmup)
+                result = measure(port, requests, args.concurrency, args.duration)
+                report['results'][name] = result
+                print(json.dumps({name: result}), file=sys.stderr)
+        finally:
+            stop_server(process)
+
+        report['cognito_calls'] = dict(standin.calls)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['baseline'] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+JSON Response Benchmark
+100건 사용자 목록 페이지의 조회 + 직렬화 + JSON 인코딩 시간을 기존 경로와 비교합니다.
+
+실행: python -m benchmarks.bench_json [--users 5000] [--per-page 100] [--pages 200] [--non-ascii 0.3]
+
+- 기존: ORM 객체 조회 -> 필드별 to_dict() -> Flask 기본 JSON 제공자(json 모듈)
+- 변경: 컬럼만 조회한 행 -> 미리 생성한 직렬화 함수(user/serializers.py) -> OrjsonProvider(json_provider.py)
+
+측정 전에 모든 페이지에서 두 경로의 응답 본문이 바이트 단위로 같은지 먼저 확인합니다.
+--non-ascii 비율만큼 사용자 이름/소개에 한글(과 이모지)을 넣어 ASCII 이스케이프 비용도 포함합니다.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime, timedelta
+
+from benchmarks.bench_search import FIRST_NAMES, LAST_NAMES, random_word
+
+KOREAN_NAMES = ['김민준', '이서연', '박지호', '최하은', '정도윤', '강수아', '조예준', '윤지우']
+
+
+def legacy_to_dict(user):
+    """변경 전 User.to_dict() (비교 기준)"""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "bio": user.bio,
+        "avatar_url": user.avatar_url,
+        "profile_image_url": user.profile_image_url,
+        "is_active": user.is_active,
+        "is_verified": user.is_verified,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "phone": user.phone,
+        "last_login_at": user.last_login_at.isoformat() if user.last_login_at else None,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+    }
+
+
+def seed_rows(count, non_ascii, seed=42):
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    for i in range(1, count + 1):
+        korean = rng.random() < non_ascii
+        first = rng.choice(KOREAN_NAMES) if korean else rng.choice(FIRST_NAMES).capitalize()
+        last = rng.choice(LAST_NAMES).capitalize()
+        created_at = started + timedelta(seconds=rng.randrange(10 ** 8), microseconds=rng.randrange(10 ** 6))
+        yield {
+            'username': f"{first.lower()}{random_word(rng, 4)}{i}",
+            'email': f"json{i}@bench.example.com",
+            'bio': f"{first} 소개 \"{random_word(rng, 6)}\"{' 😀' if i % 5 == 0 else ''}" if korean
+                   else f"bio {random_word(rng, 12)}",
+            'avatar_url': f"https://cdn.example.com/avatars/{i}.png" if i % 3 else None,
+            'first_name': first,
+            'last_name': last,
+            'phone': f"010-{rng.randrange(10000):04d}-{rng.randrange(10000):04d}" if i % 2 else None,
+            'is_active': True,
+            'is_verified': i % 100 == 1,
+            'last_login_at': created_at + timedelta(days=rng.randrange(30)) if i % 4 else None,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def measure(run, pages, repeat=5):
+    """페이지당 평균 시간(ms, repeat회 중 가장 빠른 값)"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in pages:
+            run(page)
+        elapsed = (time.perf_counter() - started) * 1000 / len(pages)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--pages', type=int, default=200, help='경로별 측정 페이지 수')
+    parser.add_argument('--non-ascii', type=float, default=0.3, help='한글 이름 사용자 비율')
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    os.environ.setdefault('COGNITO_JWKS_CACHE_PATH', '')
+
+    from flask.json.provider import DefaultJSONProvider
+    from json_provider import OrjsonProvider, orjson
+    from user.models import db, User, DICT_COLUMNS, PUBLIC_COLUMNS, dict_from_row, public_dict_from_row
+
+    if orjson is None:
+        raise SystemExit("orjson is not installed (pip install orjson)")
+
+    # 결과 표만 stdout으로 출력 (앱 생성 중 print는 stderr로)
+    with contextlib.redirect_stdout(sys.stderr):
+        from app import create_app
+        app = create_app()
+    stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+
+    with app.app_context():
+        existing = User.query.filter(User.email.like('%@bench.example.com')).count()
+        if existing < args.users:
+            rows = list(seed_rows(args.users, args.non_ascii))[existing:]
+            db.session.execute(User.__table__.insert(), rows)
+            db.session.commit()
+
+        base = User.query.filter(User.email.like('%@bench.example.com')).order_by(User.id)
+        page_count = max(1, args.users // args.per_page)
+        pages = [i % page_count for i in range(args.pages)]
+
+        def payload(users, page):
+            return {
+                "users": users,
+                "pagination": {"page": page + 1, "per_page": args.per_page, "total": args.users, "pages": page_count}
+            }
+
+        def fetch_objects(page):
+            users = base.offset(page * args.per_page).limit(args.per_page).all()
+            # identity map에 남은 객체를 재사용하지 않도록 (요청마다 새 세션인 것과 동일)
+            db.session.expunge_all()
+            return users
+
+        def fetch_rows(page, columns=DICT_COLUMNS):
+            return base.with_entities(*columns).offset(page * args.per_page).limit(args.per_page).all()
+
+        def old_path(page):
+            return stdlib.response(payload([legacy_to_dict(user) for user in fetch_objects(page)], page))
+
+        def new_path(page):
+            return fast.response(payload([dict_from_row(row) for row in fetch_rows(page)], page))
+
+        # 바이트 단위 동일성 확인 (관리자 목록 + 공개 목록)
+        for page in range(page_count):
+            users = fetch_objects(page)
+            expected = [
+                stdlib.response(payload([legacy_to_dict(user) for user in users], page)).get_data(),
+                stdlib.response(payload(
+                    [{field: legacy_to_dict(user)[field] for field in User.PUBLIC_FIELDS} for user in users], page
+                )).get_data(),
+            ]
+            actual = [
+                new_path(page).get_data(),
+                fast.response(payload(
+                    [public_dict_from_row(row) for row in fetch_rows(page, PUBLIC_COLUMNS)], page
+                )).get_data(),
+            ]
+            if expected != actual:
+                print(f"MISMATCH on page {page + 1}")
+                raise SystemExit(1)
+        print(f"equivalence: {page_count} pages x {args.per_page} rows are byte-identical")
+
+        objects = {page: fetch_objects(page) for page in set(pages)}
+        rows = {page: fetch_rows(page) for page in set(pages)}
+        old_dicts = {page: payload([legacy_to_dict(user) for user in users], page) for page, users in objects.items()}
+
+        stages = [
+            ('fetch', lambda page: fetch_objects(page), lambda page: fetch_rows(page)),
+            ('serialize', lambda page: [legacy_to_dict(user) for user in objects[page]],
+             lambda page: [dict_from_row(row) for row in rows[page]]),
+            ('encode', lambda page: stdlib.response(old_dicts[page]), lambda page: fast.response(old_dicts[page])),
+            ('total', old_path, new_path),
+        ]
+
+        measure(old_path, pages[:20], repeat=1)  # 워밍업
+        measure(new_path, pages[:20], repeat=1)
+        print(f"{'stage':>10}  {'old ms/page':>12}  {'new ms/page':>12}")
+        for name, old, new in stages:
+            old_ms = measure(old, pages)
+            new_ms = measure(new, pages)
+            print(f"{name:>10}  {old_ms:12.3f}  {new_ms:12.3f}  ({old_ms / new_ms:.1f}x)")
+
+        db.engine.dispose()
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+JWT Verification Benchmark
+python-jose 경로와 cryptography 경로의 토큰 검증 처리량(코어당 초당 검증 수)을 비교합니다.
+
+실행: python -m benchmarks.bench_jwt_verify [--iterations 2000]
+
+측정 전에 정상/비정상 토큰 묶음으로 두 백엔드의 검증 결과가 같은지 먼저 확인합니다.
+"""
+
+import time
+import json
+import argparse
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from jwt_verifier import JoseVerifier, CryptographyVerifier
+
+ISSUER = 'https://cognito-idp.ap-southeast-2.amazonaws.com/bench-pool'
+CLIENT_ID = 'bench-client'
+
+
+def generate_key(kid='bench-key'):
+    """벤치마크용 RSA 키쌍과 JWK 생성"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    public_jwk = jwk.construct(pem, 'RS256').public_key().to_dict()
+    public_jwk = {k: v.decode() if isinstance(v, bytes) else v for k, v in public_jwk.items()}
+    public_jwk.update({'kid': kid, 'use': 'sig'})
+    return pem, public_jwk
+
+
+def sign(pem, claims, kid='bench-key', algorithm='RS256', key=None):
+    return jwt.encode(claims, key or pem, algorithm=algorithm, headers={'kid': kid})
+
+
+def sample_tokens(pem):
+    """결과 비교용 토큰 묶음 (정상 + 여러 종류의 비정상 토큰)"""
+    now = int(time.time())
+    base = {
+        'sub': 'user-1', 'iss': ISSUER, 'client_id': CLIENT_ID,
+        'token_use': 'access', 'iat': now, 'exp': now + 3600,
+    }
+    other_pem, _ = generate_key()
+    valid = sign(pem, base)
+
+    return {
+        'valid_access': valid,
+        'valid_id': sign(pem, dict(base, token_use='id', aud=CLIENT_ID)),
+        'expired': sign(pem, dict(base, exp=now - 10)),
+        'not_yet_valid': sign(pem, dict(base, nbf=now + 600)),
+        'wrong_issuer': sign(pem, dict(base, iss='https://example.com')),
+        'missing_issuer': sign(pem, {k: v for k, v in base.items() if k != 'iss'}),
+        'wrong_audience': sign(pem, dict(base, aud='other-client')),
+        'audience_list': sign(pem, dict(base, aud=['x', CLIENT_ID])),
+        'bad_aud_type': sign(pem, dict(base, aud=123)),
+        'int_sub': sign(pem, dict(base, sub=123)),
+        'bad_iat': sign(pem, dict(base, iat='yesterday')),
+        'unknown_kid': sign(pem, base, kid='unknown'),
+        'wrong_key': sign(other_pem, base),
+        'hs256': sign(pem, base, algorithm='HS256', key='secret'),
+        'tampered': valid[:-4] + ('AAAA' if not valid.endswith('AAAA') else 'BBBB'),
+        'garbage': 'not-a-token',
+    }
+
+
+def verify_or_none(verifier, token, get_key):
+    try:
+        return verifier.verify(token, get_key)
+    except Exception:
+        return None
+
+
+def check_equivalence(verifiers, keys, tokens):
+    """모든 백엔드가 같은 결과를 내는지 확인"""
+    mismatches = []
+    for name, token in tokens.items():
+        results = {
+            v.name: verify_or_none(v, token, keys[v.name].get)
+            for v in verifiers
+        }
+        if len({json.dumps(r, sort_keys=True) for r in results.values()}) != 1:
+            mismatches.append((name, results))
+    return mismatches
+
+
+def measure(verifier, token, get_key, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        verifier.verify(token, get_key)
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    pem, public_jwk = generate_key()
+    verifiers = [
+        JoseVerifier(ISSUER, CLIENT_ID),
+        CryptographyVerifier(ISSUER, CLIENT_ID),
+    ]
+    # 키 저장소와 동일하게 로딩 시점에 한 번만 변환
+    keys = {v.name: {public_jwk['kid']: v.parse_key(public_jwk)} for v in verifiers}
+
+    tokens = sample_tokens(pem)
+    mismatches = check_equivalence(verifiers, keys, tokens)
+    if mismatches:
+        for name, results in mismatches:
+            print(f"MISMATCH {name}: {results}")
+        raise SystemExit(1)
+    print(f"equivalence: {len(tokens)} token cases agree")
+
+    results = {}
+    for verifier in verifiers:
+        get_key = keys[verifier.name].get
+        measure(verifier, tokens['valid_access'], get_key, 50)  # 워밍업
+        results[verifier.name] = measure(verifier, tokens['valid_access'], get_key, args.iterations)
+
+    baseline = results[JoseVerifier.name]
+    for name, rate in results.items():
+        print(f"{name:>12}: {rate:10.0f} tokens/s/core  ({rate / baseline:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Logging Overhead Benchmark
+요청 스레드에서 로그 한 건을 기록하는 데 드는 시간을 비교합니다.
+
+실행: python -m benchmarks.bench_logging [--records 20000] [--write-delay-ms 0]
+
+- sync: 기존 방식 (RotatingFileHandler + StreamHandler를 로거에 직접 연결, 텍스트 형식)
+- queue: log_pipeline.LogPipeline (요청 스레드는 큐에 넣기만 하고 리스너 스레드가 JSON으로 기록)
+- queue_sampled: queue + 요청 중 INFO 10% 샘플링
+
+모든 경우 요청 컨텍스트 안에서 기록하며, --write-delay-ms로 느린 디스크/콘솔을 흉내 낼 수 있습니다.
+drain_ms는 마지막 레코드가 실제로 기록될 때까지 걸린 시간입니다.
+"""
+
+import os
+import io
+import json
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from logging.handlers import RotatingFileHandler
+
+from flask import Flask, g
+
+from log_pipeline import LogPipeline, JSONFormatter, TEXT_FORMAT
+
+
+class SlowStream(io.StringIO):
+    """write마다 지정한 시간만큼 지연되는 출력 (느린 디스크/파이프 흉내)"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        # 메모리 사용이 늘지 않도록 내용은 버림
+        return len(text)
+
+
+def make_handlers(tmp, name, formatter, delay):
+    file_handler = RotatingFileHandler(os.path.join(tmp, f'{name}.log'), maxBytes=10240000, backupCount=2)
+    stream_handler = logging.StreamHandler(SlowStream(delay))
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    return [file_handler, stream_handler]
+
+
+def run(app, logger, records):
+    """요청 컨텍스트에서 레코드를 기록하고 호출별 시간(µs)을 반환합니다."""
+    samples = []
+    with app.test_request_context('/api/v1/profile'):
+        g.request_id = 'bench'
+        g.request_started = time.perf_counter()
+        for i in range(records):
+            started = time.perf_counter()
+            logger.info("GET /api/v1/profile 200 user=%s", i)
+            samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def summarize(samples, elapsed_ms, drain_ms):
+    samples.sort()
+    return {
+        'per_call_us_p50': round(statistics.median(samples), 2),
+        'per_call_us_p99': round(samples[int(len(samples) * 0.99) - 1], 2),
+        'caller_ms_total': round(elapsed_ms, 1),
+        'drain_ms': round(drain_ms, 1),
+    }
+
+
+def bench_sync(app, tmp, records, delay):
+    logger = logging.getLogger('bench.sync')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handlers = make_handlers(tmp, 'sync', logging.Formatter(TEXT_FORMAT), delay)
+    for handler in handlers:
+        logger.addHandler(handler)
+
+    started = time.perf_counter()
+    samples = run(app, logger, records)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for handler in handlers:
+        handler.close()
+    return summarize(samples, elapsed_ms, elapsed_ms)
+
+
+def bench_queue(app, tmp, records, delay, name, sample_rates=None):
+    logger = logging.getLogger(f'bench.{name}')
+    logger.propagate = False
+    pipeline = LogPipeline(
+        make_handlers(tmp, name, JSONFormatter(), delay),
+        sample_rates=sample_rates,
+        queue_size=records + 1
+    )
+    pipeline.attach(logger, logging.INFO)
+    pipeline.start()
+
+    started = time.perf_counter()
+    samples = run(app, logger, records)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    pipeline.close()
+    drain_ms = (time.perf_counter() - started) * 1000
+
+    result = summarize(samples, elapsed_ms, drain_ms)
+    result.update(pipeline.stats())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--write-delay-ms', type=float, default=0, help='콘솔 write마다 추가할 지연(ms)')
+    args = parser.parse_args()
+
+    app = Flask('bench')
+    delay = args.write_delay_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = {
+            'records': args.records,
+            'write_delay_ms': args.write_delay_ms,
+            'sync': bench_sync(app, tmp, args.records, delay),
+            'queue': bench_queue(app, tmp, args.records, delay, 'queue'),
+            'queue_sampled': bench_queue(app, tmp, args.records, delay, 'queue_sampled', {'INFO': 0.1}),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
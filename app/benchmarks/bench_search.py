@@ -0,0 +1,160 @@
+"""
+User Search Benchmark
+기존 `username ILIKE '%q%'` 검색과 검색 백엔드(FTS5/pg_trgm) 검색의 지연 시간을 비교합니다.
+
+실행: python -m benchmarks.bench_search [--users 1000000] [--queries 200] [--database-url URL]
+
+--database-url을 지정하지 않으면 임시 SQLite 파일을 사용합니다.
+PostgreSQL에서 측정하려면 DATABASE_TYPE=postgresql과 함께 --database-url을 지정합니다.
+두 경로 모두 /search 엔드포인트와 같이 첫 페이지(20건)와 total(COUNT)을 조회합니다.
+"""
+
+import os
+import json
+import time
+import random
+import string
+import argparse
+import tempfile
+import statistics
+
+FIRST_NAMES = ['min', 'seo', 'ji', 'hyun', 'jun', 'woo', 'eun', 'soo', 'young', 'hoon',
+               'alex', 'maria', 'james', 'olivia', 'noah', 'emma', 'liam', 'sofia']
+LAST_NAMES = ['kim', 'lee', 'park', 'choi', 'jung', 'kang', 'cho', 'yoon', 'jang', 'lim',
+              'smith', 'garcia', 'brown', 'miller', 'davis', 'wilson']
+
+
+def random_word(rng, length):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def seed_users(db, User, count, batch_size=50000, seed=42):
+    """검색 대상 사용자를 대량으로 생성합니다."""
+    rng = random.Random(seed)
+    table = User.__table__
+    created = 0
+    started = time.perf_counter()
+
+    while created < count:
+        size = min(batch_size, count - created)
+        rows = []
+        for i in range(created, created + size):
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            rows.append({
+                'username': f"{first}{last}{random_word(rng, 4)}{i}",
+                'email': f"user{i}@bench.example.com",
+                'first_name': first.capitalize(),
+                'last_name': last.capitalize(),
+                'is_active': True,
+                'is_verified': False,
+            })
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+        created += size
+
+    return time.perf_counter() - started
+
+
+def sample_queries(count, seed=7):
+    """실제 데이터와 겹치는 부분 문자열 검색어"""
+    rng = random.Random(seed)
+    words = FIRST_NAMES + LAST_NAMES
+    queries = []
+    for _ in range(count):
+        word = rng.choice(words)
+        if len(word) > 3 and rng.random() < 0.5:
+            start = rng.randrange(0, len(word) - 2)
+            word = word[start:start + 3]
+        queries.append(word if rng.random() < 0.7 else word + rng.choice(words)[:2])
+    return queries
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(run, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        run(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'p50_ms': round(statistics.median(samples), 2),
+        'p99_ms': round(percentile(samples, 99), 2),
+        'mean_ms': round(statistics.fmean(samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    os.environ.setdefault('COGNITO_JWKS_CACHE_PATH', '')
+
+    from app import create_app
+    from user.models import db, User
+    from user.search import LikeSearchBackend, get_search_backend, install_search
+
+    app = create_app()
+    with app.app_context():
+        if User.query.count() < args.users:
+            # 대량 적재 중에는 트리거 비용이 없도록 검색 인덱스를 적재 후에 구성
+            if db.engine.dialect.name == 'sqlite':
+                with db.engine.begin() as conn:
+                    for suffix in ('ai', 'ad', 'au'):
+                        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS users_fts_{suffix}")
+                    conn.exec_driver_sql("DROP TABLE IF EXISTS users_fts")
+            seed_seconds = seed_users(db, User, args.users - User.query.count())
+            print(f"seeded {args.users} users in {seed_seconds:.1f}s")
+
+        index_started = time.perf_counter()
+        install_search(app)
+        print(f"search index ready in {time.perf_counter() - index_started:.1f}s")
+
+        backend = get_search_backend()
+        queries = sample_queries(args.queries)
+
+        def old_path(q):
+            User.query.filter(
+                User.username.ilike(f'%{q}%'),
+                User.is_active == True
+            ).paginate(page=1, per_page=args.per_page, error_out=False).items
+
+        def new_path(q):
+            backend.apply(
+                User.query.filter(User.is_active == True), q, rank=True
+            ).paginate(page=1, per_page=args.per_page, error_out=False).items
+
+        def new_path_cursor(q):
+            backend.apply(
+                User.query.filter(User.is_active == True), q
+            ).order_by(User.username, User.id).limit(args.per_page + 1).all()
+
+        report = {
+            'users': args.users,
+            'queries': len(queries),
+            'database': db.engine.dialect.name,
+            'backend': backend.name,
+            'ilike_username': measure(old_path, queries),
+            f'{backend.name}_page': measure(new_path, queries),
+            f'{backend.name}_cursor': measure(new_path_cursor, queries),
+        }
+        if isinstance(backend, LikeSearchBackend) and backend.name == LikeSearchBackend.name:
+            report['note'] = 'indexed search backend unavailable; both paths use ILIKE'
+
+    print(json.dumps(report, indent=2))
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
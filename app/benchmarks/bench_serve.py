@@ -0,0 +1,175 @@
+"""
+Serving Throughput Benchmark
+`flask serve`(gunicorn)를 워커 수별로 실행하여 처리량이 코어 수에 따라 늘어나는지 측정합니다.
+
+실행: python -m benchmarks.bench_serve [--workers 1 --workers 2 ...] [--worker-class gthread]
+      [--concurrency 32] [--duration 10] [--path /api/v1/1]
+
+워커 수를 지정하지 않으면 1, 2, 4, ... CPU 수까지 측정합니다. 부하 발생기는 별도 프로세스에서
+keep-alive 연결로 요청을 반복하며, 같은 장비에서 실행하므로 코어 일부를 함께 사용합니다.
+(정확한 측정은 부하 발생기를 다른 장비에서 실행)
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import http.client
+from multiprocessing import Pool
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers, worker_class, threads, env):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'serve',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+         '--worker-class', worker_class, '--threads', str(threads), '--max-requests', '0'],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Server did not become ready")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_client(args):
+    """한 연결로 deadline까지 요청을 반복합니다. (지연 시간 목록(ms), 오류 수)"""
+    port, paths, deadline = args
+    latencies = []
+    errors = 0
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    index = 0
+
+    while time.time() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    conn.close()
+    return latencies, errors
+
+
+def measure(port, paths, concurrency, duration):
+    # 모든 클라이언트가 같은 시점에 시작/종료하도록 약간의 준비 시간 후 시작
+    deadline = time.time() + 1 + duration
+    with Pool(concurrency) as pool:
+        results = pool.map(run_client, [(port, paths, deadline)] * concurrency)
+
+    latencies = sorted(ms for client, _ in results for ms in client)
+    errors = sum(e for _, e in results)
+    if not latencies:
+        return {'requests': 0, 'errors': errors}
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+def default_worker_counts():
+    cpus = os.cpu_count() or 1
+    counts = []
+    count = 1
+    while count < cpus:
+        counts.append(count)
+        count *= 2
+    counts.append(cpus)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, action='append', help='측정할 워커 수 (여러 번 지정 가능)')
+    parser.add_argument('--worker-class', default='gthread', choices=('sync', 'gthread', 'gevent'))
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=32, help='동시 연결(클라이언트 프로세스) 수')
+    parser.add_argument('--duration', type=float, default=10, help='워커 수별 측정 시간(초)')
+    parser.add_argument('--path', action='append', help='요청 경로 (여러 번 지정 시 번갈아 요청)')
+    args = parser.parse_args()
+
+    paths = args.path or ['/api/v1/1', '/health']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        # 측정 중 실제 데이터베이스에 영향을 주지 않도록 격리
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        env.setdefault('COGNITO_JWKS_CACHE_PATH', os.path.join(tmp, 'jwks.json'))
+
+        report = {
+            'cpus': os.cpu_count(),
+            'worker_class': args.worker_class,
+            'threads': args.threads,
+            'concurrency': args.concurrency,
+            'paths': paths,
+            'results': [],
+        }
+
+        for workers in args.workers or default_worker_counts():
+            port = free_port()
+            process = start_server(port, workers, args.worker_class, args.threads, env)
+            try:
+                measure(port, paths, args.concurrency, 1)  # 워밍업
+                result = measure(port, paths, args.concurrency, args.duration)
+            finally:
+                stop_server(process)
+
+            result['workers'] = workers
+            report['results'].append(result)
+            print(json.dumps(result), file=sys.stderr)
+
+        base = report['results'][0].get('rps')
+        for result in report['results']:
+            if base and result.get('rps'):
+                result['speedup'] = round(result['rps'] / base, 2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Startup Time Benchmark
+새 프로세스에서 모듈을 import하는 데 걸리는 시간을 측정합니다.
+
+실행: python -m benchmarks.bench_startup [--runs 10] [--module app] [--schema-mode create --schema-mode migrate]
+
+각 실행은 별도의 인터프리터에서 수행되며, 인터프리터 자체의 기동 시간은
+`pass`만 실행하는 기준 측정값을 빼서 보고합니다.
+--schema-mode를 지정하면 DATABASE_SCHEMA_MODE별로 측정하며, migrate 모드는 측정 전에
+`flask bootstrap`을 한 번 실행합니다.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'import_ms': elapsed * 1000}}))
+"""
+
+
+def run_once(module, env):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET.format(module=module)],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    import_ms = json.loads(result.stdout.strip().splitlines()[-1])['import_ms']
+    return wall_ms, import_ms
+
+
+def baseline_ms(env, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], cwd=APP_DIR, env=env, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bootstrap(env):
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'bootstrap'],
+        cwd=APP_DIR, env=env, capture_output=True, check=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--module', action='append',
+                        help='측정할 모듈 (여러 번 지정 가능, 기본: cognito_config, app)')
+    parser.add_argument('--schema-mode', action='append', choices=('create', 'migrate'),
+                        help='측정할 DATABASE_SCHEMA_MODE (여러 번 지정 가능, 기본: 환경 변수 그대로)')
+    args = parser.parse_args()
+
+    modules = args.module or ['cognito_config', 'app']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        # 측정 중 실제 데이터베이스/네트워크에 영향을 주지 않도록 격리
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        env.setdefault('COGNITO_JWKS_CACHE_PATH', os.path.join(tmp, 'jwks.json'))
+
+        interpreter_ms = baseline_ms(env, args.runs)
+        report = {'interpreter_ms': round(interpreter_ms, 1), 'modules': {}}
+
+        mode_envs = {}
+        for mode in args.schema_mode or [None]:
+            mode_env = dict(env)
+            if mode:
+                mode_env['DATABASE_SCHEMA_MODE'] = mode
+                if mode == 'migrate':
+                    bootstrap(mode_env)
+            mode_envs[mode] = mode_env
+
+        for module in modules:
+            samples = {mode: [] for mode in mode_envs}
+            for mode_env in mode_envs.values():
+                run_once(module, mode_env)  # 바이트코드 캐시 워밍업
+            # 모드를 번갈아 실행하여 측정 중 시스템 부하 변화가 한쪽에만 반영되지 않도록 함
+            for _ in range(args.runs):
+                for mode, mode_env in mode_envs.items():
+                    samples[mode].append(run_once(module, mode_env))
+
+            for mode in mode_envs:
+                imports = [s[1] for s in samples[mode]]
+                walls = [s[0] for s in samples[mode]]
+                name = f'{module} [{mode}]' if mode else module
+                report['modules'][name] = {
+                    'import_ms_p50': round(statistics.median(imports), 1),
+                    'import_ms_max': round(max(imports), 1),
+                    'process_ms_p50': round(statistics.median(walls) - interpreter_ms, 1),
+                }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Cognito Stand-in
+벤치마크/로컬 실행용 Cognito 대역입니다. 실제 AWS 없이 로그인/토큰 검증 경로 전체를 실행할 수 있습니다.
+
+- 로컬에서 생성한 RSA 키로 서명한 액세스/ID 토큰 발급, 공개키는 JWKS로 제공
+- cognito-idp JSON 프로토콜(X-Amz-Target)의 InitiateAuth(USER_PASSWORD_AUTH, REFRESH_TOKEN_AUTH),
+  AdminCreateUser, GetUser 처리
+
+서버 프로세스에는 env()의 환경 변수(AWS_ENDPOINT_URL_COGNITO_IDENTITY_PROVIDER, COGNITO_JWKS_URL 등)를
+전달하면 boto3 클라이언트와 공개키 저장소가 이 대역을 사용합니다. (코드 변경 없음)
+모든 사용자는 같은 비밀번호(password)로 로그인하며, sub는 sub_for(username)입니다.
+"""
+
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from jose import jwt
+
+from benchmarks.bench_jwt_verify import generate_key
+
+TARGET_PREFIX = 'AWSCognitoIdentityProviderService.'
+
+
+class CognitoError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class CognitoStandIn:
+    """로컬 HTTP 서버로 동작하는 Cognito User Pool 대역"""
+
+    def __init__(self, region='us-east-1', user_pool_id='bench-pool', client_id='bench-client',
+                 password='Bench-password-1', token_ttl=3600, kid='bench-key'):
+        self.region = region
+        self.user_pool_id = user_pool_id
+        self.client_id = client_id
+        self.password = password
+        self.token_ttl = token_ttl
+        self.kid = kid
+        self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        self.pem, self.jwk = generate_key(kid)
+        self.calls = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @staticmethod
+    def sub_for(username):
+        return f"sub-{username}"
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """서버 프로세스가 이 대역을 사용하도록 하는 환경 변수"""
+        return {
+            'AWS_REGION': self.region,
+            'COGNITO_USER_POOL_ID': self.user_pool_id,
+            'COGNITO_CLIENT_ID': self.client_id,
+            'COGNITO_JWKS_URL': f"{self.url}/{self.user_pool_id}/.well-known/jwks.json",
+            'AWS_ENDPOINT_URL_COGNITO_IDENTITY_PROVIDER': self.url,
+            # AdminCreateUser 서명용 (대역은 서명을 확인하지 않음)
+            'AWS_ACCESS_KEY_ID': 'bench',
+            'AWS_SECRET_ACCESS_KEY': 'bench',
+        }
+
+    def issue_tokens(self, username, email=None):
+        """사용자의 토큰 묶음 (수명의 절반까지 같은 토큰 재사용, 서명 비용이 측정에 섞이지 않도록)"""
+        now = int(time.time())
+        with self._lock:
+            cached = self._tokens.get(username)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        sub = self.sub_for(username)
+        base = {'sub': sub, 'iss': self.issuer, 'iat': now, 'exp': now + self.token_ttl}
+        access = dict(base, token_use='access', client_id=self.client_id, username=username)
+        id_claims = dict(
+            base, token_use='id', aud=self.client_id, email=email or f"{username}@bench.example.com",
+            **{'cognito:username': username}
+        )
+        tokens = {
+            'AccessToken': jwt.encode(access, self.pem, algorithm='RS256', headers={'kid': self.kid}),
+            'IdToken': jwt.encode(id_claims, self.pem, algorithm='RS256', headers={'kid': self.kid}),
+            'RefreshToken': f"refresh:{username}",
+            'ExpiresIn': self.token_ttl,
+            'TokenType': 'Bearer',
+        }
+        with self._lock:
+            self._tokens[username] = (now + self.token_ttl // 2, tokens)
+        return tokens
+
+    # cognito-idp 작업
+
+    def initiate_auth(self, body):
+        flow = body.get('AuthFlow')
+        params = body.get('AuthParameters') or {}
+        if body.get('ClientId') != self.client_id:
+            raise CognitoError('ResourceNotFoundException', 'User pool client does not exist.')
+
+        if flow == 'USER_PASSWORD_AUTH':
+            if params.get('PASSWORD') != self.password:
+                raise CognitoError('NotAuthorizedException', 'Incorrect username or password.')
+            return {'AuthenticationResult': self.issue_tokens(params.get('USERNAME'))}
+
+        if flow == 'REFRESH_TOKEN_AUTH':
+            token = params.get('REFRESH_TOKEN') or ''
+            if not token.startswith('refresh:'):
+                raise CognitoError('NotAuthorizedException', 'Invalid Refresh Token')
+            tokens = dict(self.issue_tokens(token.split(':', 1)[1]))
+            tokens.pop('RefreshToken')
+            return {'AuthenticationResult': tokens}
+
+        raise CognitoError('InvalidParameterException', f"Unsupported AuthFlow {flow}")
+
+    def admin_create_user(self, body):
+        username = body.get('Username')
+        attributes = list(body.get('UserAttributes') or [])
+        attributes.append({'Name': 'sub', 'Value': self.sub_for(username)})
+        return {'User': {'Username': username, 'Attributes': attributes, 'Enabled': True,
+                         'UserStatus': 'FORCE_CHANGE_PASSWORD'}}
+
+    def get_user(self, body):
+        try:
+            claims = jwt.get_unverified_claims(body.get('AccessToken') or '')
+        except Exception:
+            raise CognitoError('NotAuthorizedException', 'Invalid Access Token')
+        return {
+            'Username': claims.get('username'),
+            'UserAttributes': [{'Name': 'sub', 'Value': claims.get('sub')}],
+        }
+
+    OPERATIONS = {
+        'InitiateAuth': initiate_auth,
+        'AdminCreateUser': admin_create_user,
+        'GetUser': get_user,
+    }
+
+    def handle(self, operation, body):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        handler = self.OPERATIONS.get(operation)
+        if handler is None:
+            raise CognitoError('InvalidAction', f"Unsupported operation {operation}")
+        return handler(self, body)
+
+    # HTTP 서버
+
+    def start(self, host='127.0.0.1', port=0):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 헤더/본문을 나눠 쓰므로 Nagle + delayed ACK로 응답마다 ~40ms 지연되지 않도록
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, content_type='application/x-amz-json-1.1'):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.endswith('/.well-known/jwks.json'):
+                    self._send(200, {'keys': [standin.jwk]}, 'application/json')
+                else:
+                    self._send(404, {'message': 'Not Found'}, 'application/json')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                target = self.headers.get('X-Amz-Target', '')
+                try:
+                    self._send(200, standin.handle(target[len(TARGET_PREFIX):], body))
+                except CognitoError as e:
+                    self._send(400, {'__type': e.code, 'message': str(e)})
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='cognito-standin', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
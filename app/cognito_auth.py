@@ -32,8 +32,15 @@ def cognito_jwt_required(f):
         
         token = auth_header.split(' ')[1]
         
-        # 토큰 검증
-        payload = cognito_config.verify_token(token)
+        # 토큰 검증 (검증된 토큰 캐시 우선 조회)
+        token_cache = current_app.extensions.get('token_cache')
+        payload = token_cache.get(token) if token_cache else None
+        
+        if payload is None:
+            payload = cognito_config.verify_token(token)
+            if payload and token_cache:
+                token_cache.set(token, payload)
+        
         if not payload:
             return jsonify({
                 "error": "Invalid token",
@@ -5,11 +5,16 @@ AWS Cognito와 연동하기 위한 설정 파일입니다.
 """
 
 import os
-import boto3
+import logging
+import threading
+import weakref
 from botocore.exceptions import ClientError
-from jose import jwt
-import requests
-import json
+
+from jwks_store import JWKSKeyStore
+from jwt_verifier import create_verifier
+from metrics import observe_cognito_call
+
+logger = logging.getLogger(__name__)
 
 class CognitoConfig:
     def __init__(self):
@@ -19,59 +24,139 @@ class CognitoConfig:
         self.client_id = os.getenv('COGNITO_CLIENT_ID')
         self.client_secret = os.getenv('COGNITO_CLIENT_SECRET', None)
         
-        # Cognito 클라이언트 초기화
-        self.cognito_client = boto3.client('cognito-idp', region_name=self.region)
+        # JWT 검증 백엔드 (cryptography 우선, python-jose 대체)
+        allowed_token_use = [
+            value.strip() for value in os.getenv('COGNITO_ALLOWED_TOKEN_USE', '').split(',') if value.strip()
+        ]
+        self.verifier = create_verifier(
+            issuer=f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}",
+            audience=self.client_id,
+            allowed_token_use=allowed_token_use
+        )
+        
+        # Cognito 클라이언트와 공개키 저장소는 처음 사용할 때 프로세스별로 한 번 생성
+        # (import 시점에 boto3 클라이언트 생성이나 네트워크 I/O를 하지 않음)
+        self._cognito_client = None
+        self._key_store = None
+        self._key_store_created = False
+        self._init_lock = threading.Lock()
+        self._forked = False
         
-        # JWT 토큰 검증을 위한 공개키 가져오기
-        self.public_keys = self._get_public_keys()
+        # fork된 자식 프로세스에서는 부모의 클라이언트/스레드/락을 재사용하지 않음
+        if hasattr(os, 'register_at_fork'):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: ref() and ref()._mark_forked())
     
-    def _get_public_keys(self):
-        """Cognito User Pool의 공개키들을 가져옵니다."""
-        try:
-            # Cognito 설정이 없으면 빈 딕셔너리 반환
+    def _mark_forked(self):
+        """fork 직후 자식 프로세스에서 호출됩니다. (무거운 작업은 하지 않음)"""
+        self._init_lock = threading.Lock()
+        self._cognito_client = None
+        self._forked = True
+    
+    def _after_fork(self):
+        """fork 이후 첫 사용 시 부모에게서 물려받은 상태를 정리합니다."""
+        with self._init_lock:
+            if not self._forked:
+                return
+            self._forked = False
+            # 이미 불러온 키는 유지하고 락/갱신 스레드만 새로 준비
+            if self._key_store:
+                self._key_store.reset_after_fork()
+    
+    @property
+    def cognito_client(self):
+        """Cognito 클라이언트 (지연 생성)"""
+        if self._forked:
+            self._after_fork()
+        
+        client = self._cognito_client
+        if client is None:
+            with self._init_lock:
+                if self._cognito_client is None:
+                    import boto3
+                    self._cognito_client = boto3.client('cognito-idp', region_name=self.region)
+                client = self._cognito_client
+        return client
+    
+    @cognito_client.setter
+    def cognito_client(self, client):
+        # 로컬 대역(stand-in) 클라이언트 주입용
+        self._cognito_client = client
+    
+    @property
+    def key_store(self):
+        """JWT 토큰 검증을 위한 공개키 저장소 (지연 생성, 디스크 사본 로드 + 백그라운드 갱신)"""
+        if self._forked:
+            self._after_fork()
+        
+        if not self._key_store_created:
+            with self._init_lock:
+                if not self._key_store_created:
+                    self._key_store = self._create_key_store()
+                    if self._key_store:
+                        self._key_store.load()
+                    self._key_store_created = True
+        return self._key_store
+    
+    def warm_up(self):
+        """워커가 준비 완료를 알리기 전에 클라이언트와 공개키를 미리 준비합니다."""
+        self.cognito_client
+        key_store = self.key_store
+        if key_store is None:
+            return False
+        
+        if not key_store.keys():
+            key_store.refresh()
+        return bool(key_store.keys())
+    
+    def _create_key_store(self):
+        """Cognito User Pool의 공개키 저장소를 생성합니다."""
+        # 로컬 JWKS 파일이나 HTTP 대역을 지정하면 그 주소를 사용
+        url = os.getenv('COGNITO_JWKS_URL')
+        
+        if not url:
+            # Cognito 설정이 없으면 키 저장소 없이 동작
             if not self.user_pool_id:
-                print("Cognito User Pool ID not configured. Skipping public keys fetch.")
-                return {}
-                
+                logger.warning("Cognito User Pool ID not configured. Skipping public keys fetch.")
+                return None
             url = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
-            response = requests.get(url)
-            response.raise_for_status()
-            jwks = response.json()
-            
-            public_keys = {}
-            for key in jwks['keys']:
-                kid = key['kid']
-                public_keys[kid] = key
-            
-            return public_keys
-        except Exception as e:
-            print(f"Error fetching public keys: {e}")
-            return {}
+        
+        default_cache_path = os.path.join(
+            os.path.dirname(__file__), 'data', f"jwks_{self.user_pool_id or 'local'}.json"
+        )
+        
+        return JWKSKeyStore(
+            url,
+            cache_path=os.getenv('COGNITO_JWKS_CACHE_PATH', default_cache_path) or None,
+            ttl=int(os.getenv('COGNITO_JWKS_TTL', 3600)),
+            refresh_margin=int(os.getenv('COGNITO_JWKS_REFRESH_MARGIN', 300)),
+            min_refetch_interval=int(os.getenv('COGNITO_JWKS_MIN_REFETCH_INTERVAL', 30)),
+            timeout=float(os.getenv('COGNITO_JWKS_TIMEOUT', 5)),
+            key_parser=self.verifier.parse_key
+        )
+    
+    @property
+    def public_keys(self):
+        """현재 캐시된 공개키들 (kid -> JWK)"""
+        key_store = self.key_store
+        return key_store.keys() if key_store else {}
     
-    def verify_token(self, token):
-        """JWT 토큰을 검증합니다."""
+    @observe_cognito_call('verify_token')
+    def verify_token(self, token, token_use=None):
+        """JWT 토큰을 검증합니다. (token_use 지정 시 해당 용도의 토큰만 허용)"""
         try:
-            # 토큰 헤더에서 kid (Key ID) 추출
-            header = jwt.get_unverified_header(token)
-            kid = header['kid']
-            
-            if kid not in self.public_keys:
+            key_store = self.key_store
+            if not key_store:
                 raise Exception("Invalid token: Key ID not found")
             
-            # 토큰 검증
-            payload = jwt.decode(
-                token,
-                self.public_keys[kid],
-                algorithms=['RS256'],
-                audience=self.client_id,
-                issuer=f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}"
-            )
-            
-            return payload
+            # 키 로딩 시 변환해 둔 키 객체로 서명/클레임 검증
+            # (알 수 없는 kid이면 키 저장소가 제한된 재조회 수행)
+            return self.verifier.verify(token, key_store.get_parsed_key, token_use=token_use)
         except Exception as e:
-            print(f"Token verification failed: {e}")
+            logger.info("Token verification failed: %s", e)
             return None
     
+    @observe_cognito_call('get_user')
     def get_user_info(self, access_token):
         """액세스 토큰을 사용하여 사용자 정보를 가져옵니다."""
         try:
@@ -80,9 +165,10 @@ class CognitoConfig:
             )
             return response
         except ClientError as e:
-            print(f"Error getting user info: {e}")
+            logger.warning("Error getting user info: %s", e)
             return None
     
+    @observe_cognito_call('admin_create_user')
     def create_user(self, username, email, password, attributes=None):
         """Cognito에 새 사용자를 생성합니다."""
         try:
@@ -110,9 +196,10 @@ class CognitoConfig:
             
             return response
         except ClientError as e:
-            print(f"Error creating user: {e}")
+            logger.warning("Error creating user: %s", e)
             return None
     
+    @observe_cognito_call('initiate_auth')
     def authenticate_user(self, username, password):
         """사용자 인증을 수행합니다."""
         try:
@@ -132,7 +219,7 @@ class CognitoConfig:
             
             return response
         except ClientError as e:
-            print(f"Authentication error: {e}")
+            logger.warning("Authentication error: %s", e)
             return None
     
     def _calculate_secret_hash(self, username):
@@ -150,6 +237,7 @@ class CognitoConfig:
         
         return base64.b64encode(dig).decode()
     
+    @observe_cognito_call('refresh_token')
     def refresh_token(self, refresh_token):
         """리프레시 토큰을 사용하여 새로운 액세스 토큰을 가져옵니다."""
         try:
@@ -168,10 +256,10 @@ class CognitoConfig:
             
             return response
         except ClientError as e:
-            print(f"Token refresh error: {e}")
+            logger.warning("Token refresh error: %s", e)
             return None
 
-# 전역 Cognito 설정 인스턴스
+# 전역 Cognito 설정 인스턴스 (생성 비용이 작고, 무거운 초기화는 첫 사용 시 수행)
 cognito_config = CognitoConfig()
 
 
@@ -4,9 +4,15 @@ Cognito 인증을 위한 API 엔드포인트들입니다.
 """
 
 from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
 from cognito_config import cognito_config
 from cognito_auth import cognito_jwt_required, get_cognito_user_id
 from user.models import db, User
+from user.services import UserService
+from user.identity_cache import get_user_snapshot, invalidate_user
+from user.http_cache import conditional_user_response, private_version
+from user.images import process_profile_image, ImageUploadError
+from user.sharding import route_user, assign_new_user, release_new_user
 from datetime import datetime
 
 bp = Blueprint("cognito", __name__, url_prefix="/api/v1/cognito")
@@ -44,6 +50,7 @@ def register():
             }), 500
         
         # 로컬 데이터베이스에도 사용자 정보 저장 (선택사항)
+        local_user = None
         try:
             local_user = User(
                 username=username,
@@ -51,9 +58,12 @@ def register():
                 cognito_user_id=cognito_response['User']['Username'],
                 is_active=True
             )
+            assign_new_user(local_user)
             db.session.add(local_user)
             db.session.commit()
         except Exception as e:
+            db.session.rollback()
+            release_new_user(local_user)
             current_app.logger.warning(f"Failed to create local user: {e}")
         
         return jsonify({
@@ -98,8 +108,29 @@ def login():
         # 인증 성공
         tokens = auth_response['AuthenticationResult']
         
-        # 사용자 정보 가져오기
-        user_info = cognito_config.get_user_info(tokens['AccessToken'])
+        # 사용자 식별 정보는 로컬 캐시된 공개키로 검증한 IdToken에서 추출
+        # (GetUser 추가 호출은 설정으로 켠 경우에만 수행)
+        id_claims = None
+        if tokens.get('IdToken'):
+            id_claims = cognito_config.verify_token(tokens['IdToken'], token_use='id')
+        
+        cognito_username = id_claims.get('cognito:username') if id_claims else None
+        
+        if current_app.config.get('COGNITO_LOGIN_FETCH_USER_INFO', False):
+            user_info = cognito_config.get_user_info(tokens['AccessToken'])
+            if user_info:
+                cognito_username = user_info['Username']
+        
+        # 로컬 사용자 정보 갱신 (last_login_at, 없으면 JIT 생성)
+        if id_claims:
+            try:
+                UserService().record_login(
+                    cognito_user_id=id_claims['sub'],
+                    username=cognito_username or username,
+                    email=id_claims.get('email')
+                )
+            except Exception as e:
+                current_app.logger.warning(f"Failed to record login: {e}")
         
         return jsonify({
             "message": "Login successful",
@@ -109,7 +140,9 @@ def login():
             "expires_in": tokens.get('ExpiresIn'),
             "user": {
                 "username": username,
-                "cognito_user_id": user_info['Username'] if user_info else None
+                "cognito_user_id": cognito_username,
+                "sub": id_claims.get('sub') if id_claims else None,
+                "email": id_claims.get('email') if id_claims else None
             }
         }), 200
         
@@ -164,8 +197,8 @@ def get_profile():
     try:
         user_id = get_cognito_user_id()
         
-        # 로컬 데이터베이스에서 사용자 정보 조회
-        user = User.query.filter_by(cognito_user_id=user_id).first()
+        # 로컬 데이터베이스에서 사용자 정보 조회 (식별 캐시 우선)
+        user = get_user_snapshot(user_id)
         
         if not user:
             return jsonify({
@@ -173,9 +206,11 @@ def get_profile():
                 "message": "User not found in local database"
             }), 404
         
-        return jsonify({
-            "user": user.to_dict()
-        }), 200
+        # ETag/Last-Modified 조건부 응답 (변경이 없으면 304)
+        return conditional_user_response(
+            'profile', user.id, private_version(user),
+            lambda: {"user": user.to_dict()}
+        )
         
     except Exception as e:
         current_app.logger.error(f"Profile retrieval error: {str(e)}")
@@ -192,6 +227,7 @@ def update_profile():
         user_id = get_cognito_user_id()
         
         # 로컬 데이터베이스에서 사용자 조회
+        route_user('cognito_user_id', user_id)
         user = User.query.filter_by(cognito_user_id=user_id).first()
         
         if not user:
@@ -200,17 +236,18 @@ def update_profile():
                 "message": "User not found in local database"
             }), 404
         
-        # 파일 업로드 처리
+        # 파일 업로드 처리 (청크 저장 + 백그라운드 아바타 생성)
+        image_result = None
         if 'profileImage' in request.files:
             file = request.files['profileImage']
             if file and file.filename:
-                import os
-                filename = f"profile_{user_id}.png"
-                file_path = os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), filename)
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                file.save(file_path)
-                
-                user.profile_image_url = f"/uploads/{filename}"
+                try:
+                    image_result = process_profile_image(user, file)
+                except ImageUploadError as e:
+                    return jsonify({
+                        "error": "Invalid profile image",
+                        "message": str(e)
+                    }), e.status_code
         
         # JSON 데이터 처리
         data = {}
@@ -226,12 +263,20 @@ def update_profile():
         
         user.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_user(user_id)
         
-        return jsonify({
+        response = {
             "message": "Profile updated successfully",
             "user": user.to_dict()
-        }), 200
+        }
+        if image_result:
+            response["profile_image"] = image_result
+        
+        return jsonify(response), 200
         
+    except RequestEntityTooLarge:
+        # 요청 본문 크기 초과는 전역 HTTP 예외 처리기에서 413으로 응답
+        raise
     except Exception as e:
         current_app.logger.error(f"Profile update error: {str(e)}")
         return jsonify({
@@ -5,6 +5,19 @@ MSA 환경에서 User 서비스의 설정을 관리합니다.
 
 import os
 
+def engine_options(database_uri, pool_size=5, max_overflow=10):
+    """SQLALCHEMY_ENGINE_OPTIONS 생성 (DB_POOL_* 환경 변수가 있으면 우선)"""
+    options = {
+        # 끊어진 연결(DB 재시작, 유휴 연결 정리)을 사용 전에 확인
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    }
+    if database_uri and not database_uri.startswith('sqlite'):
+        options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', pool_size))
+        options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', max_overflow))
+        options['pool_timeout'] = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    return options
+
 class Config:
     # 보안 키 (운영 환경에서는 반드시 환경 변수로 설정)
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -38,33 +51,174 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # 커넥션 풀 설정 (primary와 복제본에 동일하게 적용)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    
+    # 읽기 전용 복제본 (쉼표 구분 URL -> bind 'replica_1', 'replica_2', ...)
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{i}': url for i, url in enumerate(DATABASE_REPLICA_URLS, start=1)}
+    # 복제 지연(초)이 이 값을 넘으면 복제본 제외, 상태 확인/재시도 간격(초)
+    DATABASE_REPLICA_MAX_LAG = float(os.environ.get('DATABASE_REPLICA_MAX_LAG', 5))
+    DATABASE_REPLICA_CHECK_INTERVAL = float(os.environ.get('DATABASE_REPLICA_CHECK_INTERVAL', 10))
+    DATABASE_REPLICA_RETRY_INTERVAL = float(os.environ.get('DATABASE_REPLICA_RETRY_INTERVAL', 30))
+    # 쓰기 후 이 시간(초) 동안 같은 클라이언트의 읽기는 primary로 (read-your-writes)
+    DATABASE_STICKY_SECONDS = int(os.environ.get('DATABASE_STICKY_SECONDS', 5))
+    DATABASE_STICKY_COOKIE = os.environ.get('DATABASE_STICKY_COOKIE', 'db_primary_until')
+    
+    # users 테이블 샤드 (쉼표 구분 URL -> bind 'shard_1', 'shard_2', ...; 디렉터리는 primary에 저장)
+    SHARD_URLS = [url.strip() for url in os.environ.get('SHARD_URLS', '').split(',') if url.strip()]
+    SQLALCHEMY_BINDS.update({f'shard_{i}': url for i, url in enumerate(SHARD_URLS, start=1)})
+    # 샤드 배치 기준 (id | cognito_user_id), 해시 링의 샤드당 가상 노드 수, 병렬 조회 스레드 수
+    SHARD_KEY = os.environ.get('SHARD_KEY', 'id')
+    SHARD_VNODES = int(os.environ.get('SHARD_VNODES', 64))
+    SHARD_FANOUT_WORKERS = int(os.environ.get('SHARD_FANOUT_WORKERS', 8))
+    
+    # 스키마 준비 방식 (create: 앱 생성 시 create_all()/초기 사용자 생성,
+    # migrate: Flask-Migrate + `flask bootstrap`으로 준비하고 워커는 스키마 버전만 확인)
+    DATABASE_SCHEMA_MODE = os.environ.get('DATABASE_SCHEMA_MODE', 'create')
+    
+    # SQL 문장 집계 (user/query_stats.py)
+    DATABASE_QUERY_STATS_ENABLED = os.environ.get('DATABASE_QUERY_STATS_ENABLED', 'true').lower() == 'true'
+    # 이 시간(ms) 이상 걸린 문장은 정규화 SQL로 경고 로그 (0: 기록 안 함)
+    DATABASE_SLOW_QUERY_MS = float(os.environ.get('DATABASE_SLOW_QUERY_MS', 200))
+    # 한 요청에서 같은 형태의 문장이 이 횟수 이상 실행되면 N+1 의심 로그 (0: 검사 안 함)
+    DATABASE_N_PLUS_ONE_THRESHOLD = int(os.environ.get('DATABASE_N_PLUS_ONE_THRESHOLD', 5))
+    # 응답에 X-DB-Queries/Server-Timing 헤더 추가 (ENVIRONMENT=production에서는 항상 끔)
+    DATABASE_QUERY_HEADERS = os.environ.get('DATABASE_QUERY_HEADERS', 'true').lower() == 'true'
+    
+    # 사용자 검색 백엔드 (auto: DATABASE_TYPE에 따라 sqlite_fts5/postgres_trgm/like)
+    USER_SEARCH_BACKEND = os.environ.get('USER_SEARCH_BACKEND', 'auto')
+    
     # 환경 설정
     ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
     
     # CORS 설정 (프론트엔드 연동용)
     CORS_ALLOW_ORIGINS = os.environ.get('CORS_ALLOW_ORIGINS', 'http://localhost:3000,http://localhost:8080,http://localhost:5173,http://127.0.0.1:3000,http://127.0.0.1:8080,http://127.0.0.1:5173').split(',')
     
+    # 검증된 토큰 캐시 설정
+    TOKEN_CACHE_ENABLED = os.environ.get('TOKEN_CACHE_ENABLED', 'true').lower() == 'true'
+    TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES', 10000))
+    
+    # 사용자 식별 캐시 설정 (cognito_user_id -> 사용자 스냅샷)
+    IDENTITY_CACHE_ENABLED = os.environ.get('IDENTITY_CACHE_ENABLED', 'true').lower() == 'true'
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES', 10000))
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 60))
+    
+    # 커서 페이지네이션의 선택적 total(COUNT) 캐시 시간(초)
+    PAGINATION_COUNT_CACHE_TTL = int(os.environ.get('PAGINATION_COUNT_CACHE_TTL', 30))
+    
+    # 사용자 일괄 조회(/batch) 최대 요청 개수
+    USER_BATCH_MAX_ITEMS = int(os.environ.get('USER_BATCH_MAX_ITEMS', 100))
+    # 관리자 스트리밍 내보내기에서 커서로 한 번에 가져올 행 수
+    USER_EXPORT_BATCH_SIZE = int(os.environ.get('USER_EXPORT_BATCH_SIZE', 1000))
+    
+    # 사용자 조회 응답의 Cache-Control 정책 (엔드포인트별, ETag로 재검증)
+    HTTP_CACHE_CONTROL = {
+        'user.get_user': os.environ.get('CACHE_CONTROL_PUBLIC_USER', 'public, no-cache'),
+        'user.get_profile': os.environ.get('CACHE_CONTROL_PROFILE', 'private, no-cache'),
+        'cognito.get_profile': os.environ.get('CACHE_CONTROL_PROFILE', 'private, no-cache'),
+    }
+    
+    # 파일 업로드 설정
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
+    PROFILE_IMAGE_MAX_BYTES = int(os.environ.get('PROFILE_IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+    # 요청 본문 전체 제한 (멀티파트 오버헤드 여유 포함)
+    MAX_CONTENT_LENGTH = PROFILE_IMAGE_MAX_BYTES + 1024 * 1024
+    # 아바타 크기(px)와 변환 작업자 풀 크기
+    PROFILE_IMAGE_SIZES = tuple(
+        int(size) for size in os.environ.get('PROFILE_IMAGE_SIZES', '64,128,256').split(',') if size
+    )
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+    IMAGE_QUEUE_SIZE = int(os.environ.get('IMAGE_QUEUE_SIZE', 32))
+    
+    # 직접 업로드 저장소 (local | s3) 및 업로드 URL 유효 시간(초)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+    STORAGE_S3_BUCKET = os.environ.get('STORAGE_S3_BUCKET')
+    STORAGE_S3_REGION = os.environ.get('STORAGE_S3_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+    # S3 호환 저장소(MinIO, moto 서버 등) 주소
+    STORAGE_S3_ENDPOINT_URL = os.environ.get('STORAGE_S3_ENDPOINT_URL')
+    STORAGE_PUBLIC_BASE_URL = os.environ.get('STORAGE_PUBLIC_BASE_URL')
+    UPLOAD_INTENT_EXPIRES = int(os.environ.get('UPLOAD_INTENT_EXPIRES', 300))
+    
+    # 업로드 파일 제공 방식 (direct | x-accel-redirect | x-sendfile)
+    UPLOADS_SERVE_MODE = os.environ.get('UPLOADS_SERVE_MODE', 'direct')
+    UPLOADS_ACCEL_PREFIX = os.environ.get('UPLOADS_ACCEL_PREFIX', '/_protected_uploads/')
+    # 내용 해시가 아닌 파일의 캐시 시간(초)
+    UPLOADS_DEFAULT_MAX_AGE = int(os.environ.get('UPLOADS_DEFAULT_MAX_AGE', 300))
+    
+    # 로그인 시 Cognito GetUser 추가 호출 여부 (기본: IdToken에서 사용자 정보 추출)
+    COGNITO_LOGIN_FETCH_USER_INFO = os.environ.get('COGNITO_LOGIN_FETCH_USER_INFO', 'false').lower() == 'true'
+    
     # 로깅 설정
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    # 출력 형식 (json: JSON Lines, text: 기존 텍스트 형식)
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    # 요청 처리 중 로그의 레벨별 기록 비율 (예: 'INFO=0.1,WARNING=0.5', 지정하지 않은 레벨은 모두 기록)
+    LOG_SAMPLE_RATES = {
+        level.strip().upper(): float(rate)
+        for level, _, rate in (
+            item.partition('=') for item in os.environ.get('LOG_SAMPLE_RATES', '').split(',') if item.strip()
+        )
+    }
+    # 요청마다 접근 로그(메서드, 경로, 상태, 지연 시간) 기록 여부
+    LOG_ACCESS = os.environ.get('LOG_ACCESS', 'true').lower() == 'true'
+    # 기록 대기 큐 크기 (가득 차면 요청 스레드를 막지 않고 버림)
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
     LOG_FILE = os.environ.get('LOG_FILE', '/app/logs/user_service.log')
     
+    # Prometheus 지표 (멀티 프로세스 서버에서는 PROMETHEUS_MULTIPROC_DIR도 지정, metrics.py 참고)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_PATH = os.environ.get('METRICS_PATH', '/metrics')
+    
+    # 관리자용 샘플링 프로파일러 (/api/v1/admin/profiler, 기본: 꺼짐)
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    # 요청 프로파일링 작업을 워커 간에 공유하는 디렉터리 (기본: 임시 디렉터리/user-service-profiler)
+    PROFILER_DIR = os.environ.get('PROFILER_DIR')
+    # 워커가 작업 목록을 다시 읽는 간격(초), 구간 샘플링 최대 시간(초), 요청 프로파일링 작업 최대 보존 시간(초)
+    PROFILER_POLL_SECONDS = float(os.environ.get('PROFILER_POLL_SECONDS', 1))
+    PROFILER_MAX_SECONDS = float(os.environ.get('PROFILER_MAX_SECONDS', 60))
+    PROFILER_MAX_TTL = int(os.environ.get('PROFILER_MAX_TTL', 3600))
+    
+    # 응답 JSON 인코더 (auto: orjson 설치 시 orjson, orjson | stdlib, json_provider.py 참고)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
     # 서버 설정
     HOST = os.environ.get('HOST', '0.0.0.0')
     PORT = int(os.environ.get('PORT', 8081))
+    
+    # 운영 서버 설정 (flask serve, gunicorn)
+    # 워커 수 0: CPU 수 기준 자동 (gthread/gevent는 코어당 1개, sync는 2*코어+1)
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 0))
+    SERVER_WORKER_CLASS = os.environ.get('SERVER_WORKER_CLASS', 'gthread')
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 8))
+    SERVER_WORKER_CONNECTIONS = int(os.environ.get('SERVER_WORKER_CONNECTIONS', 1000))
+    # 워커를 교체할 요청 수 (워커들이 동시에 재시작하지 않도록 jitter만큼 무작위로 분산)
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 10000))
+    SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 1000))
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 30))
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+    SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))
 
 class TestConfig(Config):
     """테스트용 설정"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_BINDS = {}
 
 class DevelopmentConfig(Config):
     """개발 환경 설정"""
     DEBUG = True
     SQLALCHEMY_ECHO = True
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.SQLALCHEMY_DATABASE_URI, pool_size=2, max_overflow=3)
 
 class ProductionConfig(Config):
     """운영 환경 설정"""
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.SQLALCHEMY_DATABASE_URI, pool_size=10, max_overflow=20)
+    # 운영 환경의 워커는 DDL을 실행하지 않음 (배포 시 flask bootstrap)
+    DATABASE_SCHEMA_MODE = os.environ.get('DATABASE_SCHEMA_MODE', 'migrate')
+    DATABASE_QUERY_HEADERS = False
     # 운영 환경에서는 반드시 환경 변수로 설정
     SECRET_KEY = os.environ.get('SECRET_KEY')
@@ -0,0 +1,142 @@
+"""
+JSON Provider
+orjson으로 응답 JSON을 인코딩하는 Flask JSON 제공자입니다. (JSON_PROVIDER, 기본: auto)
+
+- auto: orjson이 설치되어 있으면 orjson, 없으면 Flask 기본 제공자(json 모듈)
+- orjson: orjson 사용 (미설치 시 경고 후 기본 제공자)
+- stdlib: Flask 기본 제공자
+
+응답 본문은 기본 제공자와 바이트 단위로 같습니다. (정렬된 키, 압축 구분자, ASCII 이스케이프, 끝의 줄바꿈)
+- 비 ASCII 문자(와 DEL)는 json 모듈과 같은 \\uXXXX(서로게이트 쌍 포함) 형식으로 다시 이스케이프
+- datetime/date/dataclass/Decimal 등은 기본 제공자의 default()로 변환 (date는 HTTP 날짜 형식)
+- orjson이 처리할 수 없거나 결과가 달라질 수 있는 값은 json 모듈로 다시 인코딩:
+  문자열이 아닌 키, 64비트를 넘는 정수, 지수 표기 float, 깊은 중첩, 디버그 모드(들여쓰기) 출력
+단, NaN/Infinity는 json 모듈과 달리 null로 인코딩됩니다. (표준 JSON이 아니므로 응답에 사용하지 않음)
+"""
+
+import re
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 미설치 환경
+    orjson = None
+
+JSON_PROVIDERS = ('auto', 'orjson', 'stdlib')
+
+# json 모듈(ensure_ascii=True)은 비 ASCII 문자와 DEL도 \uXXXX로 이스케이프 (제어 문자는 orjson도 같은 형식)
+# 'backslashreplace'는 U+0100 이상 BMP 문자를 같은 형식으로 바꾸므로 \xNN(U+0080-U+00FF)과
+# \UNNNNNNNN(비 BMP 문자)만 다시 변환 (앞의 역슬래시가 \\ 이스케이프의 일부이면 그대로 둠)
+_LATIN1_ESCAPE = re.compile(rb'\\x[0-9a-f]{2}')
+_ASTRAL_ESCAPE = re.compile(rb'\\U[0-9a-f]{8}')
+_ASTRAL_LEAD = re.compile(b'[\xf0-\xf4]')
+
+# json 모듈과 표기가 다른 float: 지수 표기(1e+16 / 1e16), 1e-5 미만(1e-05 / 0.00001)
+# 리터럴로 시작하는 패턴만 사용 (문자 집합으로 시작하면 본문 전체를 바이트마다 확인하므로 느림)
+_EXPONENT = re.compile(rb'e[-\d]')
+_SMALL_FLOAT = re.compile(rb'0\.0000\d')
+
+_COMPACT_SEPARATORS = (',', ':')
+
+
+def _fix_escape(match):
+    data, start = match.string, match.start()
+    index = start
+    while index and data[index - 1] == 0x5c:
+        index -= 1
+    if (start - index) % 2:
+        # 문자열에 있던 역슬래시 다음의 'x'/'U' (\\xNN)
+        return match.group()
+
+    sequence = match.group()
+    if sequence[1:2] == b'x':
+        return b'\\u00' + sequence[2:]
+    code = int(sequence[2:], 16) - 0x10000
+    return b'\\u%04x\\u%04x' % (0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+
+def _float_mismatch(data):
+    """json 모듈과 다르게 표기된 float가 있으면 True (문자열 안의 우연한 일치는 json 모듈로 인코딩할 뿐)"""
+    for match in _EXPONENT.finditer(data):
+        if data[match.start() - 1:match.start()].isdigit():
+            return True
+    for match in _SMALL_FLOAT.finditer(data):
+        before = data[max(match.start() - 2, 0):match.start()]
+        if before[-1:] in (b':', b',', b'[') or before in (b':-', b',-', b'[-'):
+            return True
+    return False
+
+
+def escape_non_ascii(data):
+    """UTF-8 JSON 바이트의 비 ASCII 문자를 json 모듈(ensure_ascii)과 같은 형식으로 이스케이프합니다."""
+    if data.isascii():
+        return data.replace(b'\x7f', b'\\u007f') if b'\x7f' in data else data
+
+    # 다시 변환할 문자가 있는지는 UTF-8 첫 바이트로 확인 (U+0080-U+00FF: C2/C3, 비 BMP: F0-F4)
+    latin1 = b'\xc2' in data or b'\xc3' in data
+    astral = _ASTRAL_LEAD.search(data) is not None
+    data = data.decode('utf-8').encode('ascii', 'backslashreplace')
+    if latin1:
+        data = _LATIN1_ESCAPE.sub(_fix_escape, data)
+    if astral:
+        data = _ASTRAL_ESCAPE.sub(_fix_escape, data)
+    return data.replace(b'\x7f', b'\\u007f') if b'\x7f' in data else data
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson 기반 JSON 제공자 (설정/출력은 DefaultJSONProvider와 동일)"""
+
+    name = 'orjson'
+
+    def _encode(self, obj):
+        """압축 형식 JSON 바이트 (orjson으로 같은 결과를 낼 수 없으면 None)"""
+        if isinstance(obj, float):
+            return None
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:
+            # 문자열이 아닌 키, 큰 정수, 지원하지 않는 타입 등 (json 모듈로 다시 시도)
+            return None
+        if _float_mismatch(data):
+            return None
+        return escape_non_ascii(data) if self.ensure_ascii else data
+
+    def dumps(self, obj, **kwargs):
+        # 압축 형식만 orjson으로 인코딩 (들여쓰기/기본 구분자/추가 옵션은 json 모듈)
+        if kwargs.keys() == {'separators'} and tuple(kwargs['separators']) == _COMPACT_SEPARATORS:
+            data = self._encode(obj)
+            if data is not None:
+                return data.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        data = self._encode(obj)
+        if data is None:
+            data = super().dumps(obj, separators=_COMPACT_SEPARATORS).encode('utf-8')
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """JSON_PROVIDER 설정에 따라 앱의 JSON 제공자를 교체합니다."""
+    name = (app.config.get('JSON_PROVIDER') or 'auto').lower()
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON provider: {name} (choose from {', '.join(JSON_PROVIDERS)})")
+
+    if name == 'stdlib':
+        return app.json
+
+    if orjson is None:
+        if name == 'orjson':
+            app.logger.warning("JSON_PROVIDER=orjson but orjson is not installed, using the stdlib provider")
+        return app.json
+
+    app.json = OrjsonProvider(app)
+    return app.json
@@ -0,0 +1,252 @@
+"""
+JWKS Key Store
+Cognito User Pool의 공개키(JWKS)를 메모리에 캐시하고 갱신을 관리합니다.
+
+- TTL 기반 메모리 캐시 + 만료 전 백그라운드 갱신
+- 알 수 없는 kid 요청 시 1회 재조회 (최소 간격 제한, 동시 요청은 하나의 조회를 공유)
+- 디스크 사본 저장: 콜드 워커가 네트워크 없이 토큰을 검증할 수 있도록 함
+- 원격 URL(https/http) 외에 로컬 JWKS 파일(file:// 또는 경로)도 지원
+- key_parser가 주어지면 키 로딩 시점에 JWK를 검증용 키 객체로 미리 변환
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyStore:
+    """JWKS 공개키 저장소"""
+
+    def __init__(self, url, cache_path=None, ttl=3600, refresh_margin=300,
+                 min_refetch_interval=30, timeout=5, key_parser=None):
+        self.url = url
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self.key_parser = key_parser
+
+        self._keys = {}
+        self._parsed_keys = {}
+        self._expires_at = 0.0
+        self._last_fetch_attempt = 0.0
+
+        # 단일 조회(single-flight) 제어
+        self._lock = threading.Lock()
+        self._inflight = None
+
+        # 백그라운드 갱신 스레드
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+
+        self.stats = {
+            'fetches': 0,
+            'fetch_errors': 0,
+            'kid_misses': 0,
+            'disk_loads': 0,
+        }
+
+    # ==================== 조회 ====================
+
+    def get_key(self, kid):
+        """kid에 해당하는 JWK를 반환합니다. 없으면 제한된 재조회 후 None"""
+        return self._lookup(kid, parsed=False)
+
+    def get_parsed_key(self, kid):
+        """kid에 해당하는 변환된 키 객체를 반환합니다. (key_parser가 없으면 JWK)"""
+        return self._lookup(kid, parsed=True)
+
+    def _lookup(self, kid, parsed):
+        table = self._parsed_keys if parsed else self._keys
+        key = table.get(kid)
+        if key is not None:
+            return key
+
+        self.stats['kid_misses'] += 1
+
+        # 진행 중인 조회가 있으면 그 결과를 기다리고, 없으면 최소 간격 내 재조회는 생략
+        if self._inflight is None and not self._can_refetch():
+            return None
+
+        self.refresh()
+        table = self._parsed_keys if parsed else self._keys
+        return table.get(kid)
+
+    def keys(self):
+        """현재 보유 중인 JWK 딕셔너리 (kid -> JWK)"""
+        return dict(self._keys)
+
+    def is_expired(self):
+        return time.time() >= self._expires_at
+
+    def _can_refetch(self):
+        return time.time() - self._last_fetch_attempt >= self.min_refetch_interval
+
+    # ==================== 로딩/갱신 ====================
+
+    def load(self):
+        """디스크 사본 또는 로컬 파일에서 키를 불러오고, 필요하면 갱신을 예약합니다."""
+        if self._is_local_source():
+            self.refresh()
+            return bool(self._keys)
+
+        if self._load_from_disk():
+            logger.info("Loaded %d JWKS keys from %s", len(self._keys), self.cache_path)
+
+        self.start_background_refresh()
+        return bool(self._keys)
+
+    def refresh(self):
+        """JWKS를 다시 가져옵니다. 동시에 호출되면 진행 중인 조회 결과를 공유합니다."""
+        with self._lock:
+            inflight = self._inflight
+            leader = inflight is None
+            if leader:
+                inflight = self._inflight = threading.Event()
+
+        if not leader:
+            inflight.wait(self.timeout)
+            return bool(self._keys)
+
+        try:
+            self._last_fetch_attempt = time.time()
+            jwks = self._fetch()
+            self._set_keys(jwks, fetched_at=time.time())
+            self.stats['fetches'] += 1
+            self._save_to_disk(jwks)
+            return True
+        except Exception as e:
+            self.stats['fetch_errors'] += 1
+            # 갱신 실패 시 기존 키(만료되었더라도)를 계속 사용
+            logger.warning("Error fetching JWKS from %s: %s", self.url, e)
+            return False
+        finally:
+            with self._lock:
+                self._inflight = None
+            inflight.set()
+
+    def _fetch(self):
+        if self._is_local_source():
+            with open(self._local_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        import requests
+
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _set_keys(self, jwks, fetched_at):
+        keys = {}
+        parsed_keys = {}
+        for key in jwks.get('keys', []):
+            kid = key['kid']
+            if self.key_parser:
+                try:
+                    parsed_keys[kid] = self.key_parser(key)
+                except Exception as e:
+                    logger.warning("Skipping unusable JWK %s: %s", kid, e)
+                    continue
+            else:
+                parsed_keys[kid] = key
+            keys[kid] = key
+
+        # 참조 교체만으로 갱신하므로 읽는 쪽은 잠금이 필요 없음
+        self._parsed_keys = parsed_keys
+        self._keys = keys
+        self._expires_at = fetched_at + self.ttl
+
+    def _is_local_source(self):
+        return not self.url.startswith(('http://', 'https://'))
+
+    def _local_path(self):
+        if self.url.startswith('file://'):
+            return self.url[len('file://'):]
+        return self.url
+
+    # ==================== 디스크 사본 ====================
+
+    def _load_from_disk(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+
+            if cached.get('url') != self.url:
+                return False
+
+            self._set_keys(cached['jwks'], fetched_at=cached.get('fetched_at', 0))
+            self.stats['disk_loads'] += 1
+            return True
+        except Exception as e:
+            logger.warning("Failed to load JWKS cache %s: %s", self.cache_path, e)
+            return False
+
+    def _save_to_disk(self, jwks):
+        if not self.cache_path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'url': self.url,
+                    'fetched_at': time.time(),
+                    'jwks': jwks,
+                }, f)
+            # 원자적 교체 (동시에 쓰는 워커가 있어도 깨진 파일이 남지 않음)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning("Failed to write JWKS cache %s: %s", self.cache_path, e)
+
+    # ==================== 백그라운드 갱신 ====================
+
+    def start_background_refresh(self):
+        """만료 전에 키를 갱신하는 데몬 스레드를 시작합니다."""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop,
+            name='jwks-refresh',
+            daemon=True
+        )
+        self._refresh_thread.start()
+
+    def stop(self):
+        """백그라운드 갱신 스레드를 중지합니다."""
+        self._stop_event.set()
+        if self._refresh_thread and self._refresh_thread is not threading.current_thread():
+            self._refresh_thread.join(timeout=1)
+        self._refresh_thread = None
+
+    def reset_after_fork(self):
+        """fork된 자식 프로세스에서 락과 갱신 스레드를 새로 준비합니다. (불러온 키는 유지)"""
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+        if not self._is_local_source():
+            self.start_background_refresh()
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            delay = self._expires_at - self.refresh_margin - time.time()
+            if delay > 0:
+                if self._stop_event.wait(delay):
+                    return
+                continue
+
+            if not self.refresh():
+                # 실패 시 최소 재조회 간격만큼 대기 후 재시도
+                if self._stop_event.wait(self.min_refetch_interval):
+                    return
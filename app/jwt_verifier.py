@@ -0,0 +1,203 @@
+"""
+JWT Verifier
+Cognito JWT 서명 및 클레임 검증 백엔드입니다.
+
+- cryptography: 키 로딩 시 JWK를 RSA 공개키 객체로 한 번만 변환해 두고,
+  서명과 iss/aud/exp/token_use 클레임을 직접 검증합니다. (기본값)
+- jose: 기존 python-jose 검증 경로 (cryptography가 없을 때의 대체 경로)
+
+두 백엔드는 같은 토큰에 대해 같은 결과를 내도록 python-jose의
+기본 클레임 검증 규칙을 그대로 따릅니다.
+"""
+
+import os
+import json
+import base64
+import calendar
+from datetime import datetime
+from collections.abc import Mapping
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+except ImportError:  # pragma: no cover - cryptography 미설치 환경
+    rsa = None
+
+SUPPORTED_ALGORITHMS = ('RS256',)
+
+
+class JWTVerificationError(Exception):
+    """JWT 검증 실패"""
+
+
+def _b64url_decode(segment):
+    segment = segment.encode('ascii') if isinstance(segment, str) else segment
+    return base64.urlsafe_b64decode(segment + b'=' * (-len(segment) % 4))
+
+
+def _b64url_to_int(value):
+    return int.from_bytes(_b64url_decode(value), 'big')
+
+
+class BaseVerifier:
+    """검증 백엔드 공통 인터페이스"""
+
+    name = None
+
+    def __init__(self, issuer, audience, allowed_token_use=None):
+        self.issuer = issuer
+        self.audience = audience
+        self.allowed_token_use = tuple(allowed_token_use) if allowed_token_use else None
+
+    def parse_key(self, jwk):
+        """키 저장소가 키를 불러올 때 JWK를 백엔드용 키 객체로 변환합니다."""
+        return jwk
+
+    def verify(self, token, get_key, token_use=None):
+        """토큰을 검증하고 payload를 반환합니다. get_key(kid)는 parse_key 결과를 반환해야 합니다.
+
+        token_use를 지정하면 허용 목록 대신 해당 용도의 토큰만 허용합니다.
+        """
+        raise NotImplementedError
+
+    def _validate_token_use(self, claims, token_use=None):
+        allowed = (token_use,) if token_use else self.allowed_token_use
+        if allowed and claims.get('token_use') not in allowed:
+            raise JWTVerificationError("Invalid token_use")
+
+
+class JoseVerifier(BaseVerifier):
+    """python-jose 기반 검증 (기존 동작)"""
+
+    name = 'jose'
+
+    def verify(self, token, get_key, token_use=None):
+        from jose import jwt
+
+        header = jwt.get_unverified_header(token)
+        kid = header['kid']
+
+        key = get_key(kid)
+        if key is None:
+            raise JWTVerificationError("Invalid token: Key ID not found")
+
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=list(SUPPORTED_ALGORITHMS),
+            audience=self.audience,
+            issuer=self.issuer
+        )
+        self._validate_token_use(claims, token_use)
+        return claims
+
+
+class CryptographyVerifier(BaseVerifier):
+    """미리 변환된 RSA 공개키로 직접 검증"""
+
+    name = 'cryptography'
+
+    def __init__(self, issuer, audience, allowed_token_use=None):
+        if rsa is None:
+            raise RuntimeError("cryptography package is not installed")
+        super().__init__(issuer, audience, allowed_token_use)
+        self._padding = padding.PKCS1v15()
+        self._hash = hashes.SHA256()
+
+    def parse_key(self, jwk):
+        if jwk.get('kty') != 'RSA':
+            raise ValueError(f"Unsupported key type: {jwk.get('kty')}")
+        return rsa.RSAPublicNumbers(
+            _b64url_to_int(jwk['e']),
+            _b64url_to_int(jwk['n'])
+        ).public_key()
+
+    def verify(self, token, get_key, token_use=None):
+        try:
+            signing_input, signature_segment = token.rsplit('.', 1)
+            header_segment, payload_segment = signing_input.split('.', 1)
+            header = json.loads(_b64url_decode(header_segment))
+            signature = _b64url_decode(signature_segment)
+        except (ValueError, TypeError, UnicodeError) as e:
+            raise JWTVerificationError(f"Malformed token: {e}")
+
+        if not isinstance(header, Mapping):
+            raise JWTVerificationError("Invalid header")
+        if header.get('alg') not in SUPPORTED_ALGORITHMS:
+            raise JWTVerificationError("The specified alg value is not allowed")
+
+        key = get_key(header['kid'])
+        if key is None:
+            raise JWTVerificationError("Invalid token: Key ID not found")
+
+        try:
+            key.verify(signature, signing_input.encode('ascii'), self._padding, self._hash)
+        except (InvalidSignature, UnicodeError):
+            raise JWTVerificationError("Signature verification failed")
+
+        try:
+            claims = json.loads(_b64url_decode(payload_segment))
+        except (ValueError, TypeError, UnicodeError) as e:
+            raise JWTVerificationError(f"Invalid payload: {e}")
+
+        if not isinstance(claims, Mapping):
+            raise JWTVerificationError("Invalid payload string: must be a json object")
+
+        self._validate_claims(claims)
+        self._validate_token_use(claims, token_use)
+        return claims
+
+    def _validate_claims(self, claims):
+        """python-jose jwt.decode 기본 옵션과 동일한 클레임 검증"""
+        now = calendar.timegm(datetime.utcnow().utctimetuple())
+
+        for claim in ('iat', 'nbf', 'exp'):
+            if claim in claims:
+                try:
+                    int(claims[claim])
+                except ValueError:
+                    raise JWTVerificationError(f"{claim} claim must be an integer")
+
+        if 'nbf' in claims and int(claims['nbf']) > now:
+            raise JWTVerificationError("The token is not yet valid (nbf)")
+
+        if 'exp' in claims and int(claims['exp']) < now:
+            raise JWTVerificationError("Signature has expired")
+
+        if 'aud' in claims:
+            audience_claims = claims['aud']
+            if isinstance(audience_claims, str):
+                audience_claims = [audience_claims]
+            if not isinstance(audience_claims, list):
+                raise JWTVerificationError("Invalid claim format in token")
+            if any(not isinstance(c, str) for c in audience_claims):
+                raise JWTVerificationError("Invalid claim format in token")
+            if self.audience not in audience_claims:
+                raise JWTVerificationError("Invalid audience")
+
+        if self.issuer is not None and claims.get('iss') != self.issuer:
+            raise JWTVerificationError("Invalid issuer")
+
+        for claim in ('sub', 'jti'):
+            if claim in claims and not isinstance(claims[claim], str):
+                raise JWTVerificationError(f"Invalid {claim} claim")
+
+
+VERIFIERS = {
+    JoseVerifier.name: JoseVerifier,
+    CryptographyVerifier.name: CryptographyVerifier,
+}
+
+
+def create_verifier(issuer, audience, backend=None, allowed_token_use=None):
+    """설정된 백엔드의 검증기를 생성합니다. (auto: cryptography 우선, 없으면 jose)"""
+    backend = (backend or os.getenv('COGNITO_JWT_BACKEND', 'auto')).lower()
+
+    if backend == 'auto':
+        backend = CryptographyVerifier.name if rsa is not None else JoseVerifier.name
+
+    if backend not in VERIFIERS:
+        raise ValueError(f"Unknown JWT verifier backend: {backend}")
+
+    return VERIFIERS[backend](issuer, audience, allowed_token_use=allowed_token_use)
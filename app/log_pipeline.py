@@ -0,0 +1,271 @@
+"""
+Log Pipeline
+요청 스레드에서는 로그 레코드를 큐에 넣기만 하고, 파일/콘솔 기록은 별도 스레드(QueueListener)에서
+수행하는 로깅 파이프라인입니다.
+
+- JSON Lines 형식(LOG_FORMAT=json, 기본) 또는 기존 텍스트 형식(LOG_FORMAT=text)
+- 요청 처리 중 기록된 레코드에 request_id(X-Request-ID), user_id(Cognito sub),
+  latency_ms(요청 시작 후 경과 시간)를 추가
+- 요청 처리 중의 대량 로그는 레벨별 비율(LOG_SAMPLE_RATES)로 샘플링
+  (시작/백그라운드 스레드 로그는 항상 기록, 기록된 레코드에는 sample_rate 표시)
+- 큐가 가득 차면 요청 스레드를 막지 않고 레코드를 버림 (dropped 수 집계)
+"""
+
+import os
+import copy
+import json
+import time
+import uuid
+import queue
+import random
+import atexit
+import logging
+import weakref
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, request, has_request_context
+
+# 파이프라인을 연결할 모듈 로거 (app.logger 외)
+SERVICE_LOGGERS = ('user', 'cognito_config', 'cognito_auth', 'jwks_store', 'schema', 'server')
+
+# 레코드에 있으면 JSON에 포함하는 필드
+CONTEXT_FIELDS = ('request_id', 'user_id', 'latency_ms', 'method', 'path', 'status', 'sample_rate')
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+
+
+class JSONFormatter(logging.Formatter):
+    """레코드를 한 줄의 JSON으로 변환합니다."""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        data['source'] = f"{record.module}:{record.lineno}"
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = record.stack_info
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RequestLogFilter(logging.Filter):
+    """요청 컨텍스트 필드를 추가하고 요청 중 레코드를 레벨별로 샘플링합니다.
+
+    QueueHandler에 연결되어 로그를 기록한 스레드에서 실행됩니다. (리스너 스레드에는 요청 컨텍스트가 없음)
+    """
+
+    def __init__(self, sample_rates=None):
+        super().__init__()
+        # {레벨 번호: 기록 비율(0~1)}
+        self.sample_rates = {
+            logging.getLevelName(level) if isinstance(level, str) else level: rate
+            for level, rate in (sample_rates or {}).items()
+        }
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+
+        rate = self.sample_rates.get(record.levelno)
+        if rate is not None:
+            if random.random() >= rate:
+                self.sampled_out += 1
+                return False
+            record.sample_rate = rate
+
+        record.request_id = g.get('request_id')
+        user = getattr(request, 'cognito_user', None)
+        if user and not getattr(record, 'user_id', None):
+            record.user_id = user.get('sub')
+        started = g.get('request_started')
+        if started is not None and getattr(record, 'latency_ms', None) is None:
+            record.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 메시지/예외는 기록한 스레드에서 문자열로 만들고, 형식 변환은 리스너의 formatter가 수행
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """큐 핸들러와 파일/콘솔 핸들러를 연결하는 리스너 (app.extensions['log_pipeline'])"""
+
+    def __init__(self, handlers, sample_rates=None, queue_size=10000):
+        self.handlers = handlers
+        self.queue_size = queue_size
+        self.queue_handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        self.request_filter = RequestLogFilter(sample_rates)
+        self.queue_handler.addFilter(self.request_filter)
+        self.listener = None
+        self.loggers = []
+        self._lock = threading.Lock()
+
+        # fork된 자식 프로세스에는 리스너 스레드가 없으므로 새 큐와 리스너로 다시 시작
+        if hasattr(os, 'register_at_fork'):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: ref() and ref()._after_fork())
+
+    def attach(self, logger, level):
+        logger.addHandler(self.queue_handler)
+        logger.setLevel(level)
+        self.loggers.append(logger)
+
+    def start(self):
+        with self._lock:
+            if self.listener is None:
+                self.listener = QueueListener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+                self.listener.start()
+
+    def stop(self):
+        """남은 레코드를 모두 기록하고 리스너를 중지합니다."""
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+
+    def close(self):
+        self.stop()
+        for logger in self.loggers:
+            logger.removeHandler(self.queue_handler)
+        for handler in self.handlers:
+            handler.close()
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        if self.listener is None:
+            return
+        self.listener = None
+        self.queue_handler.queue = queue.Queue(self.queue_size)
+        self.start()
+
+    def stats(self):
+        return {
+            'queued': self.queue_handler.queue.qsize(),
+            'dropped': self.queue_handler.dropped,
+            'sampled_out': self.request_filter.sampled_out,
+        }
+
+
+def _request_id():
+    value = request.headers.get(REQUEST_ID_HEADER, '')
+    # 전달받은 ID는 형식이 안전할 때만 사용 (로그/헤더 주입 방지)
+    if 0 < len(value) <= 128 and value.replace('-', '').replace('_', '').replace('.', '').isalnum():
+        return value
+    return uuid.uuid4().hex
+
+
+def init_logging(app, log_file):
+    """파일/콘솔 핸들러를 큐 리스너 뒤에 두고 app.logger와 모듈 로거를 큐에 연결합니다."""
+    from flask.logging import default_handler
+
+    level = logging.getLevelName(str(app.config.get('LOG_LEVEL', 'INFO')).upper())
+    if app.config.get('LOG_FORMAT', 'json') == 'json':
+        file_formatter = console_formatter = JSONFormatter()
+    else:
+        file_formatter = logging.Formatter(TEXT_FORMAT)
+        console_formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
+
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=10240000,  # 10MB
+        backupCount=10
+    )
+    file_handler.setFormatter(file_formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(console_formatter)
+
+    # 이전에 생성된 앱(테스트/벤치마크에서 create_app 반복 호출)의 파이프라인 정리
+    previous = _pipelines.pop(app.name, None)
+    if previous:
+        previous.close()
+
+    pipeline = LogPipeline(
+        [file_handler, console_handler],
+        sample_rates=app.config.get('LOG_SAMPLE_RATES'),
+        queue_size=app.config.get('LOG_QUEUE_SIZE', 10000)
+    )
+    # Flask 기본 핸들러(동기 stderr 기록)는 콘솔 핸들러로 대체
+    app.logger.removeHandler(default_handler)
+    pipeline.attach(app.logger, level)
+    for name in SERVICE_LOGGERS:
+        logger = logging.getLogger(name)
+        pipeline.attach(logger, level)
+        logger.propagate = False
+    pipeline.start()
+
+    _pipelines[app.name] = pipeline
+    app.extensions['log_pipeline'] = pipeline
+
+    access_logger = app.logger.getChild('access')
+    access_enabled = app.config.get('LOG_ACCESS', True)
+
+    @app.before_request
+    def start_request_log():
+        g.request_id = _request_id()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def finish_request_log(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        if access_enabled and g.get('request_started') is not None:
+            access_logger.info(
+                f"{request.method} {request.path} {response.status_code}",
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'latency_ms': round((time.perf_counter() - g.request_started) * 1000, 2),
+                }
+            )
+        return response
+
+    return pipeline
+
+
+# 앱 이름별 활성 파이프라인
+_pipelines = {}
+
+
+@atexit.register
+def _flush_pipelines():
+    for pipeline in list(_pipelines.values()):
+        pipeline.stop()
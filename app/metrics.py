@@ -0,0 +1,234 @@
+"""
+Prometheus Metrics
+요청/Cognito 호출/캐시 지표를 수집하여 Prometheus 텍스트 형식(GET /metrics)으로 제공합니다.
+
+- 요청 수, 지연 시간 히스토그램 (blueprint, endpoint, method[, status]별), 처리 중인 요청 수
+- Cognito 호출 시간과 오류 수 (operation별, CognitoConfig 메서드에 연결)
+- 토큰 캐시/사용자 식별 캐시의 hit/miss 수와 hit ratio
+
+gunicorn 워커처럼 여러 프로세스에서 실행할 때는 서버 시작 전에 PROMETHEUS_MULTIPROC_DIR
+(비어 있는 쓰기 가능한 디렉터리)을 지정해야 합니다. 각 워커가 지표를 이 디렉터리의 파일에 기록하고,
+/metrics는 요청을 받은 워커와 관계없이 모든 워커의 값을 합산하여 응답합니다.
+prometheus_client가 설치되어 있지 않으면 지표 수집 없이 동작합니다.
+"""
+
+import os
+import time
+from functools import wraps
+
+from flask import Response, g, request
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+    )
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - prometheus_client 미설치 환경
+    Counter = None
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+NAMESPACE = 'user_service'
+
+# hit/miss 수를 내보낼 캐시 (app.extensions 키 -> cache 라벨)
+CACHES = {'token_cache': 'token', 'identity_cache': 'identity'}
+
+
+if Counter is not None:
+    REQUESTS = Counter(
+        'http_requests', 'HTTP requests by endpoint and status',
+        ['blueprint', 'endpoint', 'method', 'status'], namespace=NAMESPACE
+    )
+    REQUEST_LATENCY = Histogram(
+        'http_request_duration_seconds', 'HTTP request latency by endpoint',
+        ['blueprint', 'endpoint', 'method'], namespace=NAMESPACE
+    )
+    REQUESTS_IN_PROGRESS = Gauge(
+        'http_requests_in_progress', 'HTTP requests currently being handled',
+        ['blueprint', 'endpoint'], namespace=NAMESPACE, multiprocess_mode='livesum'
+    )
+    COGNITO_LATENCY = Histogram(
+        'cognito_call_duration_seconds', 'Cognito call latency by operation',
+        ['operation'], namespace=NAMESPACE
+    )
+    COGNITO_ERRORS = Counter(
+        'cognito_call_errors', 'Failed Cognito calls by operation',
+        ['operation', 'error'], namespace=NAMESPACE
+    )
+    CACHE_HITS = Counter('cache_hits', 'Cache hits', ['cache'], namespace=NAMESPACE)
+    CACHE_MISSES = Counter('cache_misses', 'Cache misses', ['cache'], namespace=NAMESPACE)
+    CACHE_ENTRIES = Gauge(
+        'cache_entries', 'Cached entries (summed over live workers)',
+        ['cache'], namespace=NAMESPACE, multiprocess_mode='livesum'
+    )
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+def observe_cognito_call(operation):
+    """CognitoConfig 메서드의 호출 시간과 오류를 기록하는 데코레이터
+
+    메서드는 ClientError를 None 반환으로 처리하므로 None 결과도 오류(failed)로 집계합니다.
+    """
+    def decorator(f):
+        if Counter is None:
+            return f
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = f(*args, **kwargs)
+            except Exception as e:
+                COGNITO_ERRORS.labels(operation, type(e).__name__).inc()
+                raise
+            finally:
+                COGNITO_LATENCY.labels(operation).observe(time.perf_counter() - started)
+            if result is None:
+                COGNITO_ERRORS.labels(operation, 'failed').inc()
+            return result
+        return wrapper
+    return decorator
+
+
+class CacheStatsExporter:
+    """캐시 객체의 hits/misses 누적값을 프로세스별 카운터 증가분으로 옮깁니다.
+
+    캐시는 자체 카운터만 가지므로, 요청이 끝날 때 이전에 옮긴 값과의 차이만 더합니다.
+    (카운터로 기록해야 여러 워커의 값이 합산됨)
+    """
+
+    def __init__(self):
+        self._exported = {}
+
+    def export(self, extensions):
+        for key, label in CACHES.items():
+            cache = extensions.get(key)
+            if cache is None:
+                continue
+
+            stats = cache.stats()
+            hits, misses = stats['hits'], stats['misses']
+            cache_id, last_hits, last_misses = self._exported.get(label, (None, 0, 0))
+            if cache_id != id(cache) or hits < last_hits or misses < last_misses:
+                # 새로 생성되었거나 초기화된 캐시는 현재 값부터 다시 집계
+                last_hits = last_misses = 0
+            if hits > last_hits:
+                CACHE_HITS.labels(label).inc(hits - last_hits)
+            if misses > last_misses:
+                CACHE_MISSES.labels(label).inc(misses - last_misses)
+            CACHE_ENTRIES.labels(label).set(stats['entries'])
+            self._exported[label] = (id(cache), hits, misses)
+
+
+class _ScrapeCollector:
+    """수집된 지표에 캐시별 hit ratio(전체 워커 합산 기준)를 더해 내보냅니다."""
+
+    def __init__(self, source):
+        self.source = source
+
+    def collect(self):
+        totals = {}
+        for family in self.source.collect():
+            if family.name in (f'{NAMESPACE}_cache_hits', f'{NAMESPACE}_cache_misses'):
+                kind = family.name.rsplit('_', 1)[1]
+                for sample in family.samples:
+                    if sample.name.endswith('_total'):
+                        counts = totals.setdefault(sample.labels['cache'], {'hits': 0, 'misses': 0})
+                        counts[kind] += sample.value
+            yield family
+
+        ratio = GaugeMetricFamily(
+            f'{NAMESPACE}_cache_hit_ratio', 'Cache hit ratio since start (all workers)', labels=['cache']
+        )
+        for cache, counts in sorted(totals.items()):
+            total = counts['hits'] + counts['misses']
+            ratio.add_metric([cache], counts['hits'] / total if total else 0.0)
+        yield ratio
+
+
+def render_metrics():
+    """Prometheus 텍스트 형식의 지표 (멀티프로세스 모드에서는 모든 워커 합산)"""
+    if multiprocess_enabled():
+        source = CollectorRegistry()
+        multiprocess.MultiProcessCollector(source)
+    else:
+        source = REGISTRY
+
+    registry = CollectorRegistry()
+    registry.register(_ScrapeCollector(source))
+    return generate_latest(registry)
+
+
+def clear_multiprocess_dir():
+    """이전 실행에서 남은 지표 파일을 지웁니다. (서버 시작 시 master에서 호출, 현재 프로세스 파일은 유지)"""
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    if not directory or not os.path.isdir(directory):
+        return 0
+
+    removed = 0
+    suffix = f'_{os.getpid()}.db'
+    for name in os.listdir(directory):
+        if name.endswith('.db') and not name.endswith(suffix):
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+
+def mark_process_dead(pid):
+    """종료된 워커의 livesum 게이지 파일을 정리합니다. (gunicorn child_exit 훅)"""
+    if Counter is not None and multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app):
+    """요청 지표 수집 훅과 지표 엔드포인트(METRICS_PATH)를 등록합니다."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+    if Counter is None:
+        app.logger.warning('prometheus_client is not installed; metrics are disabled')
+        return None
+
+    metrics_path = app.config.get('METRICS_PATH', '/metrics')
+    exporter = CacheStatsExporter()
+    app.extensions['metrics'] = exporter
+
+    @app.before_request
+    def start_request_metrics():
+        if request.path == metrics_path:
+            return
+        # 라우트에 매칭되지 않은 요청(404 등)은 하나의 라벨로 묶어 라벨 수 증가 방지
+        g.metrics_labels = (request.blueprint or '', request.endpoint or 'unmatched')
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(*g.metrics_labels).inc()
+
+    def record(status):
+        started = g.pop('metrics_started')
+        blueprint, endpoint = g.metrics_labels
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, endpoint, request.method, status).inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_started' in g:
+            record(str(response.status_code))
+        exporter.export(app.extensions)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if 'metrics_labels' not in g:
+            return
+        if 'metrics_started' in g:
+            # after_request까지 도달하지 못한 요청 (처리되지 않은 예외)
+            record('500')
+        REQUESTS_IN_PROGRESS.labels(*g.pop('metrics_labels')).dec()
+
+    @app.route(metrics_path, methods=['GET'])
+    def metrics():
+        """Prometheus 지표"""
+        return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+    return exporter
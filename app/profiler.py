@@ -0,0 +1,311 @@
+"""
+On-demand Sampling Profiler
+운영 중인 워커의 스택을 주기적으로 수집하는 샘플링 프로파일러입니다. (PROFILER_ENABLED, 기본: 꺼짐)
+
+- 구간 샘플링: 요청을 받은 워커의 모든 스레드 스택을 N초 동안 수집 (POST /api/v1/admin/profiler/sample)
+- 요청 프로파일링: 지정한 라우트와 일치하는 다음 K개 요청의 처리 스레드 스택만 수집
+  (POST /api/v1/admin/profiler/requests, 결과는 모든 워커의 요청을 합쳐서 조회)
+- 출력: collapsed stacks(flamegraph.pl, speedscope 등에서 사용) 또는 speedscope JSON
+
+요청 프로파일링 작업은 PROFILER_DIR의 파일로 워커 간에 공유됩니다.
+각 워커는 요청 시 최대 PROFILER_POLL_SECONDS마다 작업 목록을 다시 읽고, 요청 슬롯은
+파일 생성(O_EXCL)으로 한 번씩만 할당되므로 여러 워커가 나눠 처리해도 합계가 K개를 넘지 않습니다.
+비활성화 시 훅/라우트를 등록하지 않습니다. (gevent 워커에서는 OS 스레드 스택만 수집)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import tempfile
+import threading
+from collections import Counter
+
+from flask import g, request
+
+FORMATS = ('collapsed', 'speedscope')
+
+# 대기 중인 스레드로 보고 제외할 최상위(leaf) 함수 (idle=true로 포함)
+IDLE_FUNCTIONS = frozenset((
+    'wait', 'select', 'poll', 'epoll', 'accept', 'sleep', 'recv_into', 'readinto',
+    '_wait_for_tstate_lock', 'serve_forever', 'wait_for_ready',
+))
+
+_FRAME_PATTERN = re.compile(r'^(?P<name>.*) \((?P<file>.*):(?P<line>\d+)\)$')
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _stack(frame):
+    """바깥 호출부터 현재 함수까지의 프레임 이름 튜플"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+class StackSampler(threading.Thread):
+    """interval초마다 sys._current_frames()로 스레드 스택을 수집합니다.
+
+    thread_ids를 지정하면 해당 스레드만, 아니면 샘플러/제외 스레드를 뺀 모든 스레드를 수집합니다.
+    """
+
+    def __init__(self, interval=0.005, thread_ids=None, exclude=(), idle=False, thread_names=False):
+        super().__init__(name='profiler-sampler', daemon=True)
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.exclude = set(exclude)
+        self.idle = idle
+        self.thread_names = thread_names
+        self.counts = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self.started_at = time.perf_counter()
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            names = {thread.ident: thread.name for thread in threading.enumerate()} if self.thread_names else None
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or thread_id in self.exclude:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                if not self.idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                    continue
+                stack = _stack(frame)
+                if names is not None:
+                    stack = (f"thread {names.get(thread_id, thread_id)}",) + stack
+                self.counts[stack] += 1
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.counts
+
+
+def to_collapsed(counts):
+    """'바깥;...;안쪽 횟수' 형식의 텍스트 (많이 수집된 스택부터)"""
+    return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in counts.most_common())
+
+
+def parse_collapsed(text, counts=None):
+    counts = Counter() if counts is None else counts
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        stack, _, count = line.rpartition(' ')
+        if stack and count.isdigit():
+            counts[tuple(stack.split(';'))] += int(count)
+    return counts
+
+
+def to_speedscope(counts, interval, name):
+    """speedscope 파일 형식(sampled profile)으로 변환합니다. (https://www.speedscope.app)"""
+    frames = []
+    index = {}
+    samples = []
+    weights = []
+    for stack, count in counts.most_common():
+        sample = []
+        for label in stack:
+            if label not in index:
+                index[label] = len(frames)
+                match = _FRAME_PATTERN.match(label)
+                frame = {'name': match['name'], 'file': match['file'], 'line': int(match['line'])} \
+                    if match else {'name': label}
+                frames.append(frame)
+            sample.append(index[label])
+        samples.append(sample)
+        weights.append(round(count * interval, 6))
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': round(sum(weights), 6),
+            'samples': samples,
+            'weights': weights,
+        }],
+        'name': name,
+        'exporter': 'user-service-profiler',
+    }
+
+
+class RequestProfileJobs:
+    """요청 프로파일링 작업 저장소 (PROFILER_DIR, 같은 호스트의 모든 워커가 공유)
+
+    <id>.job.json: 작업 설정, <id>.slot<n>: 할당된 요청 슬롯, <id>.<n>.stacks: 요청별 결과
+    """
+
+    def __init__(self, directory, poll_seconds=1.0):
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self._active = []
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def create(self, route, count, interval, ttl):
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'route': route,
+            'count': count,
+            'interval': interval,
+            'created_at': time.time(),
+            'expires_at': time.time() + ttl,
+        }
+        # 다른 워커가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 이름 변경
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._path(f"{job['id']}.job.json"))
+        self._loaded_at = 0.0
+        return job
+
+    def get(self, job_id):
+        if not re.fullmatch(r'[0-9a-f]{12}', job_id or ''):
+            return None
+        try:
+            with open(self._path(f'{job_id}.job.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def active(self):
+        """현재 워커가 확인할 작업 목록 (poll_seconds마다 디렉터리를 다시 읽음)"""
+        now = time.monotonic()
+        if now - self._loaded_at < self.poll_seconds:
+            return self._active
+
+        with self._lock:
+            if now - self._loaded_at >= self.poll_seconds:
+                jobs = []
+                wall = time.time()
+                try:
+                    names = [name for name in os.listdir(self.directory) if name.endswith('.job.json')]
+                except OSError:
+                    names = []
+                for name in names:
+                    job = self.get(name.split('.', 1)[0])
+                    if job and job['expires_at'] > wall and self.claimed(job['id']) < job['count']:
+                        jobs.append(job)
+                self._active = jobs
+                self._loaded_at = now
+        return self._active
+
+    def match(self, rule, endpoint):
+        for job in self.active():
+            if job['route'] in (rule, endpoint):
+                return job
+        return None
+
+    def claim(self, job):
+        """요청 슬롯 하나를 할당합니다. (모든 슬롯이 할당되었으면 None)"""
+        for slot in range(job['count']):
+            try:
+                os.close(os.open(self._path(f"{job['id']}.slot{slot}"), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return slot
+            except FileExistsError:
+                continue
+        # 다 찬 작업은 다음 목록 갱신 전까지 다시 확인하지 않음
+        with self._lock:
+            self._active = [active for active in self._active if active['id'] != job['id']]
+        return None
+
+    def claimed(self, job_id):
+        return sum(1 for name in os.listdir(self.directory) if name.startswith(f'{job_id}.slot'))
+
+    def save(self, job_id, slot, header, counts):
+        path = self._path(f'{job_id}.{slot}.stacks')
+        with open(path + '.tmp', 'w') as f:
+            f.write(f"# {header}\n")
+            f.write(to_collapsed(counts))
+        os.replace(path + '.tmp', path)
+
+    def results(self, job_id):
+        """(요청 요약 목록, 합친 스택 횟수)"""
+        requests = []
+        counts = Counter()
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith(f'{job_id}.') and name.endswith('.stacks'):
+                with open(self._path(name)) as f:
+                    text = f.read()
+                first_line = text.split('\n', 1)[0]
+                if first_line.startswith('# '):
+                    requests.append(first_line[2:])
+                parse_collapsed(text, counts)
+        return requests, counts
+
+    def delete(self, job_id):
+        for name in os.listdir(self.directory):
+            if name.startswith(f'{job_id}.'):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+        self._loaded_at = 0.0
+
+
+def init_profiler(app):
+    """PROFILER_ENABLED일 때만 관리자 프로파일링 라우트와 요청 프로파일링 훅을 등록합니다."""
+    if not app.config.get('PROFILER_ENABLED', False):
+        return None
+
+    from profiler_routes import bp
+
+    jobs = RequestProfileJobs(
+        app.config.get('PROFILER_DIR') or os.path.join(tempfile.gettempdir(), 'user-service-profiler'),
+        poll_seconds=app.config.get('PROFILER_POLL_SECONDS', 1.0)
+    )
+    app.extensions['profiler'] = jobs
+    app.register_blueprint(bp)
+
+    @app.before_request
+    def start_request_profile():
+        if request.url_rule is None or request.blueprint == bp.name:
+            return
+        job = jobs.match(request.url_rule.rule, request.endpoint)
+        if job is None:
+            return
+        slot = jobs.claim(job)
+        if slot is None:
+            return
+        sampler = StackSampler(job['interval'], thread_ids=[threading.get_ident()], idle=True)
+        sampler.start()
+        g.request_profile = (job['id'], slot, sampler, time.perf_counter())
+
+    @app.teardown_request
+    def finish_request_profile(exc):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return
+        job_id, slot, sampler, started = profile
+        counts = sampler.stop()
+        header = (
+            f"{request.method} {request.full_path.rstrip('?')} pid={os.getpid()} "
+            f"duration_ms={(time.perf_counter() - started) * 1000:.1f} samples={sum(counts.values())}"
+        )
+        try:
+            jobs.save(job_id, slot, header, counts)
+        except OSError as e:
+            app.logger.warning(f"Failed to save request profile {job_id}: {e}")
+
+    return jobs
@@ -0,0 +1,206 @@
+"""
+Profiler Routes
+관리자용 샘플링 프로파일러 엔드포인트입니다. (PROFILER_ENABLED일 때만 등록, profiler.py 참고)
+
+    # 요청을 받은 워커를 10초 동안 샘플링 (speedscope JSON)
+    POST /api/v1/admin/profiler/sample?seconds=10&format=speedscope
+
+    # /api/v1/search의 다음 20개 요청을 프로파일링 (모든 워커)
+    POST /api/v1/admin/profiler/requests  {"route": "/api/v1/search", "count": 20}
+    GET  /api/v1/admin/profiler/requests/<job_id>                      # 진행 상황
+    GET  /api/v1/admin/profiler/requests/<job_id>/profile?format=collapsed
+    DELETE /api/v1/admin/profiler/requests/<job_id>
+"""
+
+import os
+import json
+import time
+import threading
+
+from flask import Blueprint, Response, request, jsonify, current_app
+
+from profiler import FORMATS, StackSampler, to_collapsed, to_speedscope
+from user.auth import admin_required
+from cognito_auth import cognito_jwt_required
+
+bp = Blueprint("profiler", __name__, url_prefix="/api/v1/admin/profiler")
+
+# 요청 프로파일링 작업당 최대 요청 수
+MAX_REQUEST_COUNT = 1000
+
+
+def _profile_response(counts, interval, fmt, name):
+    if fmt == 'speedscope':
+        body = json.dumps(to_speedscope(counts, interval, name))
+        response = Response(body, mimetype='application/json')
+    else:
+        response = Response(to_collapsed(counts), mimetype='text/plain')
+    response.headers['X-Profiler-PID'] = str(os.getpid())
+    return response
+
+
+def _interval(args):
+    # 1ms 미만은 샘플링 자체가 워커 CPU를 크게 사용하므로 제한
+    return min(max(float(args.get('interval_ms', 5)), 1.0), 1000.0) / 1000
+
+
+@bp.post("/sample")
+@cognito_jwt_required
+@admin_required
+def sample_worker():
+    """요청을 받은 워커의 모든 스레드를 지정한 시간 동안 샘플링합니다."""
+    try:
+        args = request.get_json(silent=True) or request.args
+        if not isinstance(args, dict):  # request.args(MultiDict)도 dict
+            return jsonify({
+                "error": "Request body must be a JSON object"
+            }), 400
+        fmt = args.get('format', 'collapsed')
+        if fmt not in FORMATS:
+            return jsonify({
+                "error": f"format must be one of {', '.join(FORMATS)}"
+            }), 400
+
+        seconds = float(args.get('seconds', 10))
+        max_seconds = current_app.config.get('PROFILER_MAX_SECONDS', 60)
+        if not 0 < seconds <= max_seconds:
+            return jsonify({
+                "error": f"seconds must be between 0 and {max_seconds}"
+            }), 400
+        idle = str(args.get('idle', 'false')).lower() == 'true'
+
+        sampler = StackSampler(_interval(args), exclude=[threading.get_ident()], idle=idle, thread_names=True)
+        sampler.start()
+        time.sleep(seconds)
+        counts = sampler.stop()
+
+        current_app.logger.info(
+            f"Profiled worker {os.getpid()} for {seconds}s ({sampler.samples} samples)"
+        )
+        return _profile_response(counts, sampler.interval, fmt, f"worker {os.getpid()} ({seconds}s)")
+
+    except ValueError:
+        return jsonify({
+            "error": "seconds and interval_ms must be numbers"
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Profiler sampling error: {str(e)}")
+        return jsonify({
+            "error": "Failed to profile worker"
+        }), 500
+
+
+@bp.post("/requests")
+@cognito_jwt_required
+@admin_required
+def create_request_profile():
+    """라우트(URL 규칙 또는 엔드포인트 이름)와 일치하는 다음 count개 요청을 프로파일링합니다."""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({
+                "error": "Request body must be a JSON object"
+            }), 400
+        route = data.get('route')
+        if not route:
+            return jsonify({
+                "error": "route is required (e.g. /api/v1/search or user.search_users)"
+            }), 400
+
+        count = int(data.get('count', 10))
+        if not 0 < count <= MAX_REQUEST_COUNT:
+            return jsonify({
+                "error": f"count must be between 1 and {MAX_REQUEST_COUNT}"
+            }), 400
+
+        # 작업 보존 시간은 설정한 최대값까지만 허용 (만료되지 않은 작업이 쌓이지 않도록)
+        ttl = int(data.get('ttl', 600))
+        if ttl <= 0:
+            return jsonify({
+                "error": "ttl must be positive"
+            }), 400
+        ttl = min(ttl, current_app.config.get('PROFILER_MAX_TTL', 3600))
+
+        known = {rule.rule for rule in current_app.url_map.iter_rules()} | set(current_app.view_functions)
+        if route not in known:
+            return jsonify({
+                "error": f"Unknown route: {route}"
+            }), 400
+
+        job = current_app.extensions['profiler'].create(
+            route, count, _interval(data), ttl
+        )
+        return jsonify({"job": job}), 201
+
+    except ValueError:
+        return jsonify({
+            "error": "count, ttl and interval_ms must be numbers"
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Profiler job creation error: {str(e)}")
+        return jsonify({
+            "error": "Failed to create profiling job"
+        }), 500
+
+
+@bp.get("/requests/<job_id>")
+@cognito_jwt_required
+@admin_required
+def get_request_profile(job_id):
+    """요청 프로파일링 진행 상황"""
+    jobs = current_app.extensions['profiler']
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({
+            "error": "Profiling job not found"
+        }), 404
+
+    requests, _ = jobs.results(job_id)
+    return jsonify({
+        "job": job,
+        "claimed": jobs.claimed(job_id),
+        "completed": len(requests),
+        "expired": job['expires_at'] <= time.time(),
+        "requests": requests
+    }), 200
+
+
+@bp.get("/requests/<job_id>/profile")
+@cognito_jwt_required
+@admin_required
+def get_request_profile_stacks(job_id):
+    """완료된 요청들의 스택을 합친 결과 (collapsed 또는 speedscope)"""
+    jobs = current_app.extensions['profiler']
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({
+            "error": "Profiling job not found"
+        }), 404
+
+    fmt = request.args.get('format', 'collapsed')
+    if fmt not in FORMATS:
+        return jsonify({
+            "error": f"format must be one of {', '.join(FORMATS)}"
+        }), 400
+
+    requests, counts = jobs.results(job_id)
+    response = _profile_response(counts, job['interval'], fmt, f"{job['route']} ({len(requests)} requests)")
+    response.headers['X-Profiler-Requests'] = str(len(requests))
+    return response
+
+
+@bp.delete("/requests/<job_id>")
+@cognito_jwt_required
+@admin_required
+def delete_request_profile(job_id):
+    """작업과 결과 파일을 삭제합니다. (진행 중이면 이후 요청은 프로파일링하지 않음)"""
+    jobs = current_app.extensions['profiler']
+    if not jobs.get(job_id):
+        return jsonify({
+            "error": "Profiling job not found"
+        }), 404
+
+    jobs.delete(job_id)
+    return jsonify({
+        "message": "Profiling job deleted"
+    }), 200
@@ -0,0 +1,138 @@
+"""
+Database Schema Management
+데이터베이스 스키마 준비 방식(DATABASE_SCHEMA_MODE)을 담당합니다.
+
+- create (기본): 앱 생성 시 db.create_all()과 초기 사용자 생성을 수행 (로컬 개발용)
+- migrate: 스키마는 Flask-Migrate(migrations/)로만 변경하고, 배포 시 `flask bootstrap`을
+  한 번 실행하여 마이그레이션/검색 인덱스/초기 사용자를 준비합니다.
+  워커는 DDL 없이 alembic_version과 최신 리비전만 비교합니다. (불일치 시 /health/ready 503)
+"""
+
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import inspect
+
+from user.models import db, init_users
+from user.sharding import install_sharding
+from user.search import init_search, install_search, verify_search
+
+SCHEMA_MODES = ('create', 'migrate')
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# create_all()로 만든 users 테이블에 해당하는 첫 리비전
+BASELINE_REVISION = '3f1c2a9d7b10'
+
+
+def current_revisions(engine):
+    """DB에 기록된 리비전 (alembic_version, 마이그레이션 전이면 빈 집합)"""
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as conn:
+        return set(MigrationContext.configure(conn).get_current_heads())
+
+
+def head_revisions(directory=MIGRATIONS_DIR):
+    """마이그레이션 스크립트의 최신 리비전"""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(directory).get_heads())
+
+
+def check_schema(app):
+    """DB 스키마 버전이 최신 리비전과 같은지 확인합니다. (앱 컨텍스트 필요)
+
+    결과는 app.extensions['schema_status']에 저장되어 /health/ready에서 사용됩니다.
+    """
+    status = {'mode': 'migrate', 'current': [], 'head': [], 'up_to_date': False}
+    try:
+        current = current_revisions(db.engine)
+        head = head_revisions(app.extensions['migrate'].directory)
+        status.update(current=sorted(current), head=sorted(head), up_to_date=current == head)
+    except Exception as e:
+        status['error'] = str(e)
+        app.logger.error(f'Database schema check failed: {str(e)}')
+
+    if not status['up_to_date'] and 'error' not in status:
+        app.logger.error(
+            f"Database schema is at {status['current'] or 'no revision'}, expected {status['head']}; "
+            f"run 'flask bootstrap'"
+        )
+    app.extensions['schema_status'] = status
+    return status
+
+
+def create_schema(app):
+    """테이블/검색 인덱스/초기 사용자를 생성합니다. (create 모드, 앱 컨텍스트 필요)"""
+    try:
+        # 복제본(bind)은 복제로 스키마를 받으므로 primary에만 생성
+        db.create_all(bind_key=None)
+        install_sharding(app, db)
+        app.logger.info('Database tables created successfully')
+
+        # 검색 인덱스(FTS5 섀도 테이블/pg_trgm 인덱스) 준비
+        install_search(app)
+
+        # 초기 사용자 생성 시도
+        try:
+            init_users()
+            app.logger.info('Initial users created successfully')
+        except Exception as user_error:
+            app.logger.warning(f'Failed to create initial users: {str(user_error)}')
+
+    except Exception as e:
+        app.logger.error(f'Database initialization failed: {str(e)}')
+        # 데이터베이스 오류가 있어도 애플리케이션은 계속 실행
+        app.logger.warning('Continuing without database initialization')
+
+    app.extensions['schema_status'] = {'mode': 'create', 'up_to_date': True}
+
+
+def init_schema(app):
+    """DATABASE_SCHEMA_MODE에 따라 스키마를 준비하거나 버전만 확인합니다."""
+    mode = app.config.get('DATABASE_SCHEMA_MODE', 'create')
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"DATABASE_SCHEMA_MODE must be one of {', '.join(SCHEMA_MODES)}")
+
+    with app.app_context():
+        if mode == 'create':
+            create_schema(app)
+        else:
+            check_schema(app)
+            # 검색 인덱스가 준비되지 않았으면 ILIKE 검색으로 대체 (DDL 없이 확인만)
+            verify_search(app)
+
+
+def migrate_schema(app):
+    """마이그레이션을 최신 리비전까지 적용합니다. (앱 컨텍스트 필요)"""
+    from flask_migrate import upgrade, stamp
+
+    if not current_revisions(db.engine) and inspect(db.engine).has_table('users'):
+        # create 모드로 만든 기존 DB는 첫 리비전으로 표시한 뒤 이후 리비전만 적용
+        app.logger.info(f'Stamping existing database with baseline revision {BASELINE_REVISION}')
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+
+
+@click.command('bootstrap')
+@click.option('--skip-migrate', is_flag=True, help='마이그레이션(flask db upgrade)을 건너뜀')
+@with_appcontext
+def bootstrap_command(skip_migrate):
+    """배포 시 한 번 실행: 마이그레이션, 샤드/검색 인덱스, 초기 사용자를 준비합니다."""
+    app = current_app._get_current_object()
+    if not skip_migrate:
+        migrate_schema(app)
+
+    install_sharding(app, db)
+    # 앱 생성 시 인덱스가 없어 ILIKE로 대체되었을 수 있으므로 설정된 백엔드를 다시 선택
+    init_search(app)
+    install_search(app)
+    init_users()
+
+    status = check_schema(app)
+    click.echo(f"Database schema at {', '.join(status['current']) or 'no revision'}", err=True)
+    if not status['up_to_date']:
+        raise click.ClickException(f"Database schema is not at head {', '.join(status['head'])}")
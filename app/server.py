@@ -0,0 +1,173 @@
+"""
+User Service Production Server
+운영용 진입점입니다. gunicorn(pre-fork)으로 여러 워커 프로세스에서 앱을 실행합니다.
+
+    flask --app app serve --workers 4 --worker-class gthread --threads 8
+    kill -HUP <master pid>    # 설정을 다시 읽고 워커를 순서대로 교체 (진행 중인 요청은 완료)
+    kill -USR2 <master pid>   # 새 코드 배포: 새 master 실행 후 기존 master에 TERM
+
+- preload: master에서 생성한 앱을 fork하여 워커가 import된 모듈/공개키를 copy-on-write로 공유
+  (HUP은 워커만 교체하므로 코드 변경은 USR2로 반영)
+- 워커 모델: Cognito/DB 호출은 대부분 I/O 대기이므로 gthread(기본) 또는 gevent
+  (gevent는 preload 전에 master를 패치해야 하므로, 패치한 새 인터프리터에서 같은 명령을 다시 실행)
+- max_requests(+jitter): 일정 요청 수마다 워커를 교체하여 메모리 증가를 제한
+- 지표: PROMETHEUS_MULTIPROC_DIR을 지정하면 모든 워커의 지표를 합산하여 /metrics로 제공 (metrics.py)
+"""
+
+import os
+import sys
+import contextvars
+import importlib.util
+
+import click
+from flask.cli import pass_script_info
+
+import metrics
+from user.models import db
+
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+
+# gunicorn의 gevent 워커는 fork 이후에 패치하므로, master가 preload로 boto3/urllib3/ssl/threading을
+# 먼저 import하면 ssl RecursionError나 패치되지 않은 (블로킹) 락이 남음
+# -> 다른 모듈보다 먼저 패치하고 flask 명령을 그대로 다시 실행
+GEVENT_BOOTSTRAP = "from gevent import monkey; monkey.patch_all(); from flask.cli import main; main()"
+
+
+def default_workers(worker_class):
+    """CPU 수 기준 기본 워커 수 (스레드/greenlet 워커는 코어당 1개, sync는 2*코어+1)"""
+    cpus = os.cpu_count() or 1
+    if worker_class == 'sync':
+        return cpus * 2 + 1
+    return cpus
+
+
+def server_options(config, **overrides):
+    """앱 설정(SERVER_*)과 명령 인자로 gunicorn 설정을 만듭니다."""
+    options = {
+        'bind': f"{config.get('HOST', '0.0.0.0')}:{config.get('PORT', 8081)}",
+        'worker_class': config.get('SERVER_WORKER_CLASS', 'gthread'),
+        'workers': config.get('SERVER_WORKERS', 0),
+        'threads': config.get('SERVER_THREADS', 8),
+        'worker_connections': config.get('SERVER_WORKER_CONNECTIONS', 1000),
+        'max_requests': config.get('SERVER_MAX_REQUESTS', 10000),
+        'max_requests_jitter': config.get('SERVER_MAX_REQUESTS_JITTER', 1000),
+        'timeout': config.get('SERVER_TIMEOUT', 30),
+        'graceful_timeout': config.get('SERVER_GRACEFUL_TIMEOUT', 30),
+        'keepalive': config.get('SERVER_KEEPALIVE', 5),
+        'preload_app': True,
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+
+    if options['worker_class'] not in WORKER_CLASSES:
+        raise ValueError(f"SERVER_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}")
+    if not options['workers']:
+        options['workers'] = default_workers(options['worker_class'])
+    return options
+
+
+def gevent_patched():
+    """현재 프로세스가 gevent로 패치되었는지 확인합니다."""
+    if importlib.util.find_spec('gevent') is None:
+        raise click.ClickException("gevent is not installed; pip install gevent or use --worker-class gthread")
+    from gevent import monkey
+    return monkey.is_module_patched('socket') and monkey.is_module_patched('threading')
+
+
+def reexec_with_gevent():
+    """gevent로 먼저 패치한 새 인터프리터에서 같은 flask 명령을 실행합니다. (반환하지 않음)"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execv(sys.executable, [sys.executable, '-c', GEVENT_BOOTSTRAP, *sys.argv[1:]])
+
+
+def post_fork(server, worker):
+    """fork 직후 워커에서 master의 DB 연결을 재사용하지 않도록 연결 풀을 비웁니다."""
+    app = server.app.application
+    with app.app_context():
+        for engine in db.engines.values():
+            # 부모의 연결은 닫지 않고 버림 (master가 계속 소유)
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """요청을 받기 전에 워커별 Cognito 클라이언트와 공개키를 준비합니다."""
+    from cognito_config import cognito_config
+
+    if not cognito_config.warm_up():
+        worker.log.warning("Cognito public keys are not loaded; token verification will fail")
+
+
+def child_exit(server, worker):
+    """종료된 워커의 처리 중 요청/캐시 게이지를 지표 합산에서 제외합니다."""
+    metrics.mark_process_dead(worker.pid)
+
+
+def _load_gunicorn():
+    # gunicorn은 운영 서버 실행 시에만 필요 (개발 서버/CLI에서는 불필요)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise click.ClickException("gunicorn is not installed; pip install gunicorn")
+
+    class UserServiceServer(BaseApplication):
+        """이미 생성된 Flask 앱을 실행하는 gunicorn 애플리케이션"""
+
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+            self.cfg.set('post_fork', post_fork)
+            self.cfg.set('post_worker_init', post_worker_init)
+            self.cfg.set('child_exit', child_exit)
+
+        def load(self):
+            return self.application
+
+    return UserServiceServer
+
+
+@click.command('serve')
+@click.option('--bind', '-b', help='주소:포트 (기본: HOST:PORT 설정)')
+@click.option('--workers', '-w', type=int, help='워커 프로세스 수 (기본: SERVER_WORKERS, 0이면 CPU 수 기준)')
+@click.option('--worker-class', '-k', type=click.Choice(WORKER_CLASSES), help='워커 모델 (기본: gthread)')
+@click.option('--threads', type=int, help='gthread 워커당 스레드 수')
+@click.option('--max-requests', type=int, help='이 수만큼 요청을 처리한 워커를 교체 (0: 교체 안 함)')
+@click.option('--timeout', type=int, help='응답이 없는 워커를 재시작하기까지의 시간(초)')
+@click.option('--pid', 'pidfile', help='master PID 파일 (HUP/USR2 신호 전송용)')
+@pass_script_info
+def serve_command(info, bind, workers, worker_class, threads, max_requests, timeout, pidfile):
+    """운영용 멀티 프로세스 서버(gunicorn)로 앱을 실행합니다."""
+    UserServiceServer = _load_gunicorn()
+    app = info.load_app()
+
+    options = server_options(
+        app.config, bind=bind, workers=workers, worker_class=worker_class, threads=threads,
+        max_requests=max_requests, timeout=timeout, pidfile=pidfile
+    )
+    if options['worker_class'] == 'gevent' and not gevent_patched():
+        # 앱을 이미 import한 이 프로세스는 패치할 수 없으므로 (flask CLI가 먼저 앱을 불러옴)
+        click.echo("Restarting with gevent monkey patching applied before the app is imported", err=True)
+        reexec_with_gevent()
+
+    # master에서 공개키를 한 번 불러와 워커가 공유 (워커는 fork 이후 클라이언트만 새로 생성)
+    from cognito_config import cognito_config
+    cognito_config.warm_up()
+
+    # 이전 실행의 워커 지표 파일 정리 (새 master 기준으로 다시 집계)
+    if metrics.multiprocess_enabled():
+        metrics.clear_multiprocess_dir()
+    elif app.config.get('METRICS_ENABLED', True) and options['workers'] > 1:
+        app.logger.warning(
+            f"{metrics.MULTIPROC_DIR_ENV} is not set; /metrics will only report the worker that serves the scrape"
+        )
+
+    app.logger.info(
+        f"Starting User Service on {options['bind']} with {options['workers']} "
+        f"{options['worker_class']} workers"
+    )
+    # flask CLI가 push한 앱 컨텍스트 밖에서 실행 (sync 워커의 요청이 같은 컨텍스트/g를 공유하지 않도록)
+    contextvars.Context().run(UserServiceServer(app, options).run)
@@ -0,0 +1,52 @@
+"""
+Test Configuration
+테스트마다 임시 SQLite 파일(과 업로드 폴더)을 사용하는 앱을 생성합니다.
+
+실행: python -m pytest tests (app 디렉토리에서)
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app 모듈은 import 시 기본 설정으로 앱을 한 번 생성하므로 기본 DB/캐시 경로를 임시 디렉토리로
+_defaults = tempfile.mkdtemp(prefix='user-service-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_defaults, 'default.db')}")
+os.environ.setdefault('COGNITO_JWKS_CACHE_PATH', '')
+os.environ.setdefault('UPLOAD_FOLDER', os.path.join(_defaults, 'uploads'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """설정 값을 덮어쓴 앱을 생성하는 함수 (DB/업로드 폴더는 tmp_path 아래)"""
+    from config import Config
+    from app import create_app
+
+    def factory(**overrides):
+        database_uri = f"sqlite:///{tmp_path / 'primary.db'}"
+        settings = {
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': database_uri,
+            'SQLALCHEMY_BINDS': {},
+            'SQLALCHEMY_ENGINE_OPTIONS': {},
+            'DATABASE_REPLICA_URLS': [],
+            'SHARD_URLS': [],
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'STORAGE_BACKEND': 'local',
+            'METRICS_ENABLED': False,
+            'PROFILER_ENABLED': False,
+            'LOG_ACCESS': False,
+        }
+        settings.update(overrides)
+        return create_app(type('TestConfig', (Config,), settings))
+
+    return factory
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
@@ -0,0 +1,46 @@
+"""
+flask users import: 유효한 행은 적재하고 잘못된 행은 행 번호와 함께 보고하는지 확인합니다.
+"""
+
+import json
+from datetime import datetime
+
+from user.models import User
+
+
+def _write_ndjson(path, rows):
+    path.write_text(
+        '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows) + '\n',
+        encoding='utf-8'
+    )
+    return str(path)
+
+
+def test_import_reports_invalid_rows_and_loads_the_rest(app, tmp_path):
+    source = _write_ndjson(tmp_path / 'users.ndjson', [
+        {"username": "alice", "email": "alice@example.com", "created_at": "2026-01-01T09:00:00+09:00"},
+        {"username": 123, "email": "number@example.com"},
+        {"username": "bob", "email": "bob@example.com", "first_name": {"a": 1}},
+        {"username": "carol", "email": "carol@example.com", "phone": ["010-1234-5678"]},
+        {"username": "dave", "email": "dave@example.com", "is_active": [True]},
+        '{"username": "broken"',
+        {"username": "erin", "email": "erin@example.com", "bio": None, "is_verified": "yes"},
+    ])
+
+    result = app.test_cli_runner().invoke(args=['users', 'import', source])
+
+    assert result.exit_code == 1, result.output
+    assert "line 2: username must be a string" in result.output
+    assert "line 3: first_name must be a string" in result.output
+    assert "line 4: phone must be a string" in result.output
+    assert "line 5: is_active must be a scalar value" in result.output
+    assert "line 6: Invalid JSON" in result.output
+    assert "Imported 2/7 rows" in result.output
+    assert "5 errors" in result.output
+
+    with app.app_context():
+        imported = {user.username: user for user in User.query.filter(User.username != 'admin')}
+        assert sorted(imported) == ['alice', 'erin']
+        # 오프셋이 있는 시각은 UTC로 변환하여 저장
+        assert imported['alice'].created_at == datetime(2026, 1, 1, 0, 0)
+        assert imported['erin'].is_verified is True
@@ -0,0 +1,39 @@
+"""
+사용자 식별 캐시: 조회 도중의 무효화는 해당 사용자의 스냅샷만 버리는지 확인합니다.
+"""
+
+from user.identity_cache import IdentityCache
+
+
+def test_invalidating_another_user_keeps_in_flight_snapshot():
+    cache = IdentityCache()
+    generation = cache.generation
+    cache.invalidate('other-user')
+    cache.set('user', 'snapshot', generation=generation)
+    assert cache.get('user') == 'snapshot'
+
+
+def test_invalidating_same_user_discards_in_flight_snapshot():
+    cache = IdentityCache()
+    generation = cache.generation
+    cache.invalidate('user')
+    cache.set('user', 'stale', generation=generation)
+    assert cache.get('user') is None
+
+    cache.set('user', 'fresh', generation=cache.generation)
+    assert cache.get('user') == 'fresh'
+
+
+def test_clear_and_pruned_invalidations_discard_older_reads():
+    cache = IdentityCache(max_entries=2)
+    generation = cache.generation
+    cache.clear()
+    cache.set('user', 'stale', generation=generation)
+    assert cache.get('user') is None
+
+    # 무효화 기록이 정리된 뒤에도 그 이전에 시작한 조회는 저장하지 않음
+    generation = cache.generation
+    for user in ('a', 'b', 'c'):
+        cache.invalidate(user)
+    cache.set('a', 'stale', generation=generation)
+    assert cache.get('a') is None
@@ -0,0 +1,104 @@
+"""
+flask users rebalance: SQLite 샤드 파일 사이에서 사용자를 이동할 때
+grace 시간 동안의 쓰기가 유실되거나 더 오래된 값으로 덮어써지지 않는지 확인합니다.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from user.models import db, User
+from user.services import UserService
+from user.sharding import plan_moves, move_users, route_user, user_directory
+import user.sharding as sharding
+
+
+def _shard_settings(tmp_path, count):
+    urls = [f"sqlite:///{tmp_path / f'shard_{i}.db'}" for i in range(1, count + 1)]
+    return {
+        'SHARD_URLS': urls,
+        'SQLALCHEMY_BINDS': {f'shard_{i}': url for i, url in enumerate(urls, start=1)},
+    }
+
+
+def _shard_ids(key):
+    table = db.metadata.tables['users']
+    with db.engines[key].connect() as conn:
+        return {row.id for row in conn.execute(select(table.c.id))}
+
+
+def _bio(key, user_id):
+    table = db.metadata.tables['users']
+    with db.engines[key].connect() as conn:
+        return conn.execute(select(table.c.bio).where(table.c.id == user_id)).scalar()
+
+
+def _rebalanced_app(make_app, tmp_path, users=30):
+    """샤드 1개로 사용자를 만든 뒤 같은 파일에 샤드 2를 추가한 앱"""
+    app = make_app(**_shard_settings(tmp_path, 1))
+    with app.app_context():
+        for i in range(users):
+            UserService().create_user_from_cognito(f"user{i}", f"user{i}@example.com", f"sub-{i}")
+    return make_app(**_shard_settings(tmp_path, 2))
+
+
+def test_rebalance_command_moves_users_to_new_shard(make_app, tmp_path):
+    app = _rebalanced_app(make_app, tmp_path)
+    with app.app_context():
+        moves = plan_moves()
+        assert list(moves) == [('shard_1', 'shard_2')]
+        moving = set(moves[('shard_1', 'shard_2')])
+
+    result = app.test_cli_runner().invoke(args=['users', 'rebalance', '--grace', '0'])
+    assert result.exit_code == 0, result.output
+    assert f"Moved {len(moving)} users" in result.output
+
+    with app.app_context():
+        assert plan_moves() == {}
+        assert _shard_ids('shard_2') == moving
+        assert not _shard_ids('shard_1') & moving
+        # 이동한 사용자도 디렉터리를 통해 그대로 조회
+        for user_id in moving:
+            route_user('id', user_id)
+            assert db.session.get(User, user_id).id == user_id
+
+
+def test_rebalance_keeps_writes_made_during_grace_period(make_app, tmp_path, monkeypatch):
+    app = _rebalanced_app(make_app, tmp_path)
+    table = User.__table__
+
+    with app.app_context():
+        ids = plan_moves()[('shard_1', 'shard_2')]
+        assert len(ids) >= 3
+        source_only, both, target_only = ids[:3]
+
+        def writes_during_grace(seconds):
+            # 변경 전 디렉터리를 읽은 요청: 원본 샤드에 기록
+            with db.engines['shard_1'].begin() as conn:
+                for user_id in (source_only, both):
+                    conn.execute(
+                        update(table).where(table.c.id == user_id)
+                        .values(bio='late source write', updated_at=datetime.utcnow())
+                    )
+            # 디렉터리 변경 이후의 요청: 대상 샤드에 기록
+            for user_id in (both, target_only):
+                assert route_user('id', user_id) == 'shard_2'
+                User.query.filter_by(id=user_id).update({'bio': 'new target write'})
+                db.session.commit()
+
+        monkeypatch.setattr(sharding.time, 'sleep', writes_during_grace)
+        moved, conflicts = move_users('shard_1', 'shard_2', ids, grace=1.0)
+
+        assert moved == len(ids)
+        assert conflicts == [both]
+        # 대상 샤드가 바뀌지 않은 행만 원본의 늦은 쓰기로 갱신
+        assert _bio('shard_2', source_only) == 'late source write'
+        # 대상 샤드의 새 쓰기는 원본의 오래된 값으로 덮어쓰지 않음
+        assert _bio('shard_2', both) == 'new target write'
+        assert _bio('shard_2', target_only) == 'new target write'
+        assert not _shard_ids('shard_1') & set(ids)
+
+        shards = dict(db.session.execute(
+            select(user_directory.c.id, user_directory.c.shard).where(user_directory.c.id.in_(ids))
+        ).all())
+        assert set(shards.values()) == {'shard_2'}
@@ -0,0 +1,111 @@
+"""
+직접 업로드 저장소: S3 호환 저장소(moto)의 업로드 의도 -> 업로드 -> 확인 흐름과
+로컬 저장소의 업로드 URL 단일 사용/업로드 중 파일 비공개를 확인합니다.
+"""
+
+import io
+
+import pytest
+
+from user.images import ImageUploadError, ImageTooLarge
+from user.storage import S3Storage, ObjectExists, get_storage, new_avatar_key, verify_uploaded_avatar
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 56
+
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    moto = pytest.importorskip('moto')
+    for name, value in (('AWS_ACCESS_KEY_ID', 'testing'), ('AWS_SECRET_ACCESS_KEY', 'testing'),
+                        ('AWS_SESSION_TOKEN', 'testing'), ('AWS_DEFAULT_REGION', 'us-east-1')):
+        monkeypatch.setenv(name, value)
+
+    with moto.mock_aws():
+        storage = S3Storage(bucket='user-avatars', region='us-east-1')
+        storage.client.create_bucket(Bucket='user-avatars')
+        yield storage
+
+
+def _upload(storage, key, body, content_type='image/png'):
+    """발급받은 presigned POST로 클라이언트처럼 업로드합니다."""
+    import requests
+
+    intent = storage.create_upload_intent(key, content_type, max_bytes=1024, expires_in=300)
+    assert intent['method'] == 'POST'
+    response = requests.post(intent['url'], data=intent['fields'], files={'file': ('avatar', body, content_type)})
+    assert response.status_code in (200, 201, 204), response.text
+
+
+def test_s3_upload_intent_upload_and_verify(s3_storage):
+    key = new_avatar_key(1, 'image/png')
+    _upload(s3_storage, key, PNG)
+
+    info = verify_uploaded_avatar(s3_storage, 1, key, max_bytes=1024)
+    assert info.size == len(PNG)
+    assert info.content_type == 'image/png'
+    assert s3_storage.public_url(key) == f"https://user-avatars.s3.us-east-1.amazonaws.com/{key}"
+
+
+def test_s3_verify_rejects_and_deletes_invalid_objects(s3_storage):
+    not_image = new_avatar_key(1, 'image/png')
+    _upload(s3_storage, not_image, b'GIF89a' + b'\0' * 10)
+    with pytest.raises(ImageUploadError, match="not a valid image"):
+        verify_uploaded_avatar(s3_storage, 1, not_image, max_bytes=1024)
+    assert s3_storage.head(not_image) is None
+
+    too_large = new_avatar_key(1, 'image/png')
+    _upload(s3_storage, too_large, PNG)
+    with pytest.raises(ImageTooLarge, match="Image must be 32 bytes or smaller"):
+        verify_uploaded_avatar(s3_storage, 1, too_large, max_bytes=32)
+    assert s3_storage.head(too_large) is None
+
+    # 다른 사용자의 키나 업로드되지 않은 키는 확인하지 않음
+    with pytest.raises(ImageUploadError, match="Invalid upload key"):
+        verify_uploaded_avatar(s3_storage, 2, new_avatar_key(1, 'image/png'), max_bytes=1024)
+    with pytest.raises(ImageUploadError, match="not found"):
+        verify_uploaded_avatar(s3_storage, 1, new_avatar_key(1, 'image/png'), max_bytes=1024)
+
+
+class _SlowStream:
+    """첫 청크를 읽은 뒤(업로드 도중) on_read를 호출하는 요청 본문"""
+
+    def __init__(self, body, on_read):
+        self._body = io.BytesIO(body)
+        self._on_read = on_read
+
+    def read(self, size):
+        chunk = self._body.read(size)
+        if self._on_read:
+            self._on_read, on_read = None, self._on_read
+            on_read()
+        return chunk
+
+
+def test_local_upload_is_single_use_and_hidden_until_complete(app):
+    client = app.test_client()
+    key = new_avatar_key(1, 'image/png')
+    during_upload = []
+
+    def request_object_while_uploading():
+        during_upload.append(client.get(f"/uploads/{key}").status_code)
+        during_upload.append(client.get(f"/uploads/{key}.lock").status_code)
+
+    with app.test_request_context():
+        storage = get_storage()
+        assert storage.write_stream(key, _SlowStream(PNG, request_object_while_uploading), 1024) == len(PNG)
+        # 업로드가 끝나기 전에는 대상 경로가 없고 잠금 파일도 제공하지 않음 (빈 파일을 immutable로 캐시하지 않음)
+        assert during_upload == [404, 404]
+
+        with pytest.raises(ObjectExists):
+            storage.write_stream(key, io.BytesIO(b'overwrite'), 1024)
+
+        # 크기 초과로 실패한 업로드는 같은 URL로 다시 시도 가능
+        retry_key = new_avatar_key(1, 'image/png')
+        with pytest.raises(ImageTooLarge):
+            storage.write_stream(retry_key, io.BytesIO(PNG), 16)
+        assert storage.write_stream(retry_key, io.BytesIO(PNG), 1024) == len(PNG)
+
+    response = client.get(f"/uploads/{key}")
+    assert response.status_code == 200
+    assert response.data == PNG
+    assert 'immutable' in response.headers['Cache-Control']
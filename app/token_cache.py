@@ -0,0 +1,93 @@
+"""
+Verified Token Cache
+검증이 끝난 JWT 토큰의 payload를 캐시하는 LRU 캐시입니다.
+
+같은 액세스 토큰이 수명 동안 반복해서 전송되므로, 서명/클레임 검증은
+최초 1회만 수행하고 이후에는 토큰 다이제스트로 payload를 바로 조회합니다.
+항목은 토큰의 exp 시각이 지나면 더 이상 반환되지 않습니다.
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class VerifiedTokenCache:
+    """검증된 토큰 payload LRU 캐시"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token):
+        # 토큰 원문 대신 다이제스트를 키로 사용 (메모리 절약 및 원문 보관 방지)
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token):
+        """캐시된 payload를 반환합니다. 없거나 만료되었으면 None"""
+        key = self._digest(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            payload, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def set(self, token, payload):
+        """검증된 payload를 토큰의 exp까지 캐시합니다."""
+        try:
+            expires_at = float(payload['exp'])
+        except (KeyError, TypeError, ValueError):
+            # exp가 없는 토큰은 캐시하지 않음
+            return
+
+        if expires_at <= time.time():
+            return
+
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """캐시 통계"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+def init_token_cache(app):
+    """앱 설정에 따라 토큰 캐시를 등록합니다."""
+    if app.config.get('TOKEN_CACHE_ENABLED', True):
+        app.extensions['token_cache'] = VerifiedTokenCache(
+            max_entries=app.config.get('TOKEN_CACHE_MAX_ENTRIES', 10000)
+        )
+    else:
+        app.extensions.pop('token_cache', None)
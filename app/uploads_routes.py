@@ -0,0 +1,80 @@
+"""
+Uploads Serving Routes
+업로드된 파일(/uploads/...)을 제공하는 엔드포인트입니다.
+
+UPLOADS_SERVE_MODE 설정에 따라 파일 전송 방식을 선택합니다.
+- direct: 단독 실행 시 wsgi.file_wrapper(sendfile)로 전송, Range 요청 지원 (기본값)
+- x-accel-redirect: nginx가 파일을 직접 전송하도록 X-Accel-Redirect 헤더만 반환
+- x-sendfile: Apache/lighttpd 등이 파일을 직접 전송하도록 X-Sendfile 헤더만 반환
+
+nginx 예시 (UPLOADS_ACCEL_PREFIX=/_protected_uploads/):
+    location /_protected_uploads/ {
+        internal;
+        alias /app/uploads/;
+    }
+
+내용 해시로 저장된 파일(이미지 원본/아바타)은 내용이 바뀌지 않으므로
+`Cache-Control: immutable`로 장기 캐시합니다.
+"""
+
+import os
+import re
+import mimetypes
+from urllib.parse import quote
+
+from flask import Blueprint, current_app, send_from_directory, make_response, abort
+from werkzeug.security import safe_join
+
+bp = Blueprint("uploads", __name__)
+
+# images/<sha256>.<ext>, images/<sha256>_<size>.webp 또는 직접 업로드한 avatars/<id>/<uuid>.<ext>
+CONTENT_HASHED_PATH = re.compile(
+    r'^(images/[0-9a-f]{64}(_\d+)?|avatars/\d+/[0-9a-f]{32})\.(png|jpg|gif|webp)$'
+)
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def _upload_folder():
+    return os.path.abspath(current_app.config.get('UPLOAD_FOLDER', 'uploads'))
+
+
+def _cache_control(filename):
+    if CONTENT_HASHED_PATH.match(filename):
+        return IMMUTABLE_CACHE_CONTROL
+    return f"public, max-age={current_app.config.get('UPLOADS_DEFAULT_MAX_AGE', 300)}"
+
+
+@bp.get("/uploads/<path:filename>")
+def serve_upload(filename):
+    """업로드 파일 제공"""
+    folder = _upload_folder()
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    # 정규화한 경로로 판단 (images/./tmp/... 같은 우회 방지)
+    # 업로드 중인 임시 파일(.tmp)과 직접 업로드 잠금 파일(.lock)은 제공하지 않음
+    filename = os.path.relpath(path, folder).replace(os.sep, '/')
+    if filename.startswith('images/tmp/') or filename.endswith(('.tmp', '.lock')):
+        abort(404)
+
+    mode = current_app.config.get('UPLOADS_SERVE_MODE', 'direct')
+
+    if mode == 'x-accel-redirect':
+        # 프록시가 파일을 전송하므로 워커는 헤더만 반환
+        response = make_response('', 200)
+        prefix = current_app.config.get('UPLOADS_ACCEL_PREFIX', '/_protected_uploads/')
+        # 헤더 값이므로 URL 인코딩 (nginx가 디코딩하여 내부 위치를 찾음)
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(filename)
+        response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    elif mode == 'x-sendfile':
+        response = make_response('', 200)
+        response.headers['X-Sendfile'] = path
+        response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    else:
+        # conditional=True: Range/If-None-Match/If-Modified-Since 처리
+        response = send_from_directory(folder, filename, conditional=True)
+
+    response.headers['Cache-Control'] = _cache_control(filename)
+    return response
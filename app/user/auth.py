@@ -0,0 +1,31 @@
+"""
+User Service Authorization
+로컬 사용자 정보 기반 권한 확인 데코레이터입니다.
+"""
+
+from functools import wraps
+from flask import request, jsonify
+
+from .identity_cache import get_user_snapshot
+from cognito_auth import get_cognito_user_id
+
+
+def admin_required(f):
+    """관리자(인증된 로컬 사용자)만 접근을 허용하는 데코레이터
+
+    cognito_jwt_required 다음에 적용하며, 확인된 사용자 스냅샷은 request.current_user에 저장합니다.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        current_user = get_user_snapshot(get_cognito_user_id())
+
+        if not current_user or not current_user.is_verified:
+            return jsonify({
+                "error": "Unauthorized"
+            }), 403
+
+        request.current_user = current_user
+
+        return f(*args, **kwargs)
+
+    return decorated_function
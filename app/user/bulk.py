@@ -0,0 +1,362 @@
+"""
+User Bulk Import/Export
+사용자 대량 가져오기/내보내기 (flask users import/export 명령에서 사용)
+
+- 가져오기: CSV/NDJSON을 한 행씩 읽어 검증 후 배치 단위로 executemany 적재
+  (SQLite/PostgreSQL은 INSERT ... ON CONFLICT, MySQL은 ON DUPLICATE KEY UPDATE)
+- 배치에 제약 조건 위반이 있으면 해당 배치만 행 단위로 다시 적재하여 실패 행을 보고
+- 시각(last_login_at, created_at, updated_at)은 UTC naive로 저장, 오프셋이 있으면 UTC로 변환
+  (예: 2026-01-01T09:00:00+09:00 -> 2026-01-01 00:00:00, 오프셋이 없으면 UTC로 간주)
+- 내보내기: yield_per로 서버 측 커서에서 일정 개수씩 읽어 테이블 전체를 메모리에 올리지 않음
+"""
+
+import csv
+import json
+import time
+import heapq
+from datetime import datetime, timezone
+
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+
+from .models import db, User
+from .validators import UserValidator
+from .sharding import shard_engines
+
+# 가져오기 가능한 컬럼 (id는 대상 DB에서 새로 발급)
+IMPORT_COLUMNS = (
+    'username', 'email', 'cognito_user_id', 'bio', 'avatar_url', 'profile_image_url',
+    'is_active', 'is_verified', 'first_name', 'last_name', 'phone',
+    'last_login_at', 'created_at', 'updated_at',
+)
+
+# 내보내기 기본 컬럼
+EXPORT_COLUMNS = ('id',) + IMPORT_COLUMNS
+
+# 충돌 판단 기준으로 사용할 수 있는 고유 컬럼
+CONFLICT_KEYS = ('username', 'email', 'cognito_user_id')
+
+IMPORT_COLUMN_SET = frozenset(IMPORT_COLUMNS)
+REQUIRED_COLUMNS = ('username', 'email')
+
+TRUE_VALUES = ('1', 'true', 't', 'yes', 'y')
+FALSE_VALUES = ('0', 'false', 'f', 'no', 'n', '')
+
+
+def read_rows(fp, fmt):
+    """CSV/NDJSON 파일에서 (행 번호, dict)를 하나씩 읽습니다."""
+    if fmt == 'csv':
+        # 헤더가 1행이므로 데이터는 2행부터
+        for line_no, row in enumerate(csv.DictReader(fp), start=2):
+            yield line_no, row
+    elif fmt == 'ndjson':
+        for line_no, line in enumerate(fp, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _parse_bool(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid boolean: {value!r}")
+
+
+def parse_datetime(value):
+    if not value:
+        return None
+    # 'Z' 접미사 허용, 저장은 UTC naive (오프셋이 있으면 UTC로 변환)
+    # datetime 객체(코드에서 UserImporter에 넘긴 행)도 같은 규칙 적용
+    parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# 컬럼별 값 변환 (그 외 컬럼은 문자열 그대로)
+CONVERTERS = {
+    'is_active': _parse_bool,
+    'is_verified': _parse_bool,
+    'last_login_at': parse_datetime,
+    'created_at': parse_datetime,
+    'updated_at': parse_datetime,
+}
+
+# 문자열(또는 null)만 허용하는 컬럼 (NDJSON의 숫자/배열/객체 값은 행 오류로 보고)
+STRING_COLUMNS = frozenset(IMPORT_COLUMN_SET - CONVERTERS.keys())
+
+
+def normalize_row(raw, validator):
+    """입력 행을 users 컬럼 dict로 변환합니다. 유효하지 않으면 ValueError"""
+    if not isinstance(raw, dict):
+        raise ValueError("Row must be an object")
+
+    row = {}
+    for column, value in raw.items():
+        if column not in IMPORT_COLUMN_SET:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value and column not in REQUIRED_COLUMNS:
+                value = None
+        elif column in STRING_COLUMNS and value is not None:
+            raise ValueError(f"{column} must be a string")
+        elif isinstance(value, (list, dict)):
+            raise ValueError(f"{column} must be a scalar value")
+        converter = CONVERTERS.get(column)
+        row[column] = converter(value) if converter else value
+
+    result = validator.validate_import_row(row)
+    if not result['is_valid']:
+        raise ValueError('; '.join(result['errors']))
+    return row
+
+
+def build_upsert(table, key, on_conflict, columns):
+    """DB별 배치 INSERT 문을 생성합니다. (on_conflict: update | skip | error)"""
+    dialect = db.engine.dialect.name
+    update_columns = [c for c in columns if c not in (key, 'created_at')]
+
+    if on_conflict == 'error':
+        return insert(table)
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        if on_conflict == 'skip' or not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=[key])
+        return stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={c: stmt.excluded[c] for c in update_columns}
+        )
+
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        if on_conflict == 'skip' or not update_columns:
+            # 키 컬럼을 자기 자신으로 갱신하여 아무것도 바꾸지 않음
+            return stmt.on_duplicate_key_update({key: stmt.inserted[key]})
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+
+    raise ValueError(f"Upsert is not supported for {dialect}; use on_conflict='error'")
+
+
+class BatchResult:
+    """배치 적재 결과"""
+
+    def __init__(self, number, rows, written, errors, seconds):
+        self.number = number
+        self.rows = rows
+        self.written = written
+        # [(행 번호, 오류 메시지)]
+        self.errors = errors
+        self.seconds = seconds
+
+
+class UserImporter:
+    """검증된 행을 배치 단위로 적재하는 가져오기 작업"""
+
+    def __init__(self, key='username', on_conflict='update', batch_size=5000):
+        if key not in CONFLICT_KEYS:
+            raise ValueError(f"key must be one of {', '.join(CONFLICT_KEYS)}")
+        self.key = key
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+        self.validator = UserValidator()
+        self.table = User.__table__
+        self._statements = {}
+
+    def run(self, rows):
+        """(행 번호, dict) 스트림을 적재하며 배치마다 BatchResult를 반환합니다."""
+        batch = {}
+        errors = []
+        number = 0
+        started = time.perf_counter()
+
+        for line_no, raw in rows:
+            if isinstance(raw, Exception):
+                errors.append((line_no, f"Invalid JSON: {raw}"))
+                continue
+            try:
+                row = normalize_row(raw, self.validator)
+            except ValueError as e:
+                errors.append((line_no, str(e)))
+                continue
+            if row.get(self.key) is None:
+                errors.append((line_no, f"{self.key} is required"))
+                continue
+
+            # 같은 배치 안에서 같은 키가 반복되면 마지막 행을 사용
+            # (한 문장에서 같은 행을 두 번 갱신할 수 없음)
+            batch.pop(row[self.key], None)
+            batch[row[self.key]] = (line_no, row)
+
+            if len(batch) >= self.batch_size:
+                number += 1
+                yield self._flush(number, batch, errors, started)
+                batch, errors = {}, []
+                started = time.perf_counter()
+
+        if batch or errors:
+            number += 1
+            yield self._flush(number, batch, errors, started)
+
+    def _statement(self, columns):
+        if columns not in self._statements:
+            self._statements[columns] = build_upsert(self.table, self.key, self.on_conflict, columns)
+        return self._statements[columns]
+
+    def _groups(self, entries):
+        # executemany는 모든 파라미터의 키가 같아야 하므로 컬럼 구성별로 묶음
+        groups = {}
+        for line_no, row in entries:
+            groups.setdefault(tuple(sorted(row)), []).append((line_no, row))
+        return groups
+
+    def _prepare(self, row, now):
+        row.setdefault('updated_at', now)
+        row.setdefault('created_at', now)
+        return row
+
+    def _write(self, entries, errors):
+        """entries를 한 트랜잭션으로 적재합니다.
+
+        제약 조건 위반(키가 아닌 다른 고유 컬럼 충돌 등)이 있으면 반으로 나눠 다시 시도하여
+        실패한 행만 걸러냅니다. (실패 행이 적으면 O(k log n)번의 문장만 추가로 실행)
+        """
+        try:
+            written = 0
+            with db.engine.begin() as conn:
+                for columns, group in self._groups(entries).items():
+                    result = conn.execute(self._statement(columns), [row for _, row in group])
+                    written += max(result.rowcount, 0)
+            return written
+        except IntegrityError as e:
+            if len(entries) == 1:
+                errors.append((entries[0][0], f"Constraint violation: {e.orig}"))
+                return 0
+            middle = len(entries) // 2
+            return self._write(entries[:middle], errors) + self._write(entries[middle:], errors)
+
+    def _flush(self, number, batch, errors, started):
+        now = datetime.utcnow()
+        entries = [(line_no, self._prepare(row, now)) for line_no, row in batch.values()]
+        written = self._write(entries, errors) if entries else 0
+
+        errors.sort()
+        return BatchResult(number, len(entries) + len(errors), written, errors,
+                           time.perf_counter() - started)
+
+
+def iter_users(columns=EXPORT_COLUMNS, batch_size=5000, criteria=()):
+    """사용자 행을 id 순서로 스트리밍합니다. (서버 측 커서, batch_size개씩 가져옴)
+
+    샤딩 사용 시 샤드별 커서를 id 순서로 병합합니다. (id를 내보내지 않으면 샤드 순서대로)
+    """
+    table = User.__table__
+    stmt = select(*[table.c[c] for c in columns]).where(*criteria).order_by(table.c.id)
+
+    engines = shard_engines()
+    if engines is not None:
+        streams = [_iter_engine(engine, stmt, batch_size) for engine in engines]
+        if 'id' in columns:
+            index = list(columns).index('id')
+            yield from heapq.merge(*streams, key=lambda row: row[index])
+        else:
+            for stream in streams:
+                yield from stream
+        return
+
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+def _iter_engine(engine, stmt, batch_size):
+    with engine.connect() as conn:
+        yield from conn.execution_options(yield_per=batch_size).execute(stmt)
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return _export_value(value)
+
+
+class _LineBuffer:
+    """csv.writer가 기록한 한 줄을 돌려받기 위한 버퍼"""
+
+    def write(self, line):
+        return line
+
+
+def ndjson_lines(rows, columns):
+    """행을 NDJSON 줄(문자열)로 변환합니다."""
+    dumps = json.dumps
+    for row in rows:
+        yield dumps({c: _export_value(v) for c, v in zip(columns, row)}, ensure_ascii=False) + '\n'
+
+
+def csv_lines(rows, columns):
+    """헤더를 포함하여 행을 CSV 줄로 변환합니다. (불리언은 true/false, 빈 값은 빈 문자열)"""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(v) for v in row])
+
+
+def chunked(lines, size=64 * 1024):
+    """작은 줄들을 약 size 바이트 단위로 묶습니다. (스트리밍 응답의 write 호출 수 감소)"""
+    buffer = []
+    buffered = 0
+    for line in lines:
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= size:
+            yield ''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def write_ndjson(rows, columns, fp):
+    """행을 NDJSON으로 기록합니다. 기록한 행 수를 반환합니다."""
+    count = 0
+    for line in ndjson_lines(rows, columns):
+        fp.write(line)
+        count += 1
+    return count
+
+
+def write_csv(rows, columns, fp):
+    """행을 CSV로 기록합니다. 기록한 행 수(헤더 제외)를 반환합니다."""
+    count = -1
+    for line in csv_lines(rows, columns):
+        fp.write(line)
+        count += 1
+    return count
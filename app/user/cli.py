@@ -0,0 +1,166 @@
+"""
+User Service CLI
+사용자 관리 명령 (flask users ...)
+
+    flask users import users.csv --batch-size 5000 --key username
+    flask users import legacy.ndjson --on-conflict skip --defer-search-index
+    flask users export -o users.ndjson
+    flask users export --format csv --fields id,username,email > users.csv
+    flask users rebalance --dry-run
+"""
+
+import sys
+import time
+from contextlib import nullcontext
+
+import click
+from flask.cli import AppGroup
+
+from .bulk import (
+    UserImporter, read_rows, iter_users, write_ndjson, write_csv,
+    EXPORT_COLUMNS, CONFLICT_KEYS
+)
+from .search import get_search_backend
+from .sharding import is_sharded, plan_moves, move_users
+
+users_cli = AppGroup('users', help='사용자 대량 가져오기/내보내기')
+
+FORMATS = ('csv', 'ndjson')
+
+
+def _detect_format(filename, fmt):
+    if fmt:
+        return fmt
+    if filename.endswith('.csv'):
+        return 'csv'
+    if filename.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    raise click.UsageError("Cannot detect file format; use --format csv|ndjson")
+
+
+def _run_import(importer, rows, max_errors):
+    total_rows = total_written = total_errors = 0
+
+    for batch in importer.run(rows):
+        total_rows += batch.rows
+        total_written += batch.written
+        total_errors += len(batch.errors)
+
+        rate = batch.rows / batch.seconds if batch.seconds else 0
+        click.echo(
+            f"batch {batch.number}: {batch.rows} rows, {batch.written} written, "
+            f"{len(batch.errors)} errors ({rate:,.0f} rows/s)",
+            err=True
+        )
+        for line_no, message in batch.errors:
+            click.echo(f"  line {line_no}: {message}", err=True)
+
+        if max_errors and total_errors > max_errors:
+            raise click.ClickException(f"Aborted after {total_errors} errors")
+
+    return total_rows, total_written, total_errors
+
+
+@users_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='입력 형식 (기본: 파일 확장자로 판단)')
+@click.option('--batch-size', default=5000, show_default=True, help='배치당 행 수')
+@click.option('--key', type=click.Choice(CONFLICT_KEYS), default='username', show_default=True,
+              help='기존 사용자 판단 기준 컬럼')
+@click.option('--on-conflict', type=click.Choice(('update', 'skip', 'error')), default='update',
+              show_default=True, help='기존 사용자가 있을 때 동작')
+@click.option('--max-errors', default=0, help='오류 행이 이 수를 넘으면 중단 (0: 제한 없음)')
+@click.option('--defer-search-index', is_flag=True,
+              help='적재 중 검색 인덱스 갱신을 멈추고 끝난 뒤 한 번에 재구성 (대량 적재용)')
+def import_users(source, fmt, batch_size, key, on_conflict, max_errors, defer_search_index):
+    """CSV/NDJSON 파일에서 사용자를 가져옵니다. (SOURCE가 '-'이면 표준 입력)
+
+    시각 컬럼은 UTC로 저장합니다. (2026-01-01T09:00:00+09:00 -> 2026-01-01 00:00:00)
+    """
+    if is_sharded():
+        raise click.UsageError("Bulk import is not supported with SHARD_URLS; import into each shard separately")
+
+    fmt = _detect_format(source.name, fmt) if source.name != '<stdin>' else (fmt or 'ndjson')
+    importer = UserImporter(key=key, on_conflict=on_conflict, batch_size=batch_size)
+    started = time.perf_counter()
+
+    with (get_search_backend().bulk_load() if defer_search_index else nullcontext()):
+        total_rows, total_written, total_errors = _run_import(
+            importer, read_rows(source, fmt), max_errors
+        )
+
+    elapsed = time.perf_counter() - started
+    rate = total_rows / elapsed if elapsed else 0
+    click.echo(
+        f"Imported {total_written}/{total_rows} rows in {elapsed:.1f}s "
+        f"({rate:,.0f} rows/s), {total_errors} errors",
+        err=True
+    )
+    if total_errors:
+        sys.exit(1)
+
+
+@users_cli.command('export')
+@click.option('-o', '--output', type=click.File('w', encoding='utf-8'), default='-',
+              help='출력 파일 (기본: 표준 출력)')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='출력 형식 (기본: 파일 확장자 또는 ndjson)')
+@click.option('--fields', help='내보낼 컬럼 (쉼표 구분)')
+@click.option('--batch-size', default=5000, show_default=True, help='커서에서 한 번에 가져올 행 수')
+def export_users(output, fmt, fields, batch_size):
+    """사용자를 CSV/NDJSON으로 내보냅니다."""
+    if output.name == '<stdout>':
+        fmt = fmt or 'ndjson'
+    else:
+        fmt = _detect_format(output.name, fmt)
+
+    columns = EXPORT_COLUMNS
+    if fields:
+        columns = tuple(f.strip() for f in fields.split(',') if f.strip())
+        unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+        if unknown:
+            raise click.UsageError(f"Unknown fields: {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    writer = write_csv if fmt == 'csv' else write_ndjson
+    count = writer(iter_users(columns, batch_size), columns, output)
+    output.flush()
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0
+    click.echo(f"Exported {count} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)", err=True)
+
+
+@users_cli.command('rebalance')
+@click.option('--dry-run', is_flag=True, help='이동할 사용자 수만 출력')
+@click.option('--batch-size', default=1000, show_default=True, help='한 번에 이동할 사용자 수')
+@click.option('--grace', default=1.0, show_default=True,
+              help='디렉터리 변경 후 진행 중인 요청을 기다리는 시간(초)')
+def rebalance_users(dry_run, batch_size, grace):
+    """샤드 추가/제거 후 배치가 바뀐 사용자를 새 샤드로 이동합니다."""
+    if not is_sharded():
+        raise click.UsageError("Sharding is not configured (SHARD_URLS)")
+
+    moves = plan_moves()
+    total = sum(len(ids) for ids in moves.values())
+    for (source, target), ids in sorted(moves.items()):
+        click.echo(f"{source} -> {target}: {len(ids)} users", err=True)
+    if dry_run or not total:
+        click.echo(f"{total} users to move", err=True)
+        return
+
+    started = time.perf_counter()
+    moved = 0
+    conflicts = []
+    for (source, target), ids in sorted(moves.items()):
+        for start in range(0, len(ids), batch_size):
+            count, batch_conflicts = move_users(source, target, ids[start:start + batch_size], grace=grace)
+            moved += count
+            conflicts.extend(batch_conflicts)
+            click.echo(f"moved {moved}/{total}", err=True)
+            for user_id in batch_conflicts:
+                click.echo(f"  conflict: user {user_id} changed on {source} and {target}, kept {target}", err=True)
+
+    elapsed = time.perf_counter() - started
+    click.echo(f"Moved {moved} users in {elapsed:.1f}s, {len(conflicts)} conflicts", err=True)
+    if conflicts:
+        sys.exit(1)
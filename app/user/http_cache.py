@@ -0,0 +1,82 @@
+"""
+User Service HTTP Caching
+사용자 조회 응답의 조건부 GET(ETag/Last-Modified) 처리를 담당합니다.
+
+User.updated_at은 모든 변경 시 갱신되므로 `(표현 종류, id, updated_at)`으로 강한 ETag를
+만들고, 클라이언트가 보낸 If-None-Match/If-Modified-Since와 비교하여 변경이 없으면
+본문 직렬화 없이 304 Not Modified를 반환합니다.
+로그인(last_login_at 갱신)은 updated_at을 바꾸지 않으므로, last_login_at이 포함된
+본인 프로필만 private_version()으로 로그인 시각도 버전에 반영합니다.
+"""
+
+import hashlib
+from datetime import timezone
+
+from flask import current_app, request, jsonify, make_response
+
+
+def user_etag(representation, user_id, updated_at):
+    """사용자 표현(representation)별 강한 ETag 값"""
+    version = updated_at.isoformat() if updated_at else ''
+    raw = f"{representation}:{user_id}:{version}".encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+
+def private_version(user):
+    """본인 프로필(to_dict) 표현의 버전 (updated_at과 last_login_at 중 늦은 시각)"""
+    return max((value for value in (user.updated_at, user.last_login_at) if value), default=None)
+
+
+def last_modified_of(updated_at):
+    """updated_at(UTC naive)을 Last-Modified용 datetime으로 변환 (초 단위)"""
+    if not updated_at:
+        return None
+    return updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def is_not_modified(etag, last_modified=None):
+    """요청의 조건부 헤더와 비교하여 변경되지 않았는지 확인합니다."""
+    # If-None-Match가 있으면 If-Modified-Since보다 우선 (RFC 7232)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+
+    if last_modified and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+
+    return False
+
+
+def _apply_cache_headers(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+
+    policy = current_app.config.get('HTTP_CACHE_CONTROL', {}).get(request.endpoint)
+    if policy:
+        response.headers['Cache-Control'] = policy
+        if 'private' in policy:
+            response.vary.add('Authorization')
+    return response
+
+
+def not_modified_response(representation, user_id, updated_at):
+    """변경되지 않았으면 304 응답을, 아니면 None을 반환합니다. (버전 정보만으로 판단)"""
+    etag = user_etag(representation, user_id, updated_at)
+    last_modified = last_modified_of(updated_at)
+
+    if not is_not_modified(etag, last_modified):
+        return None
+    return _apply_cache_headers(make_response('', 304), etag, last_modified)
+
+
+def conditional_user_response(representation, user_id, updated_at, build_body):
+    """조건부 GET 응답을 생성합니다. 변경이 없으면 build_body를 호출하지 않고 304를 반환합니다."""
+    response = not_modified_response(representation, user_id, updated_at)
+    if response is not None:
+        return response
+
+    return _apply_cache_headers(
+        make_response(jsonify(build_body()), 200),
+        user_etag(representation, user_id, updated_at),
+        last_modified_of(updated_at)
+    )
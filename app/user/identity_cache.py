@@ -0,0 +1,161 @@
+"""
+User Identity Cache
+cognito_user_id -> 사용자 정보 스냅샷을 프로세스 메모리에 캐시합니다.
+
+인증된 요청마다 반복되는 `User.query.filter_by(cognito_user_id=...)` 조회를 줄이기 위한
+캐시로, 크기 제한(LRU)과 TTL을 가지며 사용자 정보가 변경되어 커밋되면 무효화됩니다.
+캐시는 워커 프로세스별로 독립적이므로 다른 워커의 변경은 TTL 이내에 반영됩니다.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from .models import User
+from .sharding import route_user
+
+USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+class UserSnapshot:
+    """세션과 분리된 읽기 전용 사용자 정보 스냅샷"""
+
+    __slots__ = USER_COLUMNS
+
+    # User 모델과 동일한 직렬화 사용
+    to_dict = User.to_dict
+    to_public_dict = User.to_public_dict
+
+    def __init__(self, user):
+        for column in USER_COLUMNS:
+            setattr(self, column, getattr(user, column))
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+
+class IdentityCache:
+    """cognito_user_id 기반 사용자 스냅샷 LRU/TTL 캐시"""
+
+    def __init__(self, max_entries=10000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 무효화 세대: 조회 도중 같은 사용자가 무효화되면 오래된 스냅샷을 저장하지 않음
+        # (키별 마지막 무효화 세대를 기록하므로 다른 사용자의 무효화는 영향 없음)
+        self._generation = 0
+        self._invalidated = OrderedDict()
+        # 이 세대 이전에 시작한 조회는 모두 저장하지 않음 (clear, 오래된 무효화 기록 정리)
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self):
+        """조회 시작 시점의 세대 (set()에 전달)"""
+        return self._generation
+
+    def get(self, cognito_user_id):
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(cognito_user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            snapshot, expires_at = entry
+            if expires_at <= now:
+                del self._entries[cognito_user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(cognito_user_id)
+            self.hits += 1
+            return snapshot
+
+    def set(self, cognito_user_id, snapshot, generation=None):
+        with self._lock:
+            if generation is not None and (
+                generation < self._floor or self._invalidated.get(cognito_user_id, 0) > generation
+            ):
+                return
+
+            self._entries[cognito_user_id] = (snapshot, time.time() + self.ttl)
+            self._entries.move_to_end(cognito_user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, cognito_user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(cognito_user_id, None)
+            self._invalidated[cognito_user_id] = self._generation
+            self._invalidated.move_to_end(cognito_user_id)
+            # 기록은 캐시 크기만큼만 유지하고, 지운 기록의 세대 이전에 시작한 조회는 저장하지 않음
+            while len(self._invalidated) > self.max_entries:
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, generation)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+            self._entries.clear()
+
+    def stats(self):
+        """캐시 통계"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+def init_identity_cache(app):
+    """앱 설정에 따라 사용자 식별 캐시를 등록합니다."""
+    if app.config.get('IDENTITY_CACHE_ENABLED', True):
+        app.extensions['identity_cache'] = IdentityCache(
+            max_entries=app.config.get('IDENTITY_CACHE_MAX_ENTRIES', 10000),
+            ttl=app.config.get('IDENTITY_CACHE_TTL', 60)
+        )
+    else:
+        app.extensions.pop('identity_cache', None)
+
+
+def get_user_snapshot(cognito_user_id):
+    """cognito_user_id로 사용자 스냅샷을 조회합니다. (캐시 우선, 없으면 None)"""
+    if not cognito_user_id:
+        return None
+
+    cache = current_app.extensions.get('identity_cache')
+    if cache:
+        snapshot = cache.get(cognito_user_id)
+        if snapshot is not None:
+            return snapshot
+        generation = cache.generation
+
+    route_user('cognito_user_id', cognito_user_id)
+    user = User.query.filter_by(cognito_user_id=cognito_user_id).first()
+    if not user:
+        return None
+
+    snapshot = UserSnapshot(user)
+    if cache:
+        cache.set(cognito_user_id, snapshot, generation=generation)
+    return snapshot
+
+
+def invalidate_user(cognito_user_id):
+    """사용자 정보 변경 커밋 후 캐시된 스냅샷을 무효화합니다."""
+    cache = current_app.extensions.get('identity_cache')
+    if cache and cognito_user_id:
+        cache.invalidate(cognito_user_id)
@@ -0,0 +1,271 @@
+"""
+User Profile Image Pipeline
+프로필 이미지 업로드 저장 및 썸네일 생성을 담당합니다.
+
+- 업로드는 청크 단위로 디스크에 기록하며 크기 제한을 넘으면 중단
+- 파일 앞부분(매직 바이트)으로 실제 이미지 형식을 판별 (PNG/JPEG/GIF/WebP)
+- 내용 해시(SHA-256)를 파일명으로 사용하여 같은 이미지는 한 번만 저장
+- 고정 크기 아바타(WebP) 생성은 요청 스레드가 아닌 제한된 작업자 풀에서 수행
+- 모든 크기가 준비되면 profile_image_url/avatar_url을 한 번의 UPDATE로 함께 갱신
+"""
+
+import os
+import uuid
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from .models import db, User
+from .identity_cache import invalidate_user
+from .sharding import route_user
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow 미설치 환경에서는 원본만 저장
+    Image = None
+
+CHUNK_SIZE = 64 * 1024
+
+# 매직 바이트 -> 확장자
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+
+class ImageUploadError(ValueError):
+    """업로드된 이미지가 유효하지 않음"""
+
+    status_code = 400
+
+
+class ImageTooLarge(ImageUploadError):
+    """업로드된 이미지가 크기 제한을 초과함"""
+
+    status_code = 413
+
+
+def size_limit_message(max_bytes):
+    """크기 제한 초과 메시지 (1MB 단위로 나누어떨어지지 않으면 KB, 1KB 미만은 바이트)"""
+    if max_bytes >= 1024 * 1024 and max_bytes % (1024 * 1024) == 0:
+        limit = f"{max_bytes // (1024 * 1024)}MB"
+    elif max_bytes >= 1024:
+        limit = f"{max_bytes // 1024}KB"
+    else:
+        limit = f"{max_bytes} bytes"
+    return f"Image must be {limit} or smaller"
+
+
+def sniff_image_format(head):
+    """파일 앞부분으로 이미지 형식을 판별합니다. 지원하지 않으면 None"""
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if len(head) >= 12 and head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def image_dir():
+    return os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), 'images')
+
+
+def image_url(filename):
+    return f"/uploads/images/{filename}"
+
+
+class StoredImage:
+    """내용 해시로 저장된 원본 이미지"""
+
+    def __init__(self, digest, ext, path):
+        self.digest = digest
+        self.ext = ext
+        self.path = path
+
+    @property
+    def filename(self):
+        return f"{self.digest}.{self.ext}"
+
+    @property
+    def url(self):
+        return image_url(self.filename)
+
+
+def store_upload(file_storage, max_bytes):
+    """업로드 스트림을 청크 단위로 저장하고 내용 해시 기반 파일명으로 옮깁니다."""
+    stream = file_storage.stream
+    head = stream.read(CHUNK_SIZE)
+    ext = sniff_image_format(head)
+    if ext is None:
+        raise ImageUploadError("Unsupported image format (PNG, JPEG, GIF, WebP only)")
+
+    target_dir = image_dir()
+    tmp_dir = os.path.join(target_dir, 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as out:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ImageTooLarge(size_limit_message(max_bytes))
+                digest.update(chunk)
+                out.write(chunk)
+                chunk = stream.read(CHUNK_SIZE)
+
+        filename = f"{digest.hexdigest()}.{ext}"
+        stored = StoredImage(digest.hexdigest(), ext, os.path.join(target_dir, filename))
+
+        if os.path.exists(stored.path):
+            # 같은 내용의 이미지가 이미 있으면 재사용
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, stored.path)
+        return stored
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ImageProcessor:
+    """아바타 변환 작업자 풀 (프로세스별로 생성)"""
+
+    def __init__(self, max_workers=2, max_pending=32):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-worker')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # 사용자별 마지막 업로드: 늦게 끝난 이전 작업이 최신 이미지를 덮어쓰지 않도록 함
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def submit(self, app, user_id, stored, sizes):
+        """변환 작업을 예약합니다. 대기열이 가득 차면 False"""
+        if not self._slots.acquire(blocking=False):
+            return False
+
+        # 같은 이미지를 다시 올려도 구분되도록 작업마다 새 토큰 사용
+        job = object()
+        with self._lock:
+            self._latest[user_id] = job
+
+        future = self._executor.submit(self._process, app, user_id, stored, sizes, job)
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def _process(self, app, user_id, stored, sizes, job):
+        with app.app_context():
+            try:
+                variants = build_variants(stored, sizes)
+                self._publish(user_id, variants, job)
+            except Exception as e:
+                app.logger.error(f"Profile image processing failed for user {user_id}: {e}")
+            finally:
+                # 실패한 작업도 최신 작업이면 항목을 지움 (사용자별 항목이 계속 쌓이지 않도록)
+                with self._lock:
+                    if self._latest.get(user_id) is job:
+                        del self._latest[user_id]
+
+    def _publish(self, user_id, variants, job):
+        with self._lock:
+            if self._latest.get(user_id) is not job:
+                return
+
+        largest = variants[max(variants)]
+        avatar = variants[min(variants, key=lambda size: abs(size - 128))]
+
+        # 두 URL을 단일 UPDATE로 함께 갱신
+        route_user('id', user_id)
+        User.query.filter_by(id=user_id).update({
+            'profile_image_url': image_url(largest),
+            'avatar_url': image_url(avatar),
+            'updated_at': datetime.utcnow(),
+        }, synchronize_session=False)
+        db.session.commit()
+
+        cognito_user_id = db.session.query(User.cognito_user_id).filter_by(id=user_id).scalar()
+        invalidate_user(cognito_user_id)
+
+
+def build_variants(stored, sizes):
+    """원본 이미지로 고정 크기 정사각형 WebP 아바타를 생성합니다. (size -> 파일명)"""
+    variants = {}
+    target_dir = os.path.dirname(stored.path)
+
+    with Image.open(stored.path) as source:
+        source.load()
+        image = source.convert('RGBA') if source.mode not in ('RGB', 'RGBA') else source
+
+        # 가운데 기준 정사각형으로 자르기
+        width, height = image.size
+        edge = min(width, height)
+        left, top = (width - edge) // 2, (height - edge) // 2
+        square = image.crop((left, top, left + edge, top + edge))
+
+        for size in sizes:
+            filename = f"{stored.digest}_{size}.webp"
+            path = os.path.join(target_dir, filename)
+            if not os.path.exists(path):
+                tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                square.resize((size, size), Image.LANCZOS).save(tmp_path, 'WEBP', quality=85, method=4)
+                os.replace(tmp_path, path)
+            variants[size] = filename
+
+    return variants
+
+
+_processor = None
+_processor_pid = None
+_processor_lock = threading.Lock()
+
+
+def get_image_processor():
+    """현재 프로세스의 작업자 풀 (fork 이후에는 새로 생성)"""
+    global _processor, _processor_pid
+
+    if _processor is None or _processor_pid != os.getpid():
+        with _processor_lock:
+            if _processor is None or _processor_pid != os.getpid():
+                _processor = ImageProcessor(
+                    max_workers=current_app.config.get('IMAGE_WORKERS', 2),
+                    max_pending=current_app.config.get('IMAGE_QUEUE_SIZE', 32)
+                )
+                _processor_pid = os.getpid()
+    return _processor
+
+
+def process_profile_image(user, file_storage):
+    """프로필 이미지 업로드를 저장하고 아바타 생성을 예약합니다.
+
+    아바타 생성이 예약되면 URL은 변환 완료 후 갱신되고, 예약할 수 없으면
+    (Pillow 미설치, 대기열 포화) 원본 URL을 바로 user에 설정합니다. (커밋은 호출자)
+    """
+    stored = store_upload(
+        file_storage,
+        max_bytes=current_app.config.get('PROFILE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+    )
+
+    result = {
+        "digest": stored.digest,
+        "format": stored.ext,
+        "original_url": stored.url,
+    }
+
+    sizes = current_app.config.get('PROFILE_IMAGE_SIZES', (64, 128, 256))
+    if Image is not None and sizes:
+        app = current_app._get_current_object()
+        if get_image_processor().submit(app, user.id, stored, sizes):
+            result["status"] = "processing"
+            return result
+
+    user.profile_image_url = stored.url
+    result["status"] = "stored"
+    return result
@@ -6,7 +6,12 @@ MSA 환경에서 User 서비스의 데이터 모델을 정의합니다.
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from .routing import RoutingSession
+from .sharding import route_user, assign_new_user
+from .serializers import compile_serializer, compile_object_serializer
+
+# 읽기 요청의 SELECT는 복제본으로 보낼 수 있도록 라우팅 세션 사용 (user/routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     """사용자 모델"""
@@ -34,43 +39,44 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # to_dict()에 포함되는 필드 (순서 동일)
+    DICT_FIELDS = (
+        "id", "username", "email", "bio", "avatar_url", "profile_image_url",
+        "is_active", "is_verified", "first_name", "last_name", "phone",
+        "last_login_at", "created_at", "updated_at",
+    )
+
+    # to_public_dict()에 포함되는 필드
+    PUBLIC_FIELDS = ("id", "username", "bio", "avatar_url", "is_active", "created_at")
+
+    # isoformat() 문자열로 직렬화하는 필드
+    DATETIME_FIELDS = ("last_login_at", "created_at", "updated_at")
+
     def __repr__(self):
         return f'<User {self.username}>'
 
     def to_dict(self):
         """사용자 정보를 딕셔너리로 변환"""
-        return {
-            "id": self.id,
-            "username": self.username,
-            "email": self.email,
-            "bio": self.bio,
-            "avatar_url": self.avatar_url,
-            "profile_image_url": self.profile_image_url,  # 프로필 이미지 URL 추가
-            "is_active": self.is_active,
-            "is_verified": self.is_verified,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "phone": self.phone,
-            "last_login_at": self.last_login_at.isoformat() if self.last_login_at else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return _to_dict(self)
 
     def to_public_dict(self):
         """공개용 사용자 정보 (민감한 정보 제외)"""
-        return {
-            "id": self.id,
-            "username": self.username,
-            "bio": self.bio,
-            "avatar_url": self.avatar_url,
-            "is_active": self.is_active,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
+        return _to_public_dict(self)
+
+# 미리 생성한 직렬화 함수 (user/serializers.py)
+# 목록 조회는 DICT_COLUMNS/PUBLIC_COLUMNS만 SELECT한 행을 dict_from_row/public_dict_from_row로 바로 변환
+DICT_COLUMNS = tuple(getattr(User, field) for field in User.DICT_FIELDS)
+PUBLIC_COLUMNS = tuple(getattr(User, field) for field in User.PUBLIC_FIELDS)
+dict_from_row = compile_serializer(User.DICT_FIELDS, User.DATETIME_FIELDS, 'dict_from_row')
+public_dict_from_row = compile_serializer(User.PUBLIC_FIELDS, User.DATETIME_FIELDS, 'public_dict_from_row')
+_to_dict = compile_object_serializer(User.DICT_FIELDS, User.DATETIME_FIELDS, 'to_dict')
+_to_public_dict = compile_object_serializer(User.PUBLIC_FIELDS, User.DATETIME_FIELDS, 'to_public_dict')
 
 def init_users():
     """초기 사용자 데이터 생성 (개발용)"""
     
     # 기본 관리자 계정 생성 (Cognito 기반)
+    route_user('username', 'admin')
     admin_user = User.query.filter_by(username='admin').first()
     if not admin_user:
         admin_user = User(
@@ -81,6 +87,7 @@ def init_users():
             is_verified=True,
             bio='System Administrator'
         )
+        assign_new_user(admin_user)
         db.session.add(admin_user)
         db.session.commit()
         print("Admin user created")
@@ -0,0 +1,168 @@
+"""
+User Service Pagination
+커서(keyset) 기반 페이지네이션 유틸리티입니다.
+
+OFFSET/COUNT(*) 대신 마지막 행의 정렬 키 `(sort_key, id)`를 불투명한 커서로 전달하고,
+다음 페이지는 인덱스를 따라 `(sort_key, id) > cursor` 조건으로 바로 찾아갑니다.
+따라서 페이지 깊이와 관계없이 페이지 하나를 읽는 비용이 일정합니다.
+"""
+
+import json
+import time
+import base64
+import threading
+
+from sqlalchemy import tuple_
+
+
+class InvalidPagination(ValueError):
+    """잘못된 페이지네이션 요청 (페이지 크기, 커서)"""
+
+
+class InvalidCursor(InvalidPagination):
+    """잘못된 커서 값"""
+
+
+def encode_cursor(sort, values):
+    """정렬 이름과 정렬 키 값들을 불투명한 커서 문자열로 인코딩합니다."""
+    raw = json.dumps({'s': sort, 'k': list(values)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort, size):
+    """커서를 디코딩하여 정렬 키 값 목록을 반환합니다."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = data['k']
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise InvalidCursor("Invalid cursor")
+
+    if data.get('s') != sort or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Cursor does not match this listing")
+
+    return values
+
+
+def _check_cursor_values(order_columns, values):
+    """커서 값이 정렬 컬럼의 타입과 같은지 확인합니다. (조작된 커서가 다른 타입으로 쿼리에 쓰이지 않도록)"""
+    for column, value in zip(order_columns, values):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        # JSON의 true/false는 int의 하위 타입인 bool로 디코딩됨
+        if not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+            raise InvalidCursor("Invalid cursor")
+
+
+class KeysetPage:
+    """커서 기반 페이지 결과"""
+
+    def __init__(self, items, per_page, next_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+def keyset_paginate(query, sort, order_columns, cursor=None, per_page=20):
+    """order_columns 순서의 keyset 페이지를 조회합니다.
+
+    order_columns의 마지막 컬럼은 유일해야 합니다. (예: User.id)
+    """
+    if per_page < 1:
+        raise InvalidPagination("per_page must be at least 1")
+
+    if cursor:
+        values = decode_cursor(cursor, sort, len(order_columns))
+        _check_cursor_values(order_columns, values)
+        query = query.filter(tuple_(*order_columns) > tuple_(*values))
+
+    # 다음 페이지 존재 여부 확인을 위해 1건 더 조회
+    rows = query.order_by(*order_columns).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, column.key) for column in order_columns])
+
+    return KeysetPage(rows, per_page, next_cursor)
+
+
+def merge_keyset_pages(pages, sort, order_columns, per_page):
+    """샤드별 keyset 페이지(같은 커서로 조회)를 정렬 키 순서로 병합합니다."""
+    keys = [column.key for column in order_columns]
+    items = sorted(
+        (item for page in pages for item in page.items),
+        key=lambda item: tuple(getattr(item, key) for key in keys)
+    )
+
+    has_more = len(items) > per_page or any(page.has_more for page in pages)
+    items = items[:per_page]
+
+    next_cursor = None
+    if has_more and items:
+        next_cursor = encode_cursor(sort, [getattr(items[-1], key) for key in keys])
+
+    return KeysetPage(items, per_page, next_cursor)
+
+
+class MergedPage:
+    """여러 샤드의 결과를 병합한 OFFSET 페이지 (Flask-SQLAlchemy Pagination과 같은 속성)"""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def pages(self):
+        return -(-self.total // self.per_page) if self.per_page else 0
+
+
+def merge_offset_pages(results, order_columns, page, per_page):
+    """샤드별 상위 page * per_page건과 건수를 병합하여 요청한 페이지를 만듭니다.
+
+    results: [(items, count)] - 각 샤드에서 order_columns 순으로 page * per_page건까지 조회한 결과
+    """
+    keys = [column.key for column in order_columns]
+    items = sorted(
+        (item for shard_items, _ in results for item in shard_items),
+        key=lambda item: tuple(getattr(item, key) for key in keys)
+    )
+    start = (page - 1) * per_page
+    return MergedPage(items[start:start + per_page], page, per_page, sum(count for _, count in results))
+
+
+class CountCache:
+    """COUNT(*) 결과를 짧은 시간 동안 재사용하는 캐시"""
+
+    def __init__(self, ttl=30, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def count(self, key, query, ttl=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        total = query.order_by(None).count()
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (total, now + (self.ttl if ttl is None else ttl))
+        return total
+
+
+count_cache = CountCache()
@@ -0,0 +1,71 @@
+"""
+User Service Query Budget
+엔드포인트가 실행할 수 있는 SQL 문장 수(쿼리 예산)를 넘으면 테스트를 실패시키는 pytest 플러그인입니다.
+
+    # conftest.py
+    pytest_plugins = ['user.query_budget']
+
+    def test_get_profile(client, auth_headers, query_budget):
+        with query_budget(2):
+            client.get('/api/v1/profile', headers=auth_headers)
+
+    @pytest.mark.query_budget(3)        # 테스트 전체에서 실행된 문장 수 제한
+    def test_update_profile(client, auth_headers):
+        ...
+
+문장 수는 query_stats의 엔진 이벤트로 집계하므로 앱이 init_query_stats()로 생성되어 있어야 합니다.
+pytest 없이도 assert_query_budget()을 컨텍스트 매니저로 사용할 수 있습니다.
+"""
+
+from contextlib import contextmanager
+
+from .query_stats import capture_queries
+
+try:
+    import pytest
+except ImportError:  # pragma: no cover - 운영 환경에는 pytest가 없음
+    pytest = None
+
+
+class QueryBudgetExceeded(AssertionError):
+    """선언한 쿼리 예산을 넘었을 때 발생"""
+
+    def __init__(self, budget, stats, label=None):
+        self.budget = budget
+        self.stats = stats
+        lines = [
+            f"{label or 'Block'} executed {stats.count} SQL statements, budget is {budget}"
+        ]
+        for shape, count in stats.shapes.most_common():
+            lines.append(f"  {count} x {shape}")
+        super().__init__('\n'.join(lines))
+
+
+@contextmanager
+def assert_query_budget(budget, label=None):
+    """블록에서 실행된 문장이 budget개를 넘으면 QueryBudgetExceeded를 발생시킵니다."""
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > budget:
+        raise QueryBudgetExceeded(budget, stats, label)
+
+
+if pytest is not None:
+    def pytest_configure(config):
+        config.addinivalue_line(
+            'markers', 'query_budget(n): fail the test if it executes more than n SQL statements'
+        )
+
+    @pytest.fixture
+    def query_budget():
+        """with query_budget(n): 블록 단위로 쿼리 예산을 검사합니다."""
+        return assert_query_budget
+
+    @pytest.fixture(autouse=True)
+    def _query_budget_marker(request):
+        marker = request.node.get_closest_marker('query_budget')
+        if marker is None:
+            yield
+            return
+        with assert_query_budget(marker.args[0], label=request.node.nodeid):
+            yield
@@ -0,0 +1,175 @@
+"""
+User Service Query Statistics
+SQLAlchemy 커서 실행 이벤트(before/after_cursor_execute)로 요청별 SQL 문장 수와 실행 시간을 집계합니다.
+
+- 느린 문장(DATABASE_SLOW_QUERY_MS 이상)은 리터럴/파라미터를 지운 정규화 SQL로 경고 로그
+- 한 요청에서 같은 형태의 문장이 DATABASE_N_PLUS_ONE_THRESHOLD번 이상 실행되면 N+1 의심으로 경고 로그
+- 운영 환경이 아니고 DATABASE_QUERY_HEADERS가 켜져 있으면 응답에 X-DB-Queries와
+  Server-Timing(db;dur=...) 헤더 추가
+- capture_queries()로 요청 밖(테스트/스크립트)에서도 실행된 문장을 수집 (query_budget.py 참고)
+
+샤드 병렬 조회(fan_out)의 작업 스레드에서 실행된 문장도 요청의 집계에 포함됩니다.
+"""
+
+import re
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import lru_cache
+from collections import Counter
+
+from flask import g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = 'X-DB-Queries'
+
+# 현재 실행 흐름에서 문장을 기록할 QueryStats 목록 (요청 집계, capture_queries() 등)
+_recorders = contextvars.ContextVar('query_recorders', default=())
+
+_NORMALIZE_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),                       # 문자열 리터럴
+    (re.compile(r'%\(\w+\)s|:\w+|\$\d+|%s'), '?'),              # 바인드 파라미터
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),                     # 숫자 리터럴
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?)'),          # IN (?, ?, ...) -> IN (?)
+    (re.compile(r'\s+'), ' '),
+]
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement):
+    """리터럴/파라미터를 ?로 바꾸고 공백을 정리한 문장 형태 (로그/N+1 판별용)"""
+    shape = statement
+    for pattern, replacement in _NORMALIZE_RULES:
+        shape = pattern.sub(replacement, shape)
+    return shape.strip()
+
+
+class QueryStats:
+    """실행된 문장 수, 누적 시간, 형태별 실행 횟수 (여러 스레드에서 기록 가능)"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def record(self, statement, duration):
+        shape = normalize_sql(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+            self.statements.append((shape, duration))
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def repeated(self, threshold):
+        """threshold번 이상 실행된 문장 형태 [(형태, 횟수)] (N+1 의심)"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def current_recorders():
+    return _recorders.get()
+
+
+@contextmanager
+def recording(recorders):
+    """다른 스레드(fan_out 작업 등)에서 실행되는 문장을 주어진 QueryStats에도 기록합니다."""
+    token = _recorders.set(recorders)
+    try:
+        yield
+    finally:
+        _recorders.reset(token)
+
+
+@contextmanager
+def capture_queries():
+    """블록 안에서 실행된 문장을 수집하는 QueryStats를 반환합니다. (테스트 클라이언트 요청 포함)"""
+    stats = QueryStats()
+    with recording(_recorders.get() + (stats,)):
+        yield stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def install_query_listeners(engine, slow_query_ms):
+    """엔진의 커서 실행 시간을 측정하여 현재 기록 대상에 추가합니다."""
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+
+    slow_threshold = slow_query_ms / 1000 if slow_query_ms else None
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('query_started')
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+
+        for stats in _recorders.get():
+            stats.record(statement, duration)
+        if slow_threshold is not None and duration >= slow_threshold:
+            logger.warning("Slow query (%.1f ms): %s", duration * 1000, normalize_sql(statement))
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def init_query_stats(app, db):
+    """모든 bind(primary/복제본/샤드)에 문장 측정을 연결하고 요청별 집계 훅을 등록합니다."""
+    if not app.config.get('DATABASE_QUERY_STATS_ENABLED', True):
+        return
+
+    slow_query_ms = app.config.get('DATABASE_SLOW_QUERY_MS', 200)
+    threshold = app.config.get('DATABASE_N_PLUS_ONE_THRESHOLD', 5)
+    # 내부 쿼리 수/시간은 운영 환경에서 응답 헤더로 노출하지 않음
+    headers_enabled = (
+        app.config.get('DATABASE_QUERY_HEADERS', False)
+        and app.config.get('ENVIRONMENT', 'development') != 'production'
+    )
+
+    with app.app_context():
+        for engine in db.engines.values():
+            install_query_listeners(engine, slow_query_ms)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+        g.query_stats_token = _recorders.set(_recorders.get() + (g.query_stats,))
+
+    @app.after_request
+    def add_query_headers(response):
+        stats = g.get('query_stats')
+        if headers_enabled and stats is not None:
+            response.headers[QUERY_COUNT_HEADER] = str(stats.count)
+            timing = f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"'
+            existing = response.headers.get('Server-Timing')
+            response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+        return response
+
+    @app.teardown_request
+    def finish_query_stats(exc):
+        stats = g.pop('query_stats', None)
+        token = g.pop('query_stats_token', None)
+        if stats is None:
+            return
+        try:
+            _recorders.reset(token)
+        except ValueError:
+            # 다른 컨텍스트에서 정리되는 경우 (요청 중 컨텍스트가 바뀐 서버)
+            _recorders.set(tuple(r for r in _recorders.get() if r is not stats))
+
+        if threshold:
+            for shape, count in stats.repeated(threshold):
+                logger.warning(
+                    "Possible N+1: %d x %s in %s %s (%d queries, %.1f ms total)",
+                    count, shape, request.method, request.path, stats.count, stats.duration_ms
+                )
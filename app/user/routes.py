@@ -3,17 +3,41 @@ User Service Routes
 MSA 환경에서 User 서비스의 API 엔드포인트를 정의합니다.
 """
 
-import os
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime
 
-from .models import db, User
+from .models import db, User, DICT_COLUMNS, PUBLIC_COLUMNS, dict_from_row, public_dict_from_row
 from .validators import UserValidator
 from .services import UserService
+from .identity_cache import get_user_snapshot, invalidate_user
+from .pagination import InvalidPagination
+from .http_cache import conditional_user_response, not_modified_response, private_version
+from .images import process_profile_image, size_limit_message, ImageUploadError
+from .storage import get_storage, new_avatar_key, verify_uploaded_avatar, LocalStorage
+from .auth import admin_required
+from .sharding import route_user
+from .bulk import iter_users, ndjson_lines, csv_lines, chunked, parse_datetime
 from cognito_auth import cognito_jwt_required, get_cognito_user_id
 
 bp = Blueprint("user", __name__, url_prefix="/api/v1/users")
 
+def _use_cursor_pagination():
+    """커서 페이지네이션 요청 여부 (?cursor= 또는 ?pagination=cursor)"""
+    return 'cursor' in request.args or request.args.get('pagination') == 'cursor'
+
+def _cursor_pagination(page, total=None):
+    """커서 모드 응답의 pagination 항목"""
+    pagination = {
+        "mode": "cursor",
+        "per_page": page.per_page,
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more
+    }
+    if total is not None:
+        pagination["total"] = total
+    return pagination
+
 # ==================== 사용자 관리 엔드포인트 ====================
 
 @bp.get("/profile")
@@ -22,16 +46,18 @@ def get_profile():
     """현재 사용자 프로필 조회"""
     try:
         cognito_user_id = get_cognito_user_id()
-        user = User.query.filter_by(cognito_user_id=cognito_user_id).first()
+        user = get_user_snapshot(cognito_user_id)
         
         if not user:
             return jsonify({
                 "error": "User not found"
             }), 404
 
-        return jsonify({
-            "user": user.to_dict()
-        }), 200
+        # ETag/Last-Modified 조건부 응답 (변경이 없으면 304)
+        return conditional_user_response(
+            'profile', user.id, private_version(user),
+            lambda: {"user": user.to_dict()}
+        )
 
     except Exception as e:
         current_app.logger.error(f"Profile retrieval error: {str(e)}")
@@ -45,6 +71,7 @@ def update_profile():
     """사용자 프로필 업데이트"""
     try:
         cognito_user_id = get_cognito_user_id()
+        route_user('cognito_user_id', cognito_user_id)
         user = User.query.filter_by(cognito_user_id=cognito_user_id).first()
         
         if not user:
@@ -52,18 +79,17 @@ def update_profile():
                 "error": "User not found"
             }), 404
 
-        # 파일 업로드 처리
+        # 파일 업로드 처리 (청크 저장 + 백그라운드 아바타 생성)
+        image_result = None
         if 'profileImage' in request.files:
             file = request.files['profileImage']
             if file and file.filename:
-                # 파일 저장 로직 (간단한 예시)
-                filename = f"profile_{cognito_user_id}.png"
-                file_path = os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), filename)
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                file.save(file_path)
-                
-                # 사용자 모델에 프로필 이미지 경로 저장
-                user.profile_image_url = f"/uploads/{filename}"
+                try:
+                    image_result = process_profile_image(user, file)
+                except ImageUploadError as e:
+                    return jsonify({
+                        "error": str(e)
+                    }), e.status_code
 
         # JSON 데이터 처리 (Content-Type이 application/json인 경우에만)
         data = {}
@@ -79,22 +105,182 @@ def update_profile():
         
         user.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_user(cognito_user_id)
 
-        return jsonify({
+        response = {
             "message": "Profile updated successfully",
             "user": user.to_dict()
-        }), 200
+        }
+        if image_result:
+            response["profile_image"] = image_result
 
+        return jsonify(response), 200
+
+    except RequestEntityTooLarge:
+        # 요청 본문 크기 초과는 전역 HTTP 예외 처리기에서 413으로 응답
+        raise
     except Exception as e:
         current_app.logger.error(f"Profile update error: {str(e)}")
         return jsonify({
             "error": "Failed to update profile"
         }), 500
 
+@bp.post("/profile/image/upload-intent")
+@cognito_jwt_required
+def create_profile_image_upload():
+    """프로필 이미지 직접 업로드 URL 발급 (저장소로 직접 업로드)"""
+    try:
+        cognito_user_id = get_cognito_user_id()
+        user = get_user_snapshot(cognito_user_id)
+        
+        if not user:
+            return jsonify({
+                "error": "User not found"
+            }), 404
+
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({
+                "error": "Request body must be a JSON object"
+            }), 400
+        content_type = data.get('content_type')
+        size = data.get('size')
+        max_bytes = current_app.config.get('PROFILE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+        expires_in = current_app.config.get('UPLOAD_INTENT_EXPIRES', 300)
+
+        try:
+            key = new_avatar_key(user.id, content_type)
+        except ImageUploadError as e:
+            return jsonify({
+                "error": str(e)
+            }), e.status_code
+
+        if isinstance(size, int) and size > max_bytes:
+            return jsonify({
+                "error": size_limit_message(max_bytes)
+            }), 413
+
+        upload = get_storage().create_upload_intent(key, content_type, max_bytes, expires_in)
+
+        return jsonify({
+            "upload": upload,
+            "key": key,
+            "max_bytes": max_bytes,
+            "expires_in": expires_in
+        }), 201
+
+    except Exception as e:
+        current_app.logger.error(f"Upload intent error: {str(e)}")
+        return jsonify({
+            "error": "Failed to create upload"
+        }), 500
+
+@bp.put("/profile/image/upload/<token>")
+def upload_profile_image_direct(token):
+    """로컬 저장소용 직접 업로드 엔드포인트 (서명된 업로드 URL로만 접근)"""
+    try:
+        storage = get_storage()
+        if not isinstance(storage, LocalStorage):
+            return jsonify({
+                "error": "Not found"
+            }), 404
+
+        try:
+            intent = storage.load_upload_token(
+                token, current_app.config.get('UPLOAD_INTENT_EXPIRES', 300)
+            )
+        except ValueError as e:
+            return jsonify({
+                "error": str(e)
+            }), 403
+
+        if request.mimetype != intent['content_type']:
+            return jsonify({
+                "error": "Content-Type does not match the upload URL"
+            }), 400
+
+        try:
+            size = storage.write_stream(intent['key'], request.stream, intent['max_bytes'])
+        except ImageUploadError as e:
+            return jsonify({
+                "error": str(e)
+            }), e.status_code
+
+        return jsonify({
+            "key": intent['key'],
+            "size": size
+        }), 201
+
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Direct upload error: {str(e)}")
+        return jsonify({
+            "error": "Upload failed"
+        }), 500
+
+@bp.post("/profile/image/finalize")
+@cognito_jwt_required
+def finalize_profile_image():
+    """직접 업로드 완료 처리 (객체 확인 후 프로필 이미지 URL 갱신)"""
+    try:
+        cognito_user_id = get_cognito_user_id()
+        route_user('cognito_user_id', cognito_user_id)
+        user = User.query.filter_by(cognito_user_id=cognito_user_id).first()
+        
+        if not user:
+            return jsonify({
+                "error": "User not found"
+            }), 404
+
+        data = request.get_json(silent=True) or {}
+        key = data.get('key') if isinstance(data, dict) else None
+        if not isinstance(key, str):
+            return jsonify({
+                "error": "key is required"
+            }), 400
+        storage = get_storage()
+
+        try:
+            verify_uploaded_avatar(
+                storage, user.id, key,
+                max_bytes=current_app.config.get('PROFILE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+            )
+        except ImageUploadError as e:
+            return jsonify({
+                "error": str(e)
+            }), e.status_code
+
+        user.profile_image_url = storage.public_url(key)
+        user.updated_at = datetime.utcnow()
+        db.session.commit()
+        invalidate_user(cognito_user_id)
+
+        return jsonify({
+            "message": "Profile image updated successfully",
+            "user": user.to_dict()
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Profile image finalize error: {str(e)}")
+        return jsonify({
+            "error": "Failed to update profile image"
+        }), 500
+
 @bp.get("/<int:user_id>")
 def get_user(user_id):
     """특정 사용자 정보 조회 (공개용)"""
     try:
+        route_user('id', user_id)
+        
+        # 조건부 요청이면 전체 행 대신 버전(updated_at)만 조회하여 304 여부 판단
+        if request.if_none_match or request.if_modified_since:
+            version = db.session.query(User.updated_at, User.is_active).filter(User.id == user_id).first()
+            if version and version.is_active:
+                response = not_modified_response('public', user_id, version.updated_at)
+                if response is not None:
+                    return response
+
         user = User.query.get(user_id)
         
         if not user or not user.is_active:
@@ -102,9 +288,10 @@ def get_user(user_id):
                 "error": "User not found"
             }), 404
 
-        return jsonify({
-            "user": user.to_public_dict()
-        }), 200
+        return conditional_user_response(
+            'public', user.id, user.updated_at,
+            lambda: {"user": user.to_public_dict()}
+        )
 
     except Exception as e:
         current_app.logger.error(f"User retrieval error: {str(e)}")
@@ -112,31 +299,139 @@ def get_user(user_id):
             "error": "Failed to retrieve user"
         }), 500
 
+@bp.route("/batch", methods=["GET", "POST"])
+def get_users_batch():
+    """여러 사용자 정보 일괄 조회 (공개용, 서비스 간 호출용)"""
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if not isinstance(data, dict):
+                return jsonify({"error": "Request body must be a JSON object"}), 400
+        else:
+            # GET: ?ids=1,2,3&fields=id,username
+            data = {
+                key: [v for v in request.args.get(key, '').split(',') if v]
+                for key in list(UserService.BATCH_LOOKUP_FIELDS) + ['fields']
+                if key in request.args
+            }
+
+        lookups = [key for key in UserService.BATCH_LOOKUP_FIELDS if key in data]
+        if len(lookups) != 1:
+            return jsonify({
+                "error": "Exactly one of ids, usernames or cognito_user_ids is required"
+            }), 400
+
+        lookup = lookups[0]
+        values = data[lookup]
+        if not isinstance(values, list):
+            return jsonify({
+                "error": f"{lookup} must be a list"
+            }), 400
+
+        max_items = current_app.config.get('USER_BATCH_MAX_ITEMS', 100)
+        if len(values) > max_items:
+            return jsonify({
+                "error": f"At most {max_items} {lookup} are allowed per request"
+            }), 400
+
+        if request.method == 'GET' and lookup == 'ids':
+            # 쿼리 문자열의 id는 숫자만 허용
+            if not all(v.isdigit() for v in values):
+                return jsonify({
+                    "error": "ids must be integers"
+                }), 400
+            values = [int(v) for v in values]
+
+        # int(True) == 1, str([...]) 같은 암묵적 변환 없이 타입을 그대로 확인
+        if lookup == 'ids':
+            valid = all(isinstance(v, int) and not isinstance(v, bool) for v in values)
+            expected = "integers"
+        else:
+            valid = all(isinstance(v, str) for v in values)
+            expected = "strings"
+        if not valid:
+            return jsonify({
+                "error": f"{lookup} must be {expected}"
+            }), 400
+
+        # 중복 제거 (요청 순서 유지)
+        values = list(dict.fromkeys(values))
+
+        fields = data.get('fields')
+        if fields is not None:
+            # 문자열이 아닌 항목(리스트 등)은 set()에서 TypeError가 나므로 먼저 확인
+            valid = isinstance(fields, list) and all(isinstance(field, str) for field in fields)
+            unknown = set(fields) - set(User.PUBLIC_FIELDS) if valid else None
+            if unknown is None or unknown:
+                return jsonify({
+                    "error": "Invalid fields",
+                    "allowed_fields": list(User.PUBLIC_FIELDS)
+                }), 400
+
+        found = UserService().get_users_batch(lookup, values)
+
+        users = {}
+        missing = []
+        for value in values:
+            user = found.get(value)
+            if user is None:
+                missing.append(value)
+                continue
+            public = user.to_public_dict()
+            if fields is not None:
+                public = {field: public[field] for field in fields}
+            users[str(value)] = public
+
+        return jsonify({
+            "users": users,
+            "missing": missing
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"User batch retrieval error: {str(e)}")
+        return jsonify({
+            "error": "Failed to retrieve users"
+        }), 500
+
 @bp.get("/search")
 def search_users():
     """사용자 검색"""
     try:
         query = request.args.get('q', '').strip()
         page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
         
         if not query:
             return jsonify({
                 "error": "Search query is required"
             }), 400
 
-        # 사용자 검색
-        users = User.query.filter(
-            User.username.ilike(f'%{query}%'),
-            User.is_active == True
-        ).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # 커서 모드: COUNT(*)/OFFSET 없이 (username, id) 인덱스 순으로 탐색
+        if _use_cursor_pagination():
+            try:
+                users, total = UserService().search_users_keyset(
+                    query,
+                    cursor=request.args.get('cursor') or None,
+                    per_page=per_page,
+                    include_total=request.args.get('include_total') == 'true',
+                    columns=PUBLIC_COLUMNS
+                )
+            except InvalidPagination as e:
+                return jsonify({
+                    "error": str(e)
+                }), 400
+
+            return jsonify({
+                "users": [public_dict_from_row(row) for row in users.items],
+                "pagination": _cursor_pagination(users, total)
+            }), 200
+
+        # 사용자 검색 (username, first_name, last_name / 검색 백엔드 사용)
+        # ORM 객체 대신 공개 필드 컬럼만 조회하여 행을 바로 직렬화
+        users = UserService().search_users(query, page=page, per_page=per_page, columns=PUBLIC_COLUMNS)
 
         return jsonify({
-            "users": [user.to_public_dict() for user in users.items],
+            "users": [public_dict_from_row(row) for row in users.items],
             "pagination": {
                 "page": page,
                 "per_page": per_page,
@@ -155,28 +450,36 @@ def search_users():
 
 @bp.get("/admin/all")
 @cognito_jwt_required
+@admin_required
 def get_all_users():
     """모든 사용자 조회 (관리자용)"""
     try:
-        cognito_user_id = get_cognito_user_id()
-        current_user = User.query.filter_by(cognito_user_id=cognito_user_id).first()
+        page = request.args.get('page', 1, type=int)
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), 100))
         
-        if not current_user or not current_user.is_verified:
-            return jsonify({
-                "error": "Unauthorized"
-            }), 403
+        # 커서 모드: COUNT(*)/OFFSET 없이 id 순으로 탐색
+        if _use_cursor_pagination():
+            try:
+                users, total = UserService().get_all_users_keyset(
+                    cursor=request.args.get('cursor') or None,
+                    per_page=per_page,
+                    include_total=request.args.get('include_total') == 'true',
+                    columns=DICT_COLUMNS
+                )
+            except InvalidPagination as e:
+                return jsonify({
+                    "error": str(e)
+                }), 400
 
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 50, type=int), 100)
+            return jsonify({
+                "users": [dict_from_row(row) for row in users.items],
+                "pagination": _cursor_pagination(users, total)
+            }), 200
         
-        users = User.query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        users = UserService().get_all_users(page=page, per_page=per_page, columns=DICT_COLUMNS)
 
         return jsonify({
-            "users": [user.to_dict() for user in users.items],
+            "users": [dict_from_row(row) for row in users.items],
             "pagination": {
                 "page": page,
                 "per_page": per_page,
@@ -191,19 +494,77 @@ def get_all_users():
             "error": "Failed to retrieve users"
         }), 500
 
+# 스트리밍 내보내기 형식 -> Content-Type
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+@bp.get("/admin/export")
+@cognito_jwt_required
+@admin_required
+def export_users():
+    """전체 사용자 스트리밍 내보내기 (관리자용, NDJSON/CSV)
+
+    서버 측 커서에서 일정 개수씩 읽어 바로 전송하므로 테이블 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({
+            "error": "format must be ndjson or csv"
+        }), 400
+
+    columns = User.DICT_FIELDS
+    fields = request.args.get('fields')
+    if fields:
+        columns = tuple(f.strip() for f in fields.split(',') if f.strip())
+        unknown = [c for c in columns if c not in User.DICT_FIELDS]
+        if unknown:
+            return jsonify({
+                "error": f"Unknown fields: {', '.join(unknown)}"
+            }), 400
+
+    criteria = []
+    for flag in ('is_active', 'is_verified'):
+        value = request.args.get(flag)
+        if value is None:
+            continue
+        if value not in ('true', 'false'):
+            return jsonify({
+                "error": f"{flag} must be true or false"
+            }), 400
+        criteria.append(getattr(User, flag) == (value == 'true'))
+
+    updated_since = request.args.get('updated_since')
+    if updated_since:
+        try:
+            criteria.append(User.updated_at >= parse_datetime(updated_since))
+        except ValueError:
+            return jsonify({
+                "error": "updated_since must be an ISO 8601 datetime"
+            }), 400
+
+    rows = iter_users(
+        columns,
+        batch_size=current_app.config.get('USER_EXPORT_BATCH_SIZE', 1000),
+        criteria=criteria
+    )
+    lines = csv_lines(rows, columns) if fmt == 'csv' else ndjson_lines(rows, columns)
+
+    response = Response(stream_with_context(chunked(lines)), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="users.{fmt}"'
+    response.headers['Cache-Control'] = 'no-store'
+    # nginx가 전체 응답을 버퍼링하지 않고 바로 전달하도록 함
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @bp.put("/admin/<int:user_id>/status")
 @cognito_jwt_required
+@admin_required
 def update_user_status(user_id):
     """사용자 상태 업데이트 (관리자용)"""
     try:
-        cognito_user_id = get_cognito_user_id()
-        current_user = User.query.filter_by(cognito_user_id=cognito_user_id).first()
-        
-        if not current_user or not current_user.is_verified:
-            return jsonify({
-                "error": "Unauthorized"
-            }), 403
-
+        route_user('id', user_id)
         target_user = User.query.get(user_id)
         if not target_user:
             return jsonify({
@@ -217,6 +578,7 @@ def update_user_status(user_id):
             target_user.is_active = is_active
             target_user.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_user(target_user.cognito_user_id)
 
         return jsonify({
             "message": "User status updated successfully",
@@ -0,0 +1,231 @@
+"""
+User Service Read/Write Routing
+읽기 전용 복제본(replica)으로 읽기 요청을 분산하는 세션 라우팅입니다.
+
+- DATABASE_REPLICA_URLS의 각 URL은 SQLAlchemy bind('replica_1', 'replica_2', ...)로 등록
+- GET/HEAD 요청의 SELECT는 정상 상태의 복제본으로, 그 외 요청과 모든 쓰기(flush/DML)는 primary로 전송
+- 쓰기가 있었던 요청의 응답에 쿠키를 설정하여 짧은 시간 동안 해당 클라이언트의 읽기를
+  primary로 고정 (read-your-writes)
+- 복제본 연결 오류 시 일정 시간 제외하고 primary로 재시도, 복제 지연이 기준을 넘으면 제외
+"""
+
+import time
+import logging
+import threading
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+from .sharding import shard_engine_for
+
+logger = logging.getLogger(__name__)
+
+# g.db_route 값
+ROUTE_PRIMARY = 'primary'
+ROUTE_REPLICA = 'replica'
+
+READ_ONLY_METHODS = ('GET', 'HEAD')
+
+# DB별 복제 지연(초) 확인 쿼리 (없으면 연결 확인만 수행)
+REPLICA_LAG_QUERIES = {
+    'postgresql': (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+
+
+class ReplicaState:
+    """복제본 bind 하나의 상태"""
+
+    def __init__(self, bind_key):
+        self.bind_key = bind_key
+        # 이 시각 전까지는 사용하지 않음 (연결 오류/지연)
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.lag = None
+
+
+class ReplicaRouter:
+    """정상 상태의 복제본을 순서대로 선택합니다. (프로세스별 상태)"""
+
+    def __init__(self, bind_keys, max_lag=5.0, check_interval=10.0, retry_interval=30.0):
+        self.replicas = [ReplicaState(key) for key in bind_keys]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def choose(self, engines):
+        """사용할 복제본 bind key를 반환합니다. 사용할 수 있는 복제본이 없으면 None"""
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+
+        for offset in range(len(self.replicas)):
+            state = self.replicas[(start + offset) % len(self.replicas)]
+            if state.down_until > now:
+                continue
+            if now - state.checked_at >= self.check_interval and not self._check(state, engines[state.bind_key]):
+                continue
+            return state.bind_key
+        return None
+
+    def _check(self, state, engine):
+        state.checked_at = time.monotonic()
+        query = REPLICA_LAG_QUERIES.get(engine.dialect.name, "SELECT 1")
+        try:
+            with engine.connect() as conn:
+                value = conn.execute(text(query)).scalar()
+        except Exception as e:
+            self.mark_down(state.bind_key, f"health check failed: {e}")
+            return False
+
+        state.lag = float(value) if engine.dialect.name in REPLICA_LAG_QUERIES and value is not None else None
+        if state.lag is not None and state.lag > self.max_lag:
+            self.mark_down(state.bind_key, f"replication lag {state.lag:.1f}s", self.check_interval)
+            return False
+        return True
+
+    def mark_down(self, bind_key, reason, duration=None):
+        for state in self.replicas:
+            if state.bind_key == bind_key:
+                state.down_until = time.monotonic() + (duration or self.retry_interval)
+                state.checked_at = 0.0
+        logger.warning(f"Database replica '{bind_key}' excluded: {reason}")
+
+    def status(self):
+        now = time.monotonic()
+        return {
+            state.bind_key: {
+                "healthy": state.down_until <= now,
+                "lag": state.lag,
+            }
+            for state in self.replicas
+        }
+
+
+def _get_router():
+    if not has_request_context():
+        return None
+    return current_app.extensions.get('db_replicas')
+
+
+def _is_write(clause):
+    return clause is not None and getattr(clause, 'is_dml', False)
+
+
+class RoutingSession(Session):
+    """요청별 라우팅(g.db_route)에 따라 SELECT를 복제본으로, users 테이블 문장을 샤드로 보내는 세션"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+        # 샤딩 사용 시 users 테이블 문장은 선택된 샤드로 (user/sharding.py)
+        if bind is None and engine is self._db.engines.get(None):
+            shard_engine = shard_engine_for(self._db, mapper, clause)
+            if shard_engine is not None:
+                return shard_engine
+
+        router = _get_router()
+        if (
+            router is None
+            or bind is not None
+            or g.get('db_route') != ROUTE_REPLICA
+            or self._flushing
+            or _is_write(clause)
+            or engine is not self._db.engines.get(None)
+        ):
+            return engine
+
+        bind_key = g.get('db_replica')
+        if bind_key is None:
+            # 요청 동안 같은 복제본을 사용 (요청 안의 읽기 일관성)
+            bind_key = router.choose(self._db.engines)
+            if bind_key is None:
+                g.db_route = ROUTE_PRIMARY
+                return engine
+            g.db_replica = bind_key
+        return self._db.engines[bind_key]
+
+    def execute(self, statement, *args, **kwargs):
+        try:
+            return super().execute(statement, *args, **kwargs)
+        except DBAPIError as e:
+            bind_key = g.get('db_replica') if has_request_context() else None
+            if bind_key is None or not e.connection_invalidated:
+                raise
+
+            # 복제본 연결이 끊어지면 제외하고 같은 요청을 primary에서 재시도 (읽기 요청이므로 안전)
+            _get_router().mark_down(bind_key, str(e.orig))
+            g.db_route = ROUTE_PRIMARY
+            g.db_replica = None
+            self.rollback()
+            return super().execute(statement, *args, **kwargs)
+
+
+def _sticky_until():
+    cookie = request.cookies.get(current_app.config.get('DATABASE_STICKY_COOKIE', 'db_primary_until'))
+    try:
+        return float(cookie) if cookie else 0.0
+    except ValueError:
+        return 0.0
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_bulk_write(orm_execute_state):
+    # Query.update()/delete()는 flush 없이 실행되므로 별도로 추적
+    if has_request_context() and (orm_execute_state.is_update or orm_execute_state.is_delete):
+        g.db_wrote = True
+
+
+def init_replica_routing(app, db):
+    """SQLALCHEMY_BINDS의 복제본 bind(replica_*)로 읽기 요청 라우팅을 설정합니다."""
+    bind_keys = sorted(key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica_'))
+
+    if bind_keys:
+        router = ReplicaRouter(
+            bind_keys,
+            max_lag=app.config.get('DATABASE_REPLICA_MAX_LAG', 5.0),
+            check_interval=app.config.get('DATABASE_REPLICA_CHECK_INTERVAL', 10.0),
+            retry_interval=app.config.get('DATABASE_REPLICA_RETRY_INTERVAL', 30.0)
+        )
+        app.extensions['db_replicas'] = router
+
+        with app.app_context():
+            for key in bind_keys:
+                @event.listens_for(db.engines[key], 'handle_error')
+                def handle_replica_error(context, bind_key=key):
+                    if context.is_disconnect:
+                        router.mark_down(bind_key, str(context.original_exception))
+
+    @app.before_request
+    def choose_db_route():
+        if bind_keys and request.method in READ_ONLY_METHODS and _sticky_until() <= time.time():
+            g.db_route = ROUTE_REPLICA
+        else:
+            g.db_route = ROUTE_PRIMARY
+
+    @app.after_request
+    def set_sticky_cookie(response):
+        if g.get('db_wrote'):
+            window = app.config.get('DATABASE_STICKY_SECONDS', 5)
+            response.set_cookie(
+                app.config.get('DATABASE_STICKY_COOKIE', 'db_primary_until'),
+                str(int(time.time() + window)),
+                max_age=window,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,257 @@
+"""
+User Search Backends
+사용자 검색(username, first_name, last_name 부분 문자열) 백엔드입니다.
+
+`ILIKE '%q%'`는 앞쪽 와일드카드 때문에 인덱스를 사용할 수 없어 매 검색마다 전체 테이블을
+훑게 됩니다. DATABASE_TYPE에 따라 인덱스를 사용할 수 있는 백엔드를 선택합니다.
+
+- sqlite: FTS5(trigram 토크나이저) 섀도 테이블 + 트리거로 users 테이블과 동기화, bm25 순위
+- postgresql: pg_trgm GIN 인덱스 + similarity 순위
+- mysql 및 기타: 기존 ILIKE 검색 (대체 경로)
+"""
+
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import or_, func, select, text, table, literal_column
+
+from .models import db, User
+from .sharding import shard_engines
+
+SEARCH_COLUMNS = ('username', 'first_name', 'last_name')
+
+
+class LikeSearchBackend:
+    """ILIKE 기반 검색 (인덱스 미사용, 모든 DB에서 동작)"""
+
+    name = 'like'
+
+    def install(self, engine=None):
+        """검색용 인덱스/테이블을 준비합니다. 성공하면 True (engine: 기본값 primary)"""
+        return True
+
+    def installed(self, engine=None):
+        """검색에 필요한 테이블/확장이 이미 있는지 확인합니다. (DDL 없음)"""
+        return True
+
+    def apply(self, query, q, rank=False):
+        """검색 조건(과 선택적으로 순위 정렬)을 쿼리에 적용합니다."""
+        pattern = f'%{q}%'
+        return query.filter(or_(*[
+            getattr(User, column).ilike(pattern) for column in SEARCH_COLUMNS
+        ]))
+
+    @contextmanager
+    def bulk_load(self):
+        """대량 적재 동안 검색 인덱스 유지를 멈추고, 끝나면 한 번에 재구성합니다."""
+        yield
+
+
+class SQLiteFTS5SearchBackend(LikeSearchBackend):
+    """SQLite FTS5 trigram 섀도 테이블 기반 검색"""
+
+    name = 'sqlite_fts5'
+    table_name = 'users_fts'
+
+    # trigram 토크나이저는 3글자 이상부터 인덱스를 사용할 수 있음
+    min_query_length = 3
+
+    def install(self, engine=None):
+        columns = ', '.join(SEARCH_COLUMNS)
+        fts = self.table_name
+
+        with (engine or db.engine).begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': fts}
+            ).first()
+            if exists:
+                return True
+
+            try:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                    f"{columns}, content='users', content_rowid='id', tokenize='trigram')"
+                ))
+            except Exception as e:
+                current_app.logger.warning(f"FTS5 trigram search is not available: {e}")
+                return False
+
+            self._create_triggers(conn)
+            # 기존 사용자 데이터로 인덱스 구성
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+        return True
+
+    def installed(self, engine=None):
+        with (engine or db.engine).connect() as conn:
+            return conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': self.table_name}
+            ).first() is not None
+
+    def _create_triggers(self, conn):
+        columns = ', '.join(SEARCH_COLUMNS)
+        new_values = ', '.join(f'new.{c}' for c in SEARCH_COLUMNS)
+        old_values = ', '.join(f'old.{c}' for c in SEARCH_COLUMNS)
+        fts = self.table_name
+
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON users BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON users BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON users BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        ))
+
+    @contextmanager
+    def bulk_load(self):
+        # 행마다 트리거로 trigram 인덱스를 갱신하는 대신 적재 후 'rebuild' 한 번으로 구성
+        fts = self.table_name
+        with db.engine.begin() as conn:
+            for suffix in ('ai', 'ad', 'au'):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{suffix}"))
+        try:
+            yield
+        finally:
+            with db.engine.begin() as conn:
+                self._create_triggers(conn)
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+    def apply(self, query, q, rank=False):
+        if len(q) < self.min_query_length:
+            return super().apply(query, q, rank)
+
+        # 전체 문자열을 하나의 구(phrase)로 검색 (FTS 문법 문자 이스케이프)
+        phrase = '"' + q.replace('"', '""') + '"'
+        matches = select(
+            literal_column('rowid').label('user_id'),
+            literal_column(f'bm25({self.table_name})').label('rank')
+        ).select_from(
+            table(self.table_name)
+        ).where(
+            text(f"{self.table_name} MATCH :fts_query").bindparams(fts_query=phrase)
+        ).subquery()
+
+        query = query.join(matches, User.id == matches.c.user_id)
+        if rank:
+            query = query.order_by(matches.c.rank, User.id)
+        return query
+
+
+class PostgresTrigramSearchBackend(LikeSearchBackend):
+    """PostgreSQL pg_trgm GIN 인덱스 기반 검색"""
+
+    name = 'postgres_trgm'
+
+    def install(self, engine=None):
+        try:
+            with (engine or db.engine).begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for column in SEARCH_COLUMNS:
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS ix_users_{column}_trgm "
+                        f"ON users USING gin ({column} gin_trgm_ops)"
+                    ))
+        except Exception as e:
+            current_app.logger.warning(f"pg_trgm search indexes are not available: {e}")
+            return False
+        return True
+
+    def installed(self, engine=None):
+        # 순위 정렬의 similarity()에 확장이 필요 (인덱스가 없으면 느릴 뿐 동작함)
+        with (engine or db.engine).connect() as conn:
+            return conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+    @contextmanager
+    def bulk_load(self):
+        # GIN 인덱스는 적재 후 새로 만드는 편이 행 단위 갱신보다 빠름
+        with db.engine.begin() as conn:
+            for column in SEARCH_COLUMNS:
+                conn.execute(text(f"DROP INDEX IF EXISTS ix_users_{column}_trgm"))
+        try:
+            yield
+        finally:
+            self.install()
+
+    def apply(self, query, q, rank=False):
+        # ILIKE '%q%'는 gin_trgm_ops 인덱스로 처리됨
+        query = super().apply(query, q, rank)
+        if rank:
+            similarity = func.greatest(*[
+                func.coalesce(func.similarity(getattr(User, column), q), 0)
+                for column in SEARCH_COLUMNS
+            ])
+            query = query.order_by(similarity.desc(), User.id)
+        return query
+
+
+SEARCH_BACKENDS = {
+    LikeSearchBackend.name: LikeSearchBackend,
+    SQLiteFTS5SearchBackend.name: SQLiteFTS5SearchBackend,
+    PostgresTrigramSearchBackend.name: PostgresTrigramSearchBackend,
+}
+
+DEFAULT_BACKENDS = {
+    'sqlite': SQLiteFTS5SearchBackend.name,
+    'postgresql': PostgresTrigramSearchBackend.name,
+    'mysql': LikeSearchBackend.name,
+}
+
+
+def init_search(app):
+    """DATABASE_TYPE(또는 USER_SEARCH_BACKEND)에 맞는 검색 백엔드를 등록합니다."""
+    name = app.config.get('USER_SEARCH_BACKEND') or 'auto'
+    if name == 'auto':
+        name = DEFAULT_BACKENDS.get(app.config.get('DATABASE_TYPE', 'sqlite'), LikeSearchBackend.name)
+
+    if name not in SEARCH_BACKENDS:
+        raise ValueError(f"Unknown user search backend: {name}")
+
+    app.extensions['user_search'] = SEARCH_BACKENDS[name]()
+
+
+def install_search(app):
+    """검색 인덱스를 준비합니다. 실패하면 ILIKE 검색으로 대체합니다. (앱 컨텍스트 필요)
+
+    샤딩 사용 시 users 테이블이 있는 각 샤드에 인덱스를 준비합니다.
+    """
+    backend = app.extensions.get('user_search')
+    if not backend:
+        return
+
+    engines = shard_engines() or [db.engine]
+    if not all([backend.install(engine) for engine in engines]):
+        app.logger.warning(f"Falling back to ILIKE user search (backend '{backend.name}' unavailable)")
+        app.extensions['user_search'] = LikeSearchBackend()
+
+
+def verify_search(app):
+    """install_search()의 DDL 없이 검색 인덱스가 준비되었는지만 확인합니다. (앱 컨텍스트 필요)
+
+    migrate 모드의 워커에서 사용하며, 인덱스는 `flask bootstrap`이 생성합니다.
+    """
+    backend = app.extensions.get('user_search')
+    if not backend:
+        return
+
+    engines = shard_engines() or [db.engine]
+    try:
+        ready = all([backend.installed(engine) for engine in engines])
+    except Exception as e:
+        app.logger.warning(f"Could not check search backend '{backend.name}': {e}")
+        ready = False
+    if not ready:
+        app.logger.warning(f"Falling back to ILIKE user search (backend '{backend.name}' not installed)")
+        app.extensions['user_search'] = LikeSearchBackend()
+
+
+def get_search_backend():
+    """현재 앱의 검색 백엔드"""
+    return current_app.extensions.get('user_search') or LikeSearchBackend()
@@ -5,37 +5,81 @@ MSA 환경에서 User 서비스의 비즈니스 로직을 담당합니다.
 
 from datetime import datetime
 from flask import current_app
+from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
 
 from .models import db, User
+from .identity_cache import invalidate_user
+from .pagination import (
+    keyset_paginate, count_cache, InvalidPagination, merge_keyset_pages, merge_offset_pages
+)
+from .search import get_search_backend
+from .sharding import (
+    is_sharded, route_user, find_user_shard, assign_new_user, release_new_user,
+    group_by_shard, fan_out
+)
 
 class UserService:
     """사용자 서비스 클래스"""
     
     def get_user_by_id(self, user_id):
         """ID로 사용자 조회"""
+        route_user('id', user_id)
         return User.query.get(user_id)
     
     def get_user_by_username(self, username):
         """사용자명으로 사용자 조회"""
+        route_user('username', username)
         return User.query.filter_by(username=username).first()
     
     def get_user_by_email(self, email):
         """이메일로 사용자 조회"""
+        route_user('email', email)
         return User.query.filter_by(email=email).first()
     
     def get_user_by_cognito_id(self, cognito_user_id):
         """Cognito User ID로 사용자 조회"""
+        route_user('cognito_user_id', cognito_user_id)
         return User.query.filter_by(cognito_user_id=cognito_user_id).first()
     
+    # 배치 조회에 사용할 수 있는 키 (요청 필드명 -> User 컬럼)
+    BATCH_LOOKUP_FIELDS = {
+        'ids': 'id',
+        'usernames': 'username',
+        'cognito_user_ids': 'cognito_user_id',
+    }
+    
+    def get_users_batch(self, lookup, values):
+        """여러 사용자를 단일 IN 쿼리로 조회 (키 값 -> 활성 사용자)"""
+        column = getattr(User, self.BATCH_LOOKUP_FIELDS[lookup])
+        if not values:
+            return {}
+        
+        if is_sharded():
+            # 디렉터리로 샤드별로 나눈 뒤 샤드마다 IN 쿼리를 병렬 실행
+            groups = group_by_shard(column.key, values)
+            results = fan_out(
+                lambda shard: User.query.filter(column.in_(groups[shard]), User.is_active == True).all(),
+                shards=groups
+            )
+            users = [user for _, shard_users in results for user in shard_users]
+        else:
+            users = User.query.filter(
+                column.in_(values),
+                User.is_active == True
+            ).all()
+        
+        return {getattr(user, column.key): user for user in users}
+    
     def create_user_from_cognito(self, username, email, cognito_user_id, **kwargs):
         """Cognito에서 생성된 사용자를 로컬 DB에 저장"""
+        user = None
         try:
             # 사용자명과 이메일 중복 확인
-            if User.query.filter_by(username=username).first():
+            if self._exists('username', username):
                 raise ValueError("Username already exists")
             
-            if User.query.filter_by(email=email).first():
+            if self._exists('email', email):
                 raise ValueError("Email already exists")
             
             # 새 사용자 생성 (비밀번호 없이)
@@ -48,6 +92,8 @@ class UserService:
                 **kwargs
             )
             
+            # 샤딩 사용 시 디렉터리에 등록하여 전역 id/샤드 할당
+            assign_new_user(user)
             db.session.add(user)
             db.session.commit()
             
@@ -55,7 +101,61 @@ class UserService:
             
         except IntegrityError:
             db.session.rollback()
+            release_new_user(user)
             raise ValueError("Database constraint violation")
+        except Exception as e:
+            db.session.rollback()
+            release_new_user(user)
+            raise e
+    
+    def _exists(self, column, value):
+        """사용자 중복 확인 (샤딩 사용 시 디렉터리 기준 전역 확인)"""
+        if is_sharded():
+            return find_user_shard(column, value) is not None
+        return User.query.filter_by(**{column: value}).first() is not None
+    
+    def record_login(self, cognito_user_id, username, email=None):
+        """로그인 시 마지막 로그인 시각 갱신 (로컬 사용자가 없으면 JIT 생성)"""
+        user = None
+        try:
+            now = datetime.utcnow()
+            
+            # 샤딩 사용 시 사용자가 있는 샤드 선택
+            route_user('cognito_user_id', cognito_user_id) or route_user('cognito_user_id', username)
+            
+            # 조회 후 수정 대신 단일 UPDATE로 처리
+            # (회원가입 시에는 Cognito Username이 cognito_user_id로 저장되므로 함께 확인)
+            # 로그인은 프로필 변경이 아니므로 updated_at(ETag/Last-Modified 기준)은 그대로 유지
+            updated = User.query.filter(
+                or_(User.cognito_user_id == cognito_user_id, User.cognito_user_id == username)
+            ).update({'last_login_at': now, 'updated_at': User.updated_at}, synchronize_session=False)
+            
+            if not updated:
+                if not email:
+                    db.session.rollback()
+                    return False
+                
+                user = User(
+                    username=username,
+                    email=email,
+                    cognito_user_id=cognito_user_id,
+                    is_active=True,
+                    last_login_at=now
+                )
+                assign_new_user(user)
+                db.session.add(user)
+            
+            db.session.commit()
+            invalidate_user(cognito_user_id)
+            invalidate_user(username)
+            return True
+            
+        except IntegrityError:
+            # 같은 사용자명/이메일의 로컬 사용자가 이미 있는 경우
+            db.session.rollback()
+            release_new_user(user)
+            current_app.logger.warning(f"Failed to provision local user on login: {username}")
+            return False
         except Exception as e:
             db.session.rollback()
             raise e
@@ -63,6 +163,7 @@ class UserService:
     def update_user_profile(self, user_id, **kwargs):
         """사용자 프로필 업데이트"""
         try:
+            route_user('id', user_id)
             user = User.query.get(user_id)
             if not user:
                 raise ValueError("User not found")
@@ -79,6 +180,7 @@ class UserService:
             
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_user(user.cognito_user_id)
             
             return user
             
@@ -86,13 +188,24 @@ class UserService:
             db.session.rollback()
             raise e
     
-    def search_users(self, query, page=1, per_page=20):
-        """사용자 검색"""
+    def search_users(self, query, page=1, per_page=20, columns=None):
+        """사용자 검색 (columns 지정 시 해당 컬럼만 조회한 행 반환)"""
         try:
-            users = User.query.filter(
-                User.username.ilike(f'%{query}%'),
-                User.is_active == True
-            ).paginate(
+            if is_sharded():
+                # 샤드 간 관련도 점수는 비교할 수 없으므로 (username, id) 순으로 병합
+                return self._fan_out_paginate(
+                    lambda: self._select(
+                        get_search_backend().apply(User.query.filter(User.is_active == True), query), columns
+                    ),
+                    [User.username, User.id], page, per_page
+                )
+            
+            # 검색 백엔드(FTS5/pg_trgm/ILIKE)로 필터링하고 관련도 순 정렬
+            users = self._select(get_search_backend().apply(
+                User.query.filter(User.is_active == True),
+                query,
+                rank=True
+            ), columns).paginate(
                 page=page, 
                 per_page=per_page, 
                 error_out=False
@@ -104,10 +217,35 @@ class UserService:
             current_app.logger.error(f"User search error: {str(e)}")
             raise e
     
-    def get_all_users(self, page=1, per_page=50):
-        """모든 사용자 조회 (관리자용)"""
+    def search_users_keyset(self, query, cursor=None, per_page=20, include_total=False, columns=None):
+        """사용자 검색 (커서 기반, (username, id) 순)"""
         try:
-            users = User.query.paginate(
+            return self._keyset_page(
+                lambda: self._select(
+                    get_search_backend().apply(User.query.filter(User.is_active == True), query), columns
+                ),
+                sort='username',
+                order_columns=[User.username, User.id],
+                cursor=cursor,
+                per_page=per_page,
+                count_key=('search', query) if include_total else None
+            )
+            
+        except InvalidPagination:
+            raise
+        except Exception as e:
+            current_app.logger.error(f"User search error: {str(e)}")
+            raise e
+    
+    def get_all_users(self, page=1, per_page=50, columns=None):
+        """모든 사용자 조회 (관리자용, columns 지정 시 해당 컬럼만 조회한 행 반환)"""
+        try:
+            if is_sharded():
+                return self._fan_out_paginate(
+                    lambda: self._select(User.query, columns), [User.id], page, per_page
+                )
+            
+            users = self._select(User.query, columns).paginate(
                 page=page, 
                 per_page=per_page, 
                 error_out=False
@@ -118,3 +256,73 @@ class UserService:
         except Exception as e:
             current_app.logger.error(f"Get all users error: {str(e)}")
             raise e
+    
+    def get_all_users_keyset(self, cursor=None, per_page=50, include_total=False, columns=None):
+        """모든 사용자 조회 (관리자용, 커서 기반, id 순)"""
+        try:
+            return self._keyset_page(
+                lambda: self._select(User.query, columns),
+                sort='id',
+                order_columns=[User.id],
+                cursor=cursor,
+                per_page=per_page,
+                count_key=('all',) if include_total else None
+            )
+            
+        except InvalidPagination:
+            raise
+        except Exception as e:
+            current_app.logger.error(f"Get all users error: {str(e)}")
+            raise e
+    
+    @staticmethod
+    def _select(query, columns):
+        """columns가 있으면 ORM 객체 대신 해당 컬럼만 조회 (행을 직렬화 함수로 바로 변환할 때)
+
+        정렬/병합에 쓰는 컬럼(username, id)은 columns에 포함되어 있어야 합니다.
+        """
+        return query.with_entities(*columns) if columns else query
+    
+    def _keyset_page(self, build_query, sort, order_columns, cursor, per_page, count_key=None):
+        """keyset 페이지와 선택적 total 조회 (샤딩 사용 시 샤드별 페이지를 병렬 조회 후 병합)"""
+        def shard_page(shard):
+            base_query = build_query()
+            page = keyset_paginate(
+                base_query,
+                sort=sort,
+                order_columns=order_columns,
+                cursor=cursor,
+                per_page=per_page
+            )
+            total = None
+            if count_key is not None:
+                total = self._cached_count(count_key if shard is None else count_key + (shard,), base_query)
+            return page, total
+        
+        results = [result for _, result in fan_out(shard_page)]
+        if len(results) == 1:
+            return results[0]
+        
+        page = merge_keyset_pages([page for page, _ in results], sort, order_columns, per_page)
+        total = sum(total for _, total in results) if count_key is not None else None
+        return page, total
+    
+    def _fan_out_paginate(self, build_query, order_columns, page, per_page):
+        """샤드마다 상위 page * per_page건과 건수를 병렬 조회하여 OFFSET 페이지로 병합"""
+        page = max(page, 1)
+        
+        def shard_page(shard):
+            base_query = build_query()
+            items = base_query.order_by(*order_columns).limit(page * per_page).all()
+            return items, base_query.order_by(None).count()
+        
+        return merge_offset_pages(
+            [result for _, result in fan_out(shard_page)], order_columns, page, per_page
+        )
+    
+    def _cached_count(self, key, query):
+        """짧은 TTL로 캐시된 COUNT(*) (커서 모드의 선택적 total)"""
+        return count_cache.count(
+            key, query,
+            ttl=current_app.config.get('PAGINATION_COUNT_CACHE_TTL', 30)
+        )
@@ -0,0 +1,357 @@
+"""
+User Sharding
+users 테이블을 여러 DB(샤드)에 나누어 저장하기 위한 데이터 접근 계층입니다. (SHARD_URLS 설정 시 사용)
+
+- 각 샤드 URL은 SQLAlchemy bind('shard_1', 'shard_2', ...)로 등록
+- 새 사용자의 샤드는 샤드 키(SHARD_KEY: id 또는 cognito_user_id)의 일관된 해시(consistent hashing)로 결정
+- primary DB의 user_directory 테이블이 전역 id 발급, username/email/cognito_user_id 전역 고유성,
+  사용자 -> 샤드 위치를 담당 (재배치 후에도 디렉터리가 기준)
+- 단일 사용자 조회/수정은 route_user()로 샤드를 선택한 뒤 기존 User.query 코드를 그대로 사용
+  (RoutingSession이 users 테이블 문장을 선택된 샤드로 전송)
+- 검색/전체 목록은 fan_out()으로 샤드마다 병렬 실행 후 정렬 키 기준으로 병합
+- 샤드 추가 후 flask users rebalance로 배치가 바뀐 사용자를 새 샤드로 이동
+"""
+
+import os
+import time
+import bisect
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select, insert, update, delete, inspect
+from sqlalchemy.sql.util import find_tables
+
+from .query_stats import current_recorders, recording
+
+directory_metadata = MetaData()
+
+# 사용자 디렉터리 (primary DB)
+user_directory = Table(
+    'user_directory', directory_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('username', String(50), nullable=False, unique=True),
+    Column('email', String(120), nullable=False, unique=True),
+    Column('cognito_user_id', String(128), unique=True),
+    Column('shard', String(64), nullable=False, index=True),
+    Column('created_at', DateTime, default=datetime.utcnow),
+    # 삭제된 id를 재사용하지 않음
+    sqlite_autoincrement=True
+)
+
+class ShardNotSelected(RuntimeError):
+    """샤드를 선택하지 않고 users 테이블에 접근함"""
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(str(value).encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """가상 노드를 사용하는 일관된 해시 링
+
+    샤드를 추가/제거하면 전체 키 중 약 1/N만 다른 샤드로 이동합니다.
+    """
+
+    def __init__(self, nodes, vnodes=64):
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key):
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+class ShardSet:
+    """설정된 샤드 목록과 배치 규칙 (app.extensions['user_shards'])"""
+
+    def __init__(self, bind_keys, shard_key='id', vnodes=64, workers=8):
+        if shard_key not in ('id', 'cognito_user_id'):
+            raise ValueError("SHARD_KEY must be 'id' or 'cognito_user_id'")
+        self.bind_keys = list(bind_keys)
+        self.shard_key = shard_key
+        self.ring = HashRing(self.bind_keys, vnodes)
+        self.workers = workers
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def placement(self, user_id, cognito_user_id=None):
+        """사용자가 위치해야 할 샤드"""
+        if self.shard_key == 'cognito_user_id' and cognito_user_id:
+            return self.ring.node_for(cognito_user_id)
+        return self.ring.node_for(user_id)
+
+    def executor(self):
+        # 작업자 스레드는 프로세스별로 생성 (fork 이후 재생성)
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=min(self.workers, len(self.bind_keys)),
+                        thread_name_prefix='shard-fanout'
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+
+def init_sharding(app):
+    """SQLALCHEMY_BINDS의 샤드 bind(shard_*)로 샤딩을 설정합니다."""
+    bind_keys = sorted(
+        (key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('shard_')),
+        key=lambda key: int(key.split('_', 1)[1])
+    )
+    if bind_keys:
+        app.extensions['user_shards'] = ShardSet(
+            bind_keys,
+            shard_key=app.config.get('SHARD_KEY', 'id'),
+            vnodes=app.config.get('SHARD_VNODES', 64),
+            workers=app.config.get('SHARD_FANOUT_WORKERS', 8)
+        )
+
+
+def install_sharding(app, db):
+    """디렉터리 테이블(primary)과 샤드별 users 테이블을 생성합니다. (앱 컨텍스트 필요)"""
+    shards = app.extensions.get('user_shards')
+    if shards is None:
+        return
+
+    directory_metadata.create_all(db.engine)
+    users = db.metadata.tables['users']
+    for key in shards.bind_keys:
+        users.create(db.engines[key], checkfirst=True)
+
+
+def get_shards():
+    """현재 앱의 ShardSet (샤딩 미사용 시 None)"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('user_shards')
+
+
+def is_sharded():
+    return get_shards() is not None
+
+
+def targets_users(mapper, clause):
+    """문장이 users 테이블을 대상으로 하는지 확인합니다."""
+    if mapper is not None:
+        return inspect(mapper).local_table.name == 'users'
+    if clause is not None:
+        return any(getattr(table, 'name', None) == 'users' for table in find_tables(clause, include_crud=True))
+    return False
+
+
+def shard_engine_for(db, mapper, clause):
+    """users 테이블 문장이면 선택된 샤드 엔진을, 아니면 None을 반환합니다. (RoutingSession에서 사용)"""
+    if get_shards() is None or not targets_users(mapper, clause):
+        return None
+
+    shard = g.get('db_shard')
+    if shard is None:
+        raise ShardNotSelected("Select a shard with route_user() or fan_out() before querying users")
+    return db.engines[shard]
+
+
+def _db():
+    from .models import db
+    return db
+
+
+def find_user_shard(column, value):
+    """디렉터리에서 사용자의 샤드를 찾습니다. 없으면 None"""
+    return _db().session.execute(
+        select(user_directory.c.shard).where(user_directory.c[column] == value)
+    ).scalar()
+
+
+def route_user(column, value):
+    """단일 사용자 조회/수정 전에 해당 사용자의 샤드를 선택합니다. (샤딩 미사용 시 아무것도 하지 않음)
+
+    디렉터리에 없는 사용자는 임의의 샤드를 선택하므로 이어지는 조회 결과가 없습니다.
+    """
+    shards = get_shards()
+    if shards is None:
+        return None
+
+    shard = find_user_shard(column, value) if value is not None else None
+    g.db_shard = shard or shards.bind_keys[0]
+    return shard
+
+
+def use_shard(shard):
+    """현재 컨텍스트의 users 문장을 지정한 샤드로 보냅니다."""
+    g.db_shard = shard
+
+
+def assign_new_user(user):
+    """새 사용자를 디렉터리에 등록하고 전역 id와 샤드를 할당합니다.
+
+    username/email/cognito_user_id가 이미 있으면 IntegrityError. 이후 샤드 커밋에 실패하면
+    release_new_user()로 디렉터리 항목을 제거해야 합니다. (샤딩 미사용 시 아무것도 하지 않음)
+    """
+    shards = get_shards()
+    if shards is None:
+        return
+
+    db = _db()
+    with db.engine.begin() as conn:
+        user_id = conn.execute(user_directory.insert().values(
+            username=user.username,
+            email=user.email,
+            cognito_user_id=user.cognito_user_id,
+            shard=''
+        )).inserted_primary_key[0]
+        shard = shards.placement(user_id, user.cognito_user_id)
+        conn.execute(update(user_directory).where(user_directory.c.id == user_id).values(shard=shard))
+
+    user.id = user_id
+    g.db_shard = shard
+
+
+def release_new_user(user):
+    """assign_new_user()로 등록했지만 저장하지 못한 사용자를 디렉터리에서 제거합니다."""
+    if get_shards() is None or user is None or user.id is None:
+        return
+    with _db().engine.begin() as conn:
+        conn.execute(delete(user_directory).where(user_directory.c.id == user.id))
+
+
+def group_by_shard(column, values):
+    """디렉터리로 값들을 샤드별로 묶습니다. ({shard: [값, ...]}, 디렉터리에 없는 값은 제외)"""
+    rows = _db().session.execute(
+        select(user_directory.c[column], user_directory.c.shard).where(user_directory.c[column].in_(values))
+    ).all()
+    groups = {}
+    for value, shard in rows:
+        groups.setdefault(shard, []).append(value)
+    return groups
+
+
+def fan_out(fn, shards=None):
+    """fn(shard)를 샤드마다 병렬로 실행하고 [(shard, 결과)]를 반환합니다.
+
+    각 작업은 별도의 앱 컨텍스트(세션)에서 해당 샤드를 선택한 상태로 실행되므로
+    fn 안에서는 기존 User.query 코드를 그대로 사용할 수 있습니다.
+    샤딩 미사용 시 현재 컨텍스트에서 fn(None)을 한 번 실행합니다.
+    """
+    shard_set = get_shards()
+    if shard_set is None:
+        return [(None, fn(None))]
+
+    db = _db()
+    app = current_app._get_current_object()
+    keys = list(shard_set.bind_keys if shards is None else shards)
+    # 작업 스레드에서 실행된 문장도 현재 요청의 쿼리 집계에 포함
+    recorders = current_recorders()
+
+    def run(shard):
+        with app.app_context(), recording(recorders):
+            g.db_shard = shard
+            try:
+                return fn(shard)
+            finally:
+                db.session.remove()
+
+    return list(zip(keys, shard_set.executor().map(run, keys)))
+
+
+def shard_engines():
+    """샤드 엔진 목록 (샤딩 미사용 시 None)"""
+    shards = get_shards()
+    if shards is None:
+        return None
+    engines = _db().engines
+    return [engines[key] for key in shards.bind_keys]
+
+
+def plan_moves(batch_size=5000):
+    """현재 해시 링 기준으로 위치가 바뀐 사용자를 찾습니다. ({(원본 샤드, 대상 샤드): [id, ...]})"""
+    shards = get_shards()
+    moves = {}
+    stmt = select(user_directory.c.id, user_directory.c.cognito_user_id, user_directory.c.shard) \
+        .order_by(user_directory.c.id)
+
+    with _db().engine.connect() as conn:
+        for user_id, cognito_user_id, shard in conn.execution_options(yield_per=batch_size).execute(stmt):
+            target = shards.placement(user_id, cognito_user_id)
+            if target != shard:
+                moves.setdefault((shard, target), []).append(user_id)
+    return moves
+
+
+def _read_users(engine, table, ids):
+    with engine.connect() as conn:
+        return [dict(row._mapping) for row in conn.execute(select(table).where(table.c.id.in_(ids)))]
+
+
+def _copy_users(engine, table, rows):
+    # 재시도해도 같은 결과가 되도록 대상 샤드의 기존 행을 지우고 다시 기록
+    with engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.id.in_([row['id'] for row in rows])))
+        conn.execute(insert(table), rows)
+
+
+def _recopy_unchanged(engine, table, rows, copied):
+    """대상 샤드의 행이 첫 복사 이후 바뀌지 않았을 때만 원본의 최신 값으로 갱신합니다.
+
+    디렉터리 변경 이후의 요청은 대상 샤드에 기록하므로, 대상 행이 바뀌었으면 그 값이 더 최신입니다.
+    갱신하지 못한(충돌한) 사용자 id 목록을 반환합니다.
+    """
+    conflicts = []
+    with engine.begin() as conn:
+        for row in rows:
+            first = copied[row['id']]
+            result = conn.execute(
+                update(table)
+                .where(*(table.c[column] == value for column, value in first.items()))
+                .values({column: value for column, value in row.items() if column != 'id'})
+            )
+            if result.rowcount != 1:
+                conflicts.append(row['id'])
+    return conflicts
+
+
+def move_users(source, target, ids, grace=1.0):
+    """사용자들을 원본 샤드에서 대상 샤드로 이동합니다. (이동한 사용자 수, 충돌한 사용자 id 목록)을 반환합니다.
+
+    1. 대상 샤드에 복사 2. 디렉터리의 샤드 변경 (이후 요청은 대상 샤드 사용)
+    3. grace초 동안 변경 전 디렉터리를 읽은 요청이 끝나기를 기다린 뒤, 그 사이 원본에서
+       수정된 행을 다시 복사 (대상 샤드에서도 이미 수정된 행은 덮어쓰지 않고 충돌로 보고)
+    4. 원본 샤드에서 삭제
+    """
+    db = _db()
+    table = db.metadata.tables['users']
+    source_engine, target_engine = db.engines[source], db.engines[target]
+
+    rows = _read_users(source_engine, table, ids)
+    if not rows:
+        return 0, []
+    ids = [row['id'] for row in rows]
+    _copy_users(target_engine, table, rows)
+
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(user_directory)
+            .where(user_directory.c.id.in_(ids), user_directory.c.shard == source)
+            .values(shard=target)
+        )
+
+    time.sleep(grace)
+
+    # 첫 복사 이후 원본에서 바뀐 행 (updated_at을 바꾸지 않는 수정도 포함하도록 행 전체를 비교)
+    copied = {row['id']: row for row in rows}
+    late = [row for row in _read_users(source_engine, table, ids) if row != copied[row['id']]]
+    conflicts = _recopy_unchanged(target_engine, table, late, copied) if late else []
+    if conflicts:
+        current_app.logger.warning(
+            f"Rebalance {source} -> {target}: users {conflicts} changed on both shards during the grace period; "
+            f"kept the {target} rows"
+        )
+
+    with source_engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.id.in_(ids)))
+    return len(rows), conflicts
@@ -0,0 +1,260 @@
+"""
+User Object Storage
+프로필 이미지를 API 워커를 거치지 않고 저장소에 직접 업로드하기 위한 저장소 계층입니다.
+
+업로드 흐름:
+1. 클라이언트가 업로드 의도(upload intent)를 요청하면 서명된 업로드 URL을 발급
+2. 클라이언트가 해당 URL로 파일을 직접 업로드 (S3 presigned POST)
+3. 클라이언트가 완료(finalize)를 호출하면 객체를 확인하고 profile_image_url을 갱신
+
+STORAGE_BACKEND 설정에 따라 백엔드를 선택합니다.
+- local: UPLOAD_FOLDER 아래에 저장 (서명된 토큰으로 보호되는 로컬 업로드 엔드포인트 사용)
+- s3: Amazon S3 또는 S3 호환 저장소 (STORAGE_S3_ENDPOINT_URL로 MinIO/moto 서버 지정 가능)
+"""
+
+import os
+import uuid
+
+from flask import current_app, url_for
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+from .images import sniff_image_format, size_limit_message, CHUNK_SIZE, ImageUploadError, ImageTooLarge
+
+# 업로드 허용 Content-Type -> 확장자
+ALLOWED_CONTENT_TYPES = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+
+class ObjectExists(ImageUploadError):
+    """같은 키에 이미 업로드된 객체가 있음 (업로드 URL은 한 번만 사용 가능)"""
+
+    status_code = 409
+
+
+class ObjectInfo:
+    """저장된 객체 정보"""
+
+    def __init__(self, size, content_type, head):
+        self.size = size
+        self.content_type = content_type
+        # 형식 확인용 앞부분 바이트
+        self.head = head
+
+
+class LocalStorage:
+    """로컬 파일 시스템 저장소"""
+
+    name = 'local'
+    token_salt = 'user-upload-intent'
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError("Invalid object key")
+        return path
+
+    def _serializer(self):
+        return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=self.token_salt)
+
+    def create_upload_intent(self, key, content_type, max_bytes, expires_in):
+        token = self._serializer().dumps({'key': key, 'content_type': content_type, 'max_bytes': max_bytes})
+        return {
+            'method': 'PUT',
+            'url': url_for('user.upload_profile_image_direct', token=token, _external=True),
+            'headers': {'Content-Type': content_type},
+            'fields': {},
+        }
+
+    def load_upload_token(self, token, expires_in):
+        """로컬 업로드 토큰을 확인합니다. 유효하지 않으면 ValueError"""
+        try:
+            return self._serializer().loads(token, max_age=expires_in)
+        except SignatureExpired:
+            raise ValueError("Upload URL has expired")
+        except BadSignature:
+            raise ValueError("Invalid upload URL")
+
+    def write_stream(self, key, stream, max_bytes):
+        """스트림을 청크 단위로 저장합니다. (로컬 업로드 엔드포인트용)
+
+        키마다 한 번만 쓸 수 있습니다. 같은 업로드 URL로 동시에 또는 확인(finalize) 이후에 덮어쓰지
+        못하도록 `<key>.lock`을 O_EXCL로 만들어 잠그고, 대상 파일이 이미 있으면 ObjectExists.
+        대상 경로에는 업로드가 끝난 파일만 옮기므로 /uploads가 빈 파일을 제공(캐시)하지 않음
+        (.lock/.tmp 파일은 /uploads에서 제공하지 않음)
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock_path = f"{path}.lock"
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        except FileExistsError:
+            raise ObjectExists("This upload URL is already in use")
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        try:
+            if os.path.exists(path):
+                raise ObjectExists("This upload URL has already been used")
+            with open(tmp_path, 'wb') as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ImageTooLarge(size_limit_message(max_bytes))
+                    out.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # 실패한 업로드는 대상 파일이 없으므로 토큰이 유효한 동안 다시 시도 가능
+            os.remove(lock_path)
+        return size
+
+    def head(self, key):
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            head = f.read(16)
+        ext = key.rsplit('.', 1)[-1]
+        content_type = next((ct for ct, e in ALLOWED_CONTENT_TYPES.items() if e == ext), None)
+        return ObjectInfo(os.path.getsize(path), content_type, head)
+
+    def delete(self, key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def public_url(self, key):
+        return f"/uploads/{key}"
+
+
+class S3Storage:
+    """S3 / S3 호환 저장소 (presigned POST 직접 업로드)"""
+
+    name = 's3'
+
+    def __init__(self, bucket, region=None, endpoint_url=None, public_base_url=None):
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url
+        self.public_base_url = public_base_url
+        self._client = None
+        self._client_pid = None
+
+    @property
+    def client(self):
+        # boto3 클라이언트는 프로세스별로 생성 (fork 이후 재생성)
+        if self._client is None or self._client_pid != os.getpid():
+            import boto3
+            self._client = boto3.client('s3', region_name=self.region, endpoint_url=self.endpoint_url)
+            self._client_pid = os.getpid()
+        return self._client
+
+    def create_upload_intent(self, key, content_type, max_bytes, expires_in):
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, max_bytes],
+            ],
+            ExpiresIn=expires_in
+        )
+        return {
+            'method': 'POST',
+            'url': post['url'],
+            'headers': {},
+            'fields': post['fields'],
+        }
+
+    def head(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            meta = self.client.head_object(Bucket=self.bucket, Key=key)
+            head = self.client.get_object(Bucket=self.bucket, Key=key, Range='bytes=0-15')['Body'].read()
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return ObjectInfo(meta['ContentLength'], meta.get('ContentType'), head)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def public_url(self, key):
+        if self.public_base_url:
+            return f"{self.public_base_url.rstrip('/')}/{key}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
+
+
+def init_storage(app):
+    """STORAGE_BACKEND 설정에 맞는 저장소를 등록합니다."""
+    backend = app.config.get('STORAGE_BACKEND', 'local')
+
+    if backend == 'local':
+        storage = LocalStorage(os.path.abspath(app.config.get('UPLOAD_FOLDER', 'uploads')))
+    elif backend == 's3':
+        storage = S3Storage(
+            bucket=app.config.get('STORAGE_S3_BUCKET'),
+            region=app.config.get('STORAGE_S3_REGION'),
+            endpoint_url=app.config.get('STORAGE_S3_ENDPOINT_URL') or None,
+            public_base_url=app.config.get('STORAGE_PUBLIC_BASE_URL') or None
+        )
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    app.extensions['user_storage'] = storage
+
+
+def get_storage():
+    """현재 앱의 저장소"""
+    return current_app.extensions['user_storage']
+
+
+def avatar_key_prefix(user_id):
+    """사용자별 직접 업로드 객체 키 접두사"""
+    return f"avatars/{user_id}/"
+
+
+def new_avatar_key(user_id, content_type):
+    """직접 업로드용 새 객체 키를 생성합니다."""
+    ext = ALLOWED_CONTENT_TYPES.get(content_type)
+    if ext is None:
+        raise ImageUploadError("Unsupported image type (image/png, image/jpeg, image/gif, image/webp only)")
+    return f"{avatar_key_prefix(user_id)}{uuid.uuid4().hex}.{ext}"
+
+
+def verify_uploaded_avatar(storage, user_id, key, max_bytes):
+    """업로드 완료된 객체를 확인합니다. 문제가 있으면 ImageUploadError"""
+    if not key or not key.startswith(avatar_key_prefix(user_id)) or '..' in key:
+        raise ImageUploadError("Invalid upload key")
+
+    info = storage.head(key)
+    if info is None:
+        raise ImageUploadError("Uploaded object not found")
+
+    if info.size > max_bytes:
+        storage.delete(key)
+        raise ImageTooLarge(size_limit_message(max_bytes))
+
+    # 선언된 Content-Type과 실제 내용(매직 바이트)이 일치하는지 확인
+    expected_ext = key.rsplit('.', 1)[-1]
+    if sniff_image_format(info.head) != expected_ext:
+        storage.delete(key)
+        raise ImageUploadError("Uploaded object is not a valid image")
+
+    return info
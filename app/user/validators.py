@@ -12,6 +12,7 @@ class UserValidator:
     def __init__(self):
         # 전화번호 정규식: 한국 전화번호 형식
         self.phone_pattern = re.compile(r'^01[0-9]-?[0-9]{3,4}-?[0-9]{4}$')
+        self.email_pattern = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
     
     def validate_profile_update(self, data):
         """프로필 업데이트 데이터 검증"""
@@ -40,3 +41,30 @@ class UserValidator:
             'is_valid': len(errors) == 0,
             'errors': errors
         }
+    
+    def validate_import_row(self, data):
+        """일괄 가져오기 행 검증 (필수 필드 + 프로필 필드 규칙)"""
+        errors = []
+        
+        username = data.get('username')
+        if not username:
+            errors.append("username is required")
+        elif len(username) > 50:
+            errors.append("username must be 50 characters or less")
+        
+        email = data.get('email')
+        if not email:
+            errors.append("email is required")
+        elif len(email) > 120 or not self.email_pattern.match(email):
+            errors.append("Invalid email format")
+        
+        cognito_user_id = data.get('cognito_user_id')
+        if cognito_user_id and len(cognito_user_id) > 128:
+            errors.append("cognito_user_id must be 128 characters or less")
+        
+        errors.extend(self.validate_profile_update(data)['errors'])
+        
+        return {
+            'is_valid': len(errors) == 0,
+            'errors': errors
+        }